@@ -0,0 +1,140 @@
+import os
+from collections import OrderedDict
+import numpy as np
+import pygame
+
+# Directory holding the game's image assets.
+ASSET_DIR = "assets"
+# Directory holding the decoded, scaled pixel data of previously loaded assets.
+ASSET_CACHE_DIR = "saves/cache/assets"
+
+# Process-wide cache of loaded surfaces, shared by every environment and entity instance.
+_surfaces = {}
+# Memory-mapped pixel buffers backing cached surfaces that could not be converted yet.
+_buffers = {}
+
+def _raw_cache_path(name, size, pixel_format):
+    """
+    Return the path of the on-disk raw pixel cache for an asset at a given size and format.
+    """
+    stem = os.path.splitext(name)[0]
+    return os.path.join(ASSET_CACHE_DIR, f"{stem}_{size[0]}x{size[1]}_{pixel_format}.raw")
+
+def _load_raw(name, size, pixel_format):
+    """
+    Load and scale an asset's pixels, preferring the memory-mapped raw cache over decoding the PNG.
+
+    Returns:
+        pygame.Surface: An unconverted surface of the requested size.
+    """
+    source_path = os.path.join(ASSET_DIR, name)
+    raw_path = _raw_cache_path(name, size, pixel_format)
+
+    # The raw cache is valid as long as it is newer than the source image.
+    if os.path.exists(raw_path) and os.path.getmtime(raw_path) >= os.path.getmtime(source_path):
+        pixels = np.memmap(raw_path, dtype=np.uint8, mode="r")
+        if pixels.size == size[0] * size[1] * len(pixel_format):
+            _buffers[(name, size, pixel_format)] = pixels
+            return pygame.image.frombuffer(pixels, size, pixel_format)
+
+    surface = pygame.image.load(source_path)
+    if surface.get_size() != size:
+        surface = pygame.transform.scale(surface, size)
+
+    # Write the decoded pixels for the next cold start. A failure here only costs a decode next time.
+    try:
+        os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+        tmp_path = raw_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pygame.image.tobytes(surface, pixel_format))
+        os.replace(tmp_path, raw_path)
+    except OSError:
+        pass
+    return surface
+
+def load_image(name, size=None, alpha=False):
+    """
+    Load an image asset once per process, scaled and converted for fast blitting.
+
+    Parameters:
+        name (str): File name of the asset inside ASSET_DIR (e.g. "bg2.png").
+        size (tuple, optional): (width, height) to scale the image to. Defaults to its native size.
+        alpha (bool): Keep per-pixel alpha (convert_alpha) instead of converting to an opaque surface.
+
+    Returns:
+        pygame.Surface: A surface shared with every other caller asking for the same asset. Callers
+                        must not draw onto it.
+
+    Explanation:
+        Decoded and scaled pixels are also written to ASSET_CACHE_DIR as raw RGB(A) data, which later
+        processes memory-map instead of decoding the PNG again. Surfaces are converted to the display
+        format when a display mode has been set; without one (headless use, tests) the unconverted
+        surface is returned, and a converted copy is made the first time it is requested after a
+        display exists.
+    """
+    if size is not None:
+        size = (int(size[0]), int(size[1]))
+    converted = pygame.display.get_surface() is not None
+    key = (name, size, alpha, converted)
+    surface = _surfaces.get(key)
+    if surface is not None:
+        return surface
+
+    pixel_format = "RGBA" if alpha else "RGB"
+    if size is None:
+        surface = pygame.image.load(os.path.join(ASSET_DIR, name))
+    else:
+        surface = _load_raw(name, size, pixel_format)
+
+    if converted:
+        surface = surface.convert_alpha() if alpha else surface.convert()
+    _surfaces[key] = surface
+    return surface
+
+def clear_cache():
+    """
+    Drop all surfaces cached in this process (the on-disk raw cache is kept).
+    """
+    _surfaces.clear()
+    _buffers.clear()
+
+
+class TextCache:
+    """
+    A bounded least-recently-used cache of rendered text surfaces.
+
+    Rendering a string is much slower than blitting it, so views that draw the same
+    strings every frame (e.g. the visible rows of a long list) render each one once and
+    reuse its surface. Only the capacity most recently drawn strings are kept, so
+    scrolling through an arbitrarily long list keeps memory bounded.
+    """
+
+    def __init__(self, font, capacity=1024, antialias=True):
+        """
+        Parameters:
+            font (pygame.font.Font): Font to render with.
+            capacity (int): Maximum number of cached surfaces.
+            antialias (bool): Render antialiased text.
+        """
+        self.font = font
+        self.capacity = capacity
+        self.antialias = antialias
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, text, color):
+        """
+        Return the surface of a string, rendering it only if it is not cached.
+        """
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+        surface = self.font.render(text, self.antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surface
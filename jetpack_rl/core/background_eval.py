@@ -0,0 +1,171 @@
+import csv
+import os
+import queue
+import multiprocessing as mp
+import numpy as np
+
+def evaluate_policy(policy, seeds, max_frames, env_kwargs=None):
+    """
+    Play one headless episode per seed with a policy, all episodes stepped in lockstep.
+
+    The policy is queried once per step for all still-running episodes (a single batched
+    forward pass), and always acts deterministically.
+
+    Returns:
+        tuple: (episode rewards, episode lengths) as NumPy arrays, in seed order.
+    """
+    from envs.jetpack_env import JetpackEnv
+
+    envs = [JetpackEnv(headless=True, max_frames=max_frames, **(env_kwargs or {})) for _ in seeds]
+    obs = np.stack([env.reset(seed=seed) for env, seed in zip(envs, seeds)])
+    rewards = np.zeros(len(envs))
+    lengths = np.zeros(len(envs), dtype=np.int64)
+    running = np.ones(len(envs), dtype=bool)
+    while running.any():
+        active = np.flatnonzero(running)
+        actions, _ = policy.predict(obs[active], deterministic=True)
+        for i, action in zip(active, actions):
+            state, reward, done, _ = envs[i].step(int(action))
+            obs[i] = state
+            rewards[i] += reward
+            lengths[i] += 1
+            running[i] = not done
+    return rewards, lengths
+
+def run_evaluator(policy_class, policy_kwargs, seeds, max_frames, env_kwargs, save_path, tasks, results):
+    """
+    Evaluation process: evaluate every submitted policy snapshot on the fixed seeds.
+
+    Each task is (timestep, state_dict); a None task stops the process. The snapshot with
+    the best mean reward so far is saved to save_path (loadable with core.policies.load_policy).
+    """
+    import torch
+    torch.set_num_threads(1)
+    policy = policy_class(**policy_kwargs)
+    policy.set_training_mode(False)
+    best_reward = -np.inf
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        timestep, state_dict = task
+        policy.load_state_dict({name: torch.as_tensor(value) for name, value in state_dict.items()})
+        rewards, lengths = evaluate_policy(policy, seeds, max_frames, env_kwargs)
+        result = {
+            "timestep": timestep,
+            "reward_mean": float(rewards.mean()),
+            "reward_std": float(rewards.std()),
+            "reward_min": float(rewards.min()),
+            "length_mean": float(lengths.mean()),
+            "best": False,
+        }
+        if result["reward_mean"] > best_reward:
+            best_reward = result["reward_mean"]
+            if save_path is not None:
+                policy.save(save_path)
+            result["best"] = True
+        results.put(result)
+
+
+class BackgroundEvaluator:
+    """
+    Evaluate snapshots of a Stable-Baselines3 policy in a separate process.
+
+    submit() copies the policy's parameters and hands them to the evaluation process
+    without waiting: at most one snapshot is queued, and a snapshot offered while the
+    queue is full is skipped, so training never blocks on evaluation. Results are
+    collected with poll(), also without waiting.
+    """
+
+    def __init__(self, policy, seeds, max_frames, save_path=None, env_kwargs=None):
+        """
+        Parameters:
+            policy: The SB3 policy being trained (e.g. model.policy).
+            seeds (list): Seeds of the fixed evaluation episodes.
+            max_frames (int): Frame limit of the evaluation episodes.
+            save_path (str, optional): Where the best snapshot is saved (a .pt policy file).
+            env_kwargs (dict, optional): Extra JetpackEnv keyword arguments.
+        """
+        self.policy = policy
+        self.save_path = save_path
+        self.submitted = 0
+        self.skipped = 0
+        if save_path is not None:
+            os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        # Spawned (not forked), so the process does not inherit the trainer's torch thread pools.
+        ctx = mp.get_context("spawn")
+        self.tasks = ctx.Queue(maxsize=1)
+        self.results = ctx.Queue()
+        self.process = ctx.Process(
+            target=run_evaluator,
+            args=(type(policy), policy._get_constructor_parameters(), list(seeds), max_frames, env_kwargs,
+                  save_path, self.tasks, self.results),
+            daemon=True)
+        self.process.start()
+
+    def submit(self, timestep):
+        """
+        Offer the current policy parameters for evaluation.
+
+        Returns:
+            bool: False if the previous snapshot is still waiting and this one was skipped.
+        """
+        if self.tasks.full():
+            self.skipped += 1
+            return False
+        state_dict = {name: value.detach().cpu().numpy().copy() for name, value in self.policy.state_dict().items()}
+        try:
+            self.tasks.put_nowait((timestep, state_dict))
+        except queue.Full:
+            self.skipped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def poll(self):
+        """
+        Return the evaluation results that arrived since the last call.
+        """
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def close(self, timeout=None):
+        """
+        Let the evaluation process finish its queued snapshot, stop it, and return the remaining results.
+        """
+        self.tasks.put(None)
+        results = []
+        # Drain results while waiting, so the process is never stuck writing to a full pipe.
+        while self.process.is_alive():
+            try:
+                results.append(self.results.get(timeout=0.1))
+            except queue.Empty:
+                if timeout is not None:
+                    timeout -= 0.1
+                    if timeout <= 0:
+                        self.process.terminate()
+                        break
+        self.process.join()
+        return results + self.poll()
+
+
+class EvaluationLog:
+    """
+    Append evaluation results to a CSV file as they arrive.
+    """
+
+    FIELDS = ("timestep", "reward_mean", "reward_std", "reward_min", "length_mean", "best")
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerow(self.FIELDS)
+
+    def write(self, result):
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerow([result[field] for field in self.FIELDS])
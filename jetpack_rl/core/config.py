@@ -14,10 +14,27 @@ THRUST = -1.0
 # Obstacle settings
 OBSTACLE_WIDTH = 50
 GAP_HEIGHT = 150  # height of the gap the player must fly through
+OBSTACLE_SPAWN_FRACTION = 0.8  # a new obstacle spawns once the last one is left of this fraction of the screen width
 
 # Scrolling settings
 SCROLL_SPEED = 5  # speed at which the game world scrolls
 
 # Game settings
 MAX_FRAMES = 18000  # maximum frames per episode
-FPS = 60  # frames per second
+FPS = 60  # frames per second (the physics rate)
+RENDER_FPS = 144  # cap on rendered frames per second in human play; physics still runs at FPS
+MAX_FRAME_TIME = 0.25  # longest frame (in seconds) fed to the fixed-timestep loop, to avoid a spiral of death
+EPISODE_STATS_WINDOW = 100  # number of recent episodes covered by the rolling statistics
+REWARD_VARIANT = "survival"  # reward function used by the environment (see core/rewards.py)
+PHYSICS_VARIANT = "fixed"  # per-episode physics distributions of the environment (see core/physics.py)
+
+# Observation settings
+LOOKAHEAD_OBSTACLES = 1  # number of upcoming obstacles described in the observation
+
+# Memory instrumentation settings
+MEMORY_SNAPSHOT_INTERVAL = 60  # seconds between memory snapshots when --memory_log is given
+STEP_ALLOCATION_BUDGET = 1024  # bytes an environment step may allocate (see scripts/memory_benchmark.py)
+
+# Training monitor settings
+MONITOR_TILE_WIDTH = 341  # width (in pixels) of each environment's thumbnail
+MONITOR_REFRESH_HZ = 4  # how often the tiled monitor redraws
@@ -0,0 +1,298 @@
+import importlib
+import random
+import time
+import numpy as np
+from core.config import PLAYER_HEIGHT
+
+# Named candidate engines for the conformance harness, as "module:callable" specs. Every
+# callable takes the environment keyword arguments and returns an object with JetpackEnv's
+# reset(seed) and step(action) interface.
+CANDIDATES = {
+    # The reference against itself: checks that the harness and the seeding are deterministic.
+    "reference": "envs.jetpack_env:JetpackEnv",
+    # One environment of the vectorized engine (envs.batch_env.BatchJetpackEnv).
+    "batch": "envs.batch_env:SingleBatchEnv",
+}
+
+def load_engine(spec):
+    """
+    Resolve a registered candidate name or a "module:callable" spec to the callable.
+    """
+    spec = CANDIDATES.get(spec, spec)
+    module_name, sep, attribute = spec.partition(":")
+    if not sep:
+        raise ValueError(f"expected a registered candidate ({', '.join(CANDIDATES)}) or module:callable, got {spec!r}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class RandomActions:
+    """
+    Thrust with probability p on every frame.
+    """
+
+    def __init__(self, rng, p=0.5):
+        self.rng = rng
+        self.p = p
+
+    def __call__(self, observation):
+        return 1 if self.rng.random() < self.p else 0
+
+
+class AdversarialActions:
+    """
+    Action streams that steer the player into edge cases.
+
+    The stream switches between segments of random length, each following one pattern:
+    holding thrust into the ceiling, free-falling into the floor, fluttering the thrust on
+    and off, flying through the gap center (for long episodes and many passed obstacles),
+    or hugging the top or bottom edge of the gap within a few pixels, so the collision
+    tests are exercised right at their boundaries.
+    """
+
+    PATTERNS = ("thrust", "fall", "flutter", "center", "top_edge", "bottom_edge")
+
+    def __init__(self, rng, min_segment=10, max_segment=300):
+        self.rng = rng
+        self.min_segment = min_segment
+        self.max_segment = max_segment
+        self._remaining = 0
+        self._pattern = None
+        self._period = 1
+        self._margin = 0
+        self._frame = 0
+
+    def __call__(self, observation):
+        if self._remaining <= 0:
+            self._pattern = self.rng.choice(self.PATTERNS)
+            self._remaining = self.rng.randint(self.min_segment, self.max_segment)
+            self._period = self.rng.randint(1, 8)
+            self._margin = self.rng.uniform(-3, 3)
+        self._remaining -= 1
+        self._frame += 1
+
+        pattern = self._pattern
+        if pattern == "thrust":
+            return 1
+        if pattern == "fall":
+            return 0
+        if pattern == "flutter":
+            return (self._frame // self._period) % 2
+        player_y, velocity, gap_y, gap_height = (float(value) for value in observation[:4])
+        if pattern == "center":
+            target = gap_y + (gap_height - PLAYER_HEIGHT) / 2
+        elif pattern == "top_edge":
+            target = gap_y + self._margin
+        else:
+            target = gap_y + gap_height - PLAYER_HEIGHT + self._margin
+        # Thrust when the player would otherwise end up below the target next frame.
+        return 1 if player_y + velocity > target else 0
+
+def make_actions(kind, rng):
+    """
+    Return an action stream: "random", "adversarial", or "mixed" (a new choice of the two per episode).
+    """
+    if kind == "random":
+        return RandomActions(rng)
+    if kind == "adversarial":
+        return AdversarialActions(rng)
+    if kind == "mixed":
+        return RandomActions(rng, p=rng.uniform(0.3, 0.7)) if rng.random() < 0.5 else AdversarialActions(rng)
+    raise ValueError(f"unknown action stream {kind!r}")
+
+
+def engine_state(env):
+    """
+    Return a comparable snapshot of an engine's internal state.
+
+    Engines can define conformance_state() to provide their own; otherwise the state is
+    read from JetpackEnv-style player and obstacles attributes, when present.
+    """
+    if hasattr(env, "conformance_state"):
+        return env.conformance_state()
+    state = {}
+    player = getattr(env, "player", None)
+    if player is not None:
+        state["player.y"] = player.y
+        state["player.velocity"] = player.velocity
+    obstacles = getattr(env, "obstacles", None)
+    if obstacles is not None:
+        state["obstacles"] = [(o.x, o.gap_y, o.gap_height, o.passed) for o in obstacles]
+    for name in ("score", "frame_count", "obstacles_passed", "done", "truncated"):
+        if hasattr(env, name):
+            state[name] = getattr(env, name)
+    return state
+
+def _differs(a, b, atol):
+    if isinstance(a, (list, tuple)) or isinstance(b, (list, tuple)):
+        return len(a) != len(b) or any(_differs(x, y, atol) for x, y in zip(a, b))
+    if isinstance(a, (int, float, np.number)) and isinstance(b, (int, float, np.number)):
+        return abs(a - b) > atol
+    return a != b
+
+def state_diff(reference, candidate, atol=0.0):
+    """
+    Return {key: (reference value, candidate value)} for the keys whose values differ.
+    """
+    return {key: (reference[key], candidate[key]) for key in reference.keys() & candidate.keys()
+            if _differs(reference[key], candidate[key], atol)}
+
+
+class Divergence:
+    """
+    The first step at which the candidate disagreed with the reference.
+
+    Attributes:
+        episode, seed, frame (int): Where it happened (frame counts the episode's steps).
+        fields (dict): Step outputs that differ, as {name: (reference, candidate)}.
+        state (dict): Internal state that differs after the step (see engine_state).
+        actions (list): The episode's last actions, ending with the divergent step's.
+    """
+
+    def __init__(self, episode, seed, frame, fields, state, actions):
+        self.episode = episode
+        self.seed = seed
+        self.frame = frame
+        self.fields = fields
+        self.state = state
+        self.actions = actions
+
+    def __str__(self):
+        lines = [f"First divergence in episode {self.episode} (seed {self.seed}) at frame {self.frame}:"]
+        for title, diff in (("step output", self.fields), ("state", self.state)):
+            for key, (reference, candidate) in sorted(diff.items()):
+                lines.append(f"  {title} {key}: reference={reference!r} candidate={candidate!r}")
+        lines.append(f"  last actions: {self.actions}")
+        return "\n".join(lines)
+
+
+class ConformanceResult:
+    """
+    Outcome of a conformance run: steps and episodes compared, and the first divergence (if any).
+    """
+
+    def __init__(self, steps, episodes, divergence):
+        self.steps = steps
+        self.episodes = episodes
+        self.divergence = divergence
+
+    @property
+    def passed(self):
+        return self.divergence is None
+
+def compare_step(reference_output, candidate_output, atol=0.0):
+    """
+    Compare two (observation, reward, done, info) step outputs.
+
+    Returns:
+        dict: {name: (reference, candidate)} for the outputs that differ.
+    """
+    ref_obs, ref_reward, ref_done, ref_info = reference_output
+    cand_obs, cand_reward, cand_done, cand_info = candidate_output
+    fields = {}
+    ref_obs, cand_obs = np.asarray(ref_obs), np.asarray(cand_obs)
+    if ref_obs.shape != cand_obs.shape:
+        fields["observation.shape"] = (ref_obs.shape, cand_obs.shape)
+    else:
+        for index in np.flatnonzero(np.abs(ref_obs.astype(np.float64) - cand_obs) > atol):
+            fields[f"observation[{index}]"] = (ref_obs[index].item(), cand_obs[index].item())
+    if _differs(ref_reward, cand_reward, atol):
+        fields["reward"] = (ref_reward, cand_reward)
+    if bool(ref_done) != bool(cand_done):
+        fields["done"] = (bool(ref_done), bool(cand_done))
+    for key in ("score", "frame_count", "truncated", "obstacles_passed"):
+        if key in ref_info and _differs(ref_info[key], cand_info.get(key), atol):
+            fields[f"info[{key!r}]"] = (ref_info[key], cand_info.get(key))
+    ref_cause = ref_info.get("collision", {}).get("cause")
+    cand_cause = cand_info.get("collision", {}).get("cause")
+    if ref_cause != cand_cause:
+        fields["collision cause"] = (ref_cause, cand_cause)
+    return fields
+
+def run_conformance(reference_factory, candidate_factory, steps, actions="mixed", seed=0, atol=0.0,
+                    env_kwargs=None, history=20):
+    """
+    Step a reference engine and a candidate engine in lockstep and compare every step.
+
+    Both engines start every episode from the same seed (seed + episode index) and receive
+    the same actions, chosen from the reference's observations. The run stops at the
+    first step where the outputs or the internal states disagree.
+
+    Parameters:
+        reference_factory, candidate_factory (callable): Create an engine from env_kwargs.
+        steps (int): Total steps to compare.
+        actions (str): Action stream (see make_actions).
+        seed (int): Base seed of the courses and action streams.
+        atol (float): Absolute tolerance of numeric comparisons (0 requires identical results).
+        env_kwargs (dict, optional): Keyword arguments of both factories.
+        history (int): Number of recent actions kept for the divergence report.
+
+    Returns:
+        ConformanceResult: The comparison outcome.
+    """
+    env_kwargs = dict(env_kwargs or {})
+    reference = reference_factory(**env_kwargs)
+    candidate = candidate_factory(**env_kwargs)
+    total = 0
+    episode = 0
+    while total < steps:
+        episode_seed = seed + episode
+        rng = random.Random(episode_seed)
+        policy = make_actions(actions, rng)
+        ref_obs = reference.reset(seed=episode_seed)
+        cand_obs = candidate.reset(seed=episode_seed)
+        recent = []
+        # Frame 0 compares the initial observations and states.
+        fields = compare_step((ref_obs, 0, False, {}), (cand_obs, 0, False, {}), atol)
+        diff = state_diff(engine_state(reference), engine_state(candidate), atol)
+        if fields or diff:
+            return ConformanceResult(total, episode + 1, Divergence(episode, episode_seed, 0, fields, diff, []))
+        ref_obs = np.array(ref_obs)
+        frame = 0
+        done = False
+        while not done and total < steps:
+            action = policy(ref_obs)
+            recent.append(action)
+            del recent[:-history]
+
+            ref_output = reference.step(action)
+            cand_output = candidate.step(action)
+            total += 1
+            frame += 1
+
+            fields = compare_step(ref_output, cand_output, atol)
+            diff = state_diff(engine_state(reference), engine_state(candidate), atol)
+            if fields or diff:
+                divergence = Divergence(episode, episode_seed, frame, fields, diff, list(recent))
+                return ConformanceResult(total, episode + 1, divergence)
+            ref_obs = np.array(ref_output[0])
+            done = ref_output[2]
+        episode += 1
+    return ConformanceResult(total, episode, None)
+
+def benchmark_engine(factory, steps, actions="mixed", seed=0, env_kwargs=None):
+    """
+    Measure an engine's stepping speed on its own.
+
+    The engine plays the same seeded courses and action streams as in run_conformance;
+    only the time spent inside step() is counted, so engines are timed on equal work
+    without the comparison overhead.
+
+    Returns:
+        float: Steps per second.
+    """
+    env = factory(**dict(env_kwargs or {}))
+    seconds = 0.0
+    total = 0
+    episode = 0
+    while total < steps:
+        policy = make_actions(actions, random.Random(seed + episode))
+        observation = env.reset(seed=seed + episode)
+        done = False
+        while not done and total < steps:
+            action = policy(observation)
+            start = time.perf_counter()
+            observation, _, done, _ = env.step(action)
+            seconds += time.perf_counter() - start
+            total += 1
+        episode += 1
+    return total / seconds if seconds > 0 else float("inf")
@@ -0,0 +1,129 @@
+import glob
+import os
+import time
+import numpy as np
+
+DEMONSTRATIONS_DIR = "saves/demonstrations"
+
+class DemonstrationRecorder:
+    """
+    Record a play session as a stream of (observation, action) pairs.
+
+    Every step stores the observation the player saw and the action they took in
+    preallocated float32/uint8 arrays that grow by doubling, so recording costs a copy
+    of a few numbers per step. A session is saved as one compressed .npz file.
+    """
+
+    def __init__(self, obs_dim, capacity=4096):
+        """
+        Parameters:
+            obs_dim (int): Size of an observation.
+            capacity (int): Initial number of steps the buffers hold.
+        """
+        self.observations = np.empty((capacity, obs_dim), dtype=np.float32)
+        self.actions = np.empty(capacity, dtype=np.uint8)
+        self.size = 0
+
+    def record(self, observation, action):
+        """
+        Append one step: the observation the action was chosen from, and the action.
+        """
+        if self.size == len(self.actions):
+            self.observations = np.concatenate([self.observations, np.empty_like(self.observations)])
+            self.actions = np.concatenate([self.actions, np.empty_like(self.actions)])
+        self.observations[self.size] = observation
+        self.actions[self.size] = action
+        self.size += 1
+
+    def save(self, path=None, **metadata):
+        """
+        Save the recorded steps.
+
+        Parameters:
+            path (str, optional): Output .npz file. Defaults to a timestamped file in DEMONSTRATIONS_DIR.
+            metadata: Extra scalars stored with the session (e.g. score=12).
+
+        Returns:
+            str: The path written.
+        """
+        if path is None:
+            path = os.path.join(DEMONSTRATIONS_DIR, time.strftime("session_%Y%m%d_%H%M%S.npz"))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, observations=self.observations[:self.size], actions=self.actions[:self.size],
+                            **metadata)
+        return path
+
+def load_demonstrations(paths):
+    """
+    Load and concatenate recorded sessions.
+
+    Parameters:
+        paths (list): Session .npz files and/or directories containing them.
+
+    Returns:
+        tuple: (observations (N, obs_dim) float32, actions (N,) int64).
+    """
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.npz"))) if os.path.isdir(path) else [path])
+    if not files:
+        raise ValueError(f"no demonstration sessions found in {paths}")
+    observations, actions = [], []
+    for file in files:
+        with np.load(file) as data:
+            observations.append(data["observations"])
+            actions.append(data["actions"])
+    return np.concatenate(observations), np.concatenate(actions).astype(np.int64)
+
+def pretrain_policy(policy, observations, actions, epochs=10, batch_size=256, learning_rate=1e-3,
+                    validation_fraction=0.1, seed=0):
+    """
+    Behavior cloning: train a Stable-Baselines3 policy to imitate recorded actions.
+
+    The policy's action distribution is fitted by maximizing the log-likelihood of the
+    recorded actions (policy.evaluate_actions), with its own Adam optimizer so PPO's
+    optimizer state is left untouched. A random validation_fraction of the steps is held
+    out to report how often the policy's greedy action matches the player's.
+
+    Parameters:
+        policy: An SB3 ActorCriticPolicy (e.g. model.policy).
+        observations (np.ndarray): (N, obs_dim) recorded observations.
+        actions (np.ndarray): (N,) recorded actions.
+
+    Returns:
+        list: One dict per epoch with the mean training loss and the validation accuracy.
+    """
+    import torch
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(actions))
+    num_validation = int(len(actions) * validation_fraction)
+    validation, train = order[:num_validation], order[num_validation:]
+    obs = torch.as_tensor(observations, dtype=torch.float32, device=policy.device)
+    act = torch.as_tensor(actions, dtype=torch.int64, device=policy.device)
+
+    optimizer = torch.optim.Adam(policy.parameters(), lr=learning_rate)
+    history = []
+    policy.set_training_mode(True)
+    for epoch in range(epochs):
+        rng.shuffle(train)
+        losses = []
+        for start in range(0, len(train), batch_size):
+            batch = torch.as_tensor(train[start:start + batch_size], device=policy.device)
+            _, log_prob, _ = policy.evaluate_actions(obs[batch], act[batch])
+            loss = -log_prob.mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            losses.append(loss.item())
+
+        result = {"epoch": epoch + 1, "loss": float(np.mean(losses)) if losses else float("nan")}
+        if num_validation:
+            policy.set_training_mode(False)
+            with torch.no_grad():
+                predicted = policy.get_distribution(obs[validation]).mode()
+            result["accuracy"] = float((predicted == act[validation]).float().mean())
+            policy.set_training_mode(True)
+        history.append(result)
+    policy.set_training_mode(False)
+    return history
@@ -0,0 +1,167 @@
+import numpy as np
+from core.config import SCREEN_HEIGHT, PLAYER_HEIGHT
+from core.game_logic import COLLISION_CAUSES
+
+class FailureStats:
+    """
+    Streaming statistics of how episodes end, in fixed-size histograms.
+
+    Every collision is folded into per-cause histograms of the player's y position
+    against its offset from the gap center, and of the velocity at death. Memory does
+    not grow with the number of episodes, recording an episode costs a few integer
+    operations, and statistics from several processes can be merged.
+
+    Attributes:
+        causes (tuple): Collision causes, indexing the first axis of the histograms.
+        heatmap (np.ndarray): (causes, y_bins, offset_bins) counts of player y vs gap offset.
+        velocity (np.ndarray): (causes, velocity_bins) counts of the velocity at death.
+        truncated (int): Episodes that survived to the time limit.
+    """
+
+    def __init__(self, y_bins=48, offset_bins=48, velocity_bins=40,
+                 y_range=(-PLAYER_HEIGHT, SCREEN_HEIGHT), offset_range=(-SCREEN_HEIGHT, SCREEN_HEIGHT),
+                 velocity_range=(-30, 30)):
+        """
+        Parameters:
+            y_bins, offset_bins, velocity_bins (int): Histogram resolution.
+            y_range, offset_range, velocity_range (tuple): Histogram ranges. Values outside
+                                                           them are counted in the edge bins.
+        """
+        self.causes = COLLISION_CAUSES
+        self._cause_index = {cause: i for i, cause in enumerate(self.causes)}
+        self.ranges = {"y": y_range, "offset": offset_range, "velocity": velocity_range}
+        self.heatmap = np.zeros((len(self.causes), y_bins, offset_bins), dtype=np.int64)
+        self.velocity = np.zeros((len(self.causes), velocity_bins), dtype=np.int64)
+        self.truncated = 0
+
+    @staticmethod
+    def _bin(value, value_range, bins):
+        low, high = value_range
+        index = int((value - low) * bins / (high - low))
+        return 0 if index < 0 else bins - 1 if index >= bins else index
+
+    def _bins(self, values, value_range, bins):
+        low, high = value_range
+        index = np.floor((np.asarray(values, dtype=np.float64) - low) * bins / (high - low)).astype(np.int64)
+        return np.clip(index, 0, bins - 1)
+
+    def record(self, collision):
+        """
+        Record one collision.
+
+        Parameters:
+            collision (dict): The info["collision"] entry of JetpackEnv.step, with at least
+                              cause, player_y, velocity and gap_offset.
+        """
+        cause = self._cause_index[collision["cause"]]
+        _, y_bins, offset_bins = self.heatmap.shape
+        y = self._bin(collision["player_y"], self.ranges["y"], y_bins)
+        offset = self._bin(collision["gap_offset"], self.ranges["offset"], offset_bins)
+        self.heatmap[cause, y, offset] += 1
+        self.velocity[cause, self._bin(collision["velocity"], self.ranges["velocity"], self.velocity.shape[1])] += 1
+
+    def record_info(self, info):
+        """
+        Record an episode ending from a step's info dict (steps that did not end an episode are ignored).
+        """
+        collision = info.get("collision")
+        if collision is not None:
+            self.record(collision)
+        elif info.get("truncated"):
+            self.truncated += 1
+
+    def record_batch(self, causes, player_y, velocity, gap_offset):
+        """
+        Record many collisions at once (e.g. from a batched engine).
+
+        Parameters:
+            causes (np.ndarray): (N,) indices into self.causes.
+            player_y, velocity, gap_offset (np.ndarray): (N,) values at death.
+        """
+        causes = np.asarray(causes, dtype=np.int64)
+        _, y_bins, offset_bins = self.heatmap.shape
+        y = self._bins(player_y, self.ranges["y"], y_bins)
+        offset = self._bins(gap_offset, self.ranges["offset"], offset_bins)
+        np.add.at(self.heatmap, (causes, y, offset), 1)
+        np.add.at(self.velocity, (causes, self._bins(velocity, self.ranges["velocity"], self.velocity.shape[1])), 1)
+
+    def merge(self, other):
+        """
+        Add another FailureStats with the same binning into this one.
+        """
+        if self.heatmap.shape != other.heatmap.shape or self.ranges != other.ranges:
+            raise ValueError("cannot merge failure statistics with different binning")
+        self.heatmap += other.heatmap
+        self.velocity += other.velocity
+        self.truncated += other.truncated
+
+    @property
+    def collisions(self):
+        return int(self.velocity.sum())
+
+    def summary(self):
+        """
+        Return the number of episodes ended by each cause (and by the time limit).
+        """
+        counts = {cause: int(count) for cause, count in zip(self.causes, self.velocity.sum(axis=1))}
+        counts["truncated"] = self.truncated
+        return counts
+
+    def edges(self):
+        """
+        Return the bin edges of the y, offset and velocity histograms.
+        """
+        _, y_bins, offset_bins = self.heatmap.shape
+        return (np.linspace(*self.ranges["y"], y_bins + 1),
+                np.linspace(*self.ranges["offset"], offset_bins + 1),
+                np.linspace(*self.ranges["velocity"], self.velocity.shape[1] + 1))
+
+    def save(self, path):
+        """
+        Save the histograms and their bin edges to an .npz file for plotting.
+        """
+        y_edges, offset_edges, velocity_edges = self.edges()
+        np.savez(path, causes=np.array(self.causes), heatmap=self.heatmap, velocity=self.velocity,
+                 truncated=self.truncated, y_edges=y_edges, offset_edges=offset_edges, velocity_edges=velocity_edges)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load statistics saved with save().
+        """
+        with np.load(path) as data:
+            if tuple(data["causes"].tolist()) != COLLISION_CAUSES:
+                raise ValueError(f"{path} was saved with different collision causes")
+            stats = cls(data["heatmap"].shape[1], data["heatmap"].shape[2], data["velocity"].shape[1],
+                        y_range=tuple(data["y_edges"][[0, -1]].tolist()),
+                        offset_range=tuple(data["offset_edges"][[0, -1]].tolist()),
+                        velocity_range=tuple(data["velocity_edges"][[0, -1]].tolist()))
+            stats.heatmap[:] = data["heatmap"]
+            stats.velocity[:] = data["velocity"]
+            stats.truncated = int(data["truncated"])
+        return stats
+
+def plot_failure_stats(stats, save_path):
+    """
+    Plot the death heatmap (all causes combined) and the velocity at death per cause.
+    """
+    import matplotlib.pyplot as plt
+
+    y_edges, offset_edges, velocity_edges = stats.edges()
+    figure, (heatmap_axes, velocity_axes) = plt.subplots(1, 2, figsize=(12, 5))
+    image = heatmap_axes.pcolormesh(offset_edges, y_edges, stats.heatmap.sum(axis=0), cmap="inferno")
+    heatmap_axes.invert_yaxis()  # Screen coordinates: y grows downwards.
+    heatmap_axes.set_xlabel("Offset from gap center (px)")
+    heatmap_axes.set_ylabel("Player y (px)")
+    heatmap_axes.set_title(f"Deaths ({stats.collisions})")
+    figure.colorbar(image, ax=heatmap_axes)
+
+    centers = (velocity_edges[:-1] + velocity_edges[1:]) / 2
+    for cause, counts in zip(stats.causes, stats.velocity):
+        velocity_axes.plot(centers, counts, label=f"{cause} ({counts.sum()})")
+    velocity_axes.set_xlabel("Velocity at death (px/frame)")
+    velocity_axes.set_ylabel("Deaths")
+    velocity_axes.legend()
+    figure.tight_layout()
+    figure.savefig(save_path)
+    plt.close(figure)
@@ -1,5 +1,11 @@
-import pygame
-from core.config import SCREEN_HEIGHT
+from core.config import SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, OBSTACLE_WIDTH
+
+# What the player collided with (see collision_cause).
+TOP_BARRIER = "top_barrier"
+BOTTOM_BARRIER = "bottom_barrier"
+CEILING = "ceiling"
+FLOOR = "floor"
+COLLISION_CAUSES = (TOP_BARRIER, BOTTOM_BARRIER, CEILING, FLOOR)
 
 def compute_reward(state, action):
     """
@@ -25,15 +31,24 @@ def compute_reward(state, action):
         return 1  # Reward for surviving the frame
 
 
+def _overlaps(top, bottom, other_top, other_bottom):
+    """
+    Return whether two vertical extents overlap, with the semantics of pygame.Rect.colliderect:
+    extents are normalized if given upside down, and empty extents never overlap.
+    """
+    if top > bottom:
+        top, bottom = bottom, top
+    if other_top > other_bottom:
+        other_top, other_bottom = other_bottom, other_top
+    return top < bottom and other_top < other_bottom and top < other_bottom and other_top < bottom
+
 def check_collision(player, obstacles):
     """
     Check whether the player collides with any obstacles or the screen boundaries.
     
     Parameters:
-        player: The player object, expected to have a 'get_rect()' method returning a pygame.Rect,
-                as well as a 'y' attribute for the vertical position.
-        obstacles (list): List of obstacle objects. Each obstacle is expected to have 
-                          'top_rect' and 'bottom_rect' attributes (pygame.Rect).
+        player: The player object, with 'x' and 'y' attributes for its position.
+        obstacles (list): List of obstacle objects, with 'x', 'gap_y' and 'gap_height' attributes.
     
     Returns:
         bool: True if a collision is detected, otherwise False.
@@ -43,17 +58,155 @@ def check_collision(player, obstacles):
           - Checks if the player's rect collides with the top or bottom barrier of any obstacle.
           - Checks if the player has moved out of the vertical bounds of the screen.
         It returns a simple boolean value which the environment's _handle_collisions() method can use 
-        to update the game state.
+        to update the game state. See collision_cause for what was hit.
+
+        The overlap tests are done on the numbers directly rather than on pygame Rects, with the
+        same results as colliderect on the player's rect and the obstacles' top_rect and bottom_rect
+        (integer positions, player y truncated to whole pixels).
     """
-    player_rect = player.get_rect()
+    return collision_cause(player, obstacles) is not None
+
+def collision_cause(player, obstacles):
+    """
+    Return what the player collides with, with the same tests as check_collision.
+
+    Returns:
+        str or None: TOP_BARRIER or BOTTOM_BARRIER for an obstacle, CEILING or FLOOR for the
+                     screen bounds (obstacles are checked first), or None without a collision.
+    """
+    collision = find_collision(player, obstacles)
+    return None if collision is None else collision[0]
+
+def find_collision(player, obstacles):
+    """
+    Return what the player collides with and the obstacle hit, with the same tests as check_collision.
+
+    Returns:
+        tuple or None: (cause, obstacle) with the cause as in collision_cause, and the obstacle
+                       None for the screen bounds; None without a collision.
+    """
+    player_left = player.x
+    player_right = player.x + PLAYER_WIDTH
+    player_top = int(player.y)
+    player_bottom = player_top + PLAYER_HEIGHT
     
     # Check collision with obstacles (top and bottom barriers)
     for obs in obstacles:
-        if player_rect.colliderect(obs.top_rect) or player_rect.colliderect(obs.bottom_rect):
-            return True
+        if obs.x >= player_right or obs.x + OBSTACLE_WIDTH <= player_left:
+            continue
+        gap_bottom = obs.gap_y + obs.gap_height
+        if _overlaps(player_top, player_bottom, 0, obs.gap_y):
+            return TOP_BARRIER, obs
+        if _overlaps(player_top, player_bottom, gap_bottom, SCREEN_HEIGHT):
+            return BOTTOM_BARRIER, obs
+
+    cause = _bounds_cause(player)
+    return None if cause is None else (cause, None)
+
+def _bounds_cause(player):
+    """
+    Return CEILING or FLOOR if the player is out of the vertical bounds of the screen, else None.
+    """
+    if player.y < 0:
+        return CEILING
+    if (player.y + PLAYER_HEIGHT) > SCREEN_HEIGHT:
+        return FLOOR
+    return None
+
+def check_collision_swept(player, prev_y, obstacles, scroll_distance, dt=1, acceleration=0.0):
+    """
+    Check whether the player collided with anything at any time during the last step.
+    
+    Parameters:
+        player: The player object after the step, with 'x' and 'y' attributes.
+        prev_y (float): The player's y position before the step.
+        obstacles (list): Obstacle objects after the step, with 'x', 'gap_y' and 'gap_height' attributes.
+        scroll_distance (float): How far the obstacles moved left during the step.
+        dt (int): Length of the step in frames.
+        acceleration (float): The player's per-frame velocity change during the step
+                              (gravity, plus thrust if it was applied).
+    
+    Returns:
+        bool: True if a collision is detected, otherwise False.
+    
+    Explanation:
+        Within a step the obstacles move horizontally at a constant speed, and the player
+        vertically along the parabola through its per-frame positions (a straight line without
+        acceleration). For each obstacle this computes the fraction of the step during which it
+        horizontally overlaps the player, and checks the player's vertical extent over that
+        interval (bounded by its ends, and by the apex of the parabola if the player turns
+        around within it) against the gap. The screen bounds are checked over the whole step.
+        Unlike check_collision, an obstacle cannot be skipped over by a large step.
+    """
+    return collision_cause_swept(player, prev_y, obstacles, scroll_distance, dt, acceleration) is not None
+
+def _path_extent(prev_y, linear, quadratic, t_start, t_end):
+    """
+    Return (min, t_min, max, t_max): the extremes of y(t) = prev_y + linear*t + quadratic*t**2
+    over [t_start, t_end] and where they are reached.
+    """
+    y_start = prev_y + (linear + quadratic * t_start) * t_start
+    y_end = prev_y + (linear + quadratic * t_end) * t_end
+    low, t_low = (y_start, t_start) if y_start <= y_end else (y_end, t_end)
+    high, t_high = (y_end, t_end) if y_start <= y_end else (y_start, t_start)
+    if quadratic != 0:
+        t_turn = -linear / (2 * quadratic)
+        if t_start < t_turn < t_end:
+            y_turn = prev_y + (linear + quadratic * t_turn) * t_turn
+            if y_turn < low:
+                low, t_low = y_turn, t_turn
+            if y_turn > high:
+                high, t_high = y_turn, t_turn
+    return low, t_low, high, t_high
+
+def collision_cause_swept(player, prev_y, obstacles, scroll_distance, dt=1, acceleration=0.0):
+    """
+    Return what the player collided with during the last step, with the same tests as
+    check_collision_swept (see collision_cause for the return values).
+    """
+    collision = find_collision_swept(player, prev_y, obstacles, scroll_distance, dt, acceleration)
+    return None if collision is None else collision[0]
+
+def find_collision_swept(player, prev_y, obstacles, scroll_distance, dt=1, acceleration=0.0):
+    """
+    Return what the player collided with during the last step, the obstacle hit and when,
+    with the same tests as check_collision_swept.
+
+    Returns:
+        tuple or None: (cause, obstacle, t) with the cause as in collision_cause, the obstacle
+                       None for the screen bounds, and t the fraction of the step at which the
+                       player reached the deepest point of the contact; None without a collision.
+    """
+    player_left = player.x
+    player_right = player.x + PLAYER_WIDTH
+    # The player's path over the step fraction t. At t = j/dt it passes through the position
+    # after j frames, prev_y + j*v + a*j*(j+1)/2 (see Player.update).
+    quadratic = acceleration * dt * dt / 2
+    linear = player.y - prev_y - quadratic
+
+    for obs in obstacles:
+        if scroll_distance > 0:
+            # The obstacle's left edge at step fraction t is obs.x + scroll_distance * (1 - t).
+            t_enter = max(0.0, 1.0 - (player_right - obs.x) / scroll_distance)
+            t_exit = min(1.0, 1.0 - (player_left - OBSTACLE_WIDTH - obs.x) / scroll_distance)
+            if t_enter >= t_exit:
+                continue
+        elif obs.x < player_right and (obs.x + OBSTACLE_WIDTH) > player_left:
+            t_enter, t_exit = 0.0, 1.0
+        else:
+            continue
 
-    # Check collision with screen boundaries (top and bottom)
-    if player.y < 0 or (player.y + player_rect.height) > SCREEN_HEIGHT:
-        return True
+        # Player rects use a truncated y, so compare the same way check_collision does.
+        y_low, t_low, y_high, t_high = _path_extent(prev_y, linear, quadratic, t_enter, t_exit)
+        if int(y_low) < obs.gap_y:
+            return TOP_BARRIER, obs, t_low
+        if int(y_high) + PLAYER_HEIGHT > obs.gap_y + obs.gap_height:
+            return BOTTOM_BARRIER, obs, t_high
 
-    return False
+    # Check collision with screen boundaries (top and bottom) anywhere along the path.
+    y_low, t_low, y_high, t_high = _path_extent(prev_y, linear, quadratic, 0.0, 1.0)
+    if y_low < 0:
+        return CEILING, None, t_low
+    if (y_high + PLAYER_HEIGHT) > SCREEN_HEIGHT:
+        return FLOOR, None, t_high
+    return None
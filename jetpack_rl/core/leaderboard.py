@@ -1,8 +1,12 @@
+import csv
 import json
 import os
+import numpy as np
 
 # Path to the leaderboard file.
 LEADERBOARD_PATH = "saves/leaderboard.json"
+# Path to the full score history (every game saved), one CSV row per game.
+SCORE_HISTORY_PATH = "saves/score_history.csv"
 
 def load_leaderboard():
     """
@@ -30,7 +34,8 @@ def save_score(name, score):
     Save a new score to the leaderboard.
     
     This function appends the new score, sorts the leaderboard in descending order,
-    and keeps only the top 10 entries.
+    and keeps only the top 10 entries. Every score is also appended to the full
+    score history (see append_score_history).
     
     Parameters:
         name (str): The player's name.
@@ -47,6 +52,22 @@ def save_score(name, score):
     os.makedirs(os.path.dirname(LEADERBOARD_PATH), exist_ok=True)
     with open(LEADERBOARD_PATH, "w") as f:
         json.dump(leaderboard, f, indent=2)
+    append_score_history(name, score)
+
+def append_score_history(name, score, path=SCORE_HISTORY_PATH):
+    """
+    Append one game to the score history.
+
+    Unlike the leaderboard, the history is never rewritten: a game costs one appended
+    CSV row, however long the history grows.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["name", "score"])
+        writer.writerow([name, score])
 
 def print_leaderboard():
     """
@@ -71,3 +92,59 @@ def get_leaderboard():
         list: A list of leaderboard entries.
     """
     return load_leaderboard()
+
+
+class RankedScores:
+    """
+    A score history ordered by rank, for views that page through it.
+
+    Scores are held in a NumPy array and names in a list, best first (ties keep the
+    order the games were played in). Rows are only built for the ranks asked for, so a
+    view of a million entries costs the same per frame as a view of ten.
+    """
+
+    def __init__(self, names, scores):
+        """
+        Parameters:
+            names (list): Player names, in the order the games were played.
+            scores (sequence): The matching scores.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        order = np.argsort(-scores, kind="stable")
+        self.scores = scores[order]
+        self.names = [names[i] for i in order.tolist()]
+        self._lower_names = None
+
+    def __len__(self):
+        return len(self.scores)
+
+    def rows(self, ranks):
+        """
+        Return (rank, name, score) for the given 0-based ranks, with 1-based ranks in the rows.
+        """
+        return [(int(rank) + 1, self.names[rank], self.scores[rank].item()) for rank in ranks]
+
+    def search(self, text):
+        """
+        Return the 0-based ranks of the entries whose name contains text (case-insensitive).
+        """
+        if self._lower_names is None:
+            self._lower_names = [name.lower() for name in self.names]
+        text = text.lower()
+        return np.array([rank for rank, name in enumerate(self._lower_names) if text in name], dtype=np.int64)
+
+def load_score_history(path=SCORE_HISTORY_PATH):
+    """
+    Load the score history ranked by score.
+
+    Falls back to the top-10 leaderboard when no history has been recorded yet.
+
+    Returns:
+        RankedScores: The ranked entries.
+    """
+    if not os.path.exists(path):
+        leaderboard = load_leaderboard()
+        return RankedScores([entry["name"] for entry in leaderboard], [entry["score"] for entry in leaderboard])
+    import pandas as pd
+    history = pd.read_csv(path, dtype={"name": str}, keep_default_na=False)
+    return RankedScores(history["name"].tolist(), history["score"].to_numpy(dtype=np.float64))
@@ -0,0 +1,240 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram buckets (upper bounds) for latencies in seconds, and for episode lengths and rewards.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+LENGTH_BUCKETS = (60, 120, 300, 600, 1200, 3000, 6000, 12000, 18000)
+REWARD_BUCKETS = (-100, -50, 0, 50, 100, 300, 1000, 3000, 10000)
+
+
+class Counter:
+    """
+    A monotonically increasing count.
+
+    Updates are plain attribute increments without a lock: each metric is meant to be
+    written by a single thread (the game or training loop), and the server thread only
+    reads it, so the hot loop pays the cost of an addition and nothing else.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self):
+        return [(self.name, "", self.value)]
+
+
+class Gauge:
+    """
+    A value that can go up and down (e.g. frames per second).
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self):
+        return [(self.name, "", self.value)]
+
+
+class RateGauge:
+    """
+    The per-second rate of a counter, computed when the metrics are scraped.
+
+    The hot loop only increments the counter; the rate over the interval since the
+    previous scrape is derived on the server thread.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, counter):
+        self.name = name
+        self.help_text = help_text
+        self.counter = counter
+        self._last = (time.perf_counter(), counter.value)
+
+    def samples(self):
+        now, value = time.perf_counter(), self.counter.value
+        last_time, last_value = self._last
+        self._last = (now, value)
+        rate = (value - last_value) / (now - last_time) if now > last_time else 0.0
+        return [(self.name, "", rate)]
+
+
+class Histogram:
+    """
+    A distribution of observed values over fixed buckets.
+
+    observe() does a binary search over the bucket bounds and increments one count; the
+    cumulative bucket counts of the Prometheus format are only built when scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # The last count is the +Inf bucket.
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        counts = list(self.counts)
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            samples.append((f"{self.name}_bucket", f'{{le="{bound}"}}', cumulative))
+        samples.append((f"{self.name}_sum", "", self.sum))
+        samples.append((f"{self.name}_count", "", cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    A named collection of metrics, rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _add(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name!r} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text):
+        return self._add(Counter(name, help_text))
+
+    def gauge(self, name, help_text):
+        return self._add(Gauge(name, help_text))
+
+    def rate(self, name, help_text, counter):
+        return self._add(RateGauge(name, help_text, counter))
+
+    def histogram(self, name, help_text, buckets):
+        return self._add(Histogram(name, help_text, buckets))
+
+    def render(self):
+        """
+        Return all metrics as Prometheus text.
+        """
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class GameMetrics:
+    """
+    The standard set of game and training metrics shared by the scripts.
+
+    Attributes:
+        steps: Environment steps taken.
+        steps_per_second: Step rate since the previous scrape.
+        step_seconds: Time spent in environment steps.
+        inference_seconds: Time spent choosing actions with the policy.
+        fps: Rendered frames per second.
+        episodes, episode_length, episode_reward: Finished episodes and their distributions.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.steps = r.counter("jetpack_env_steps_total", "Environment steps taken.")
+        self.steps_per_second = r.rate("jetpack_env_steps_per_second", "Environment steps per second since the previous scrape.", self.steps)
+        self.step_seconds = r.histogram("jetpack_env_step_seconds", "Duration of an environment step.", LATENCY_BUCKETS)
+        self.inference_seconds = r.histogram("jetpack_policy_inference_seconds", "Duration of a policy forward pass.", LATENCY_BUCKETS)
+        self.fps = r.gauge("jetpack_render_fps", "Rendered frames per second.")
+        self.episodes = r.counter("jetpack_episodes_total", "Finished episodes.")
+        self.episode_length = r.histogram("jetpack_episode_length_frames", "Length of finished episodes, in frames.", LENGTH_BUCKETS)
+        self.episode_reward = r.histogram("jetpack_episode_reward", "Total reward of finished episodes.", REWARD_BUCKETS)
+
+    def record_step(self, seconds):
+        self.steps.inc()
+        self.step_seconds.observe(seconds)
+
+    def record_episode(self, length, reward):
+        self.episodes.inc()
+        self.episode_length.observe(length)
+        self.episode_reward.observe(reward)
+
+
+class MetricsServer:
+    """
+    Serve a registry's metrics over HTTP on a background daemon thread.
+
+    GET /metrics returns the Prometheus text. The server binds to localhost by default
+    and never blocks the loop that updates the metrics.
+    """
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        """
+        Parameters:
+            registry (MetricsRegistry): Metrics to serve.
+            port (int): Port to listen on (0 picks a free one; see the port attribute).
+            host (str): Interface to bind to.
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes are frequent; keep them out of the training output.
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.host = host
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """
+    Create the standard game metrics and serve them on the given port.
+
+    Returns:
+        tuple: (GameMetrics, MetricsServer).
+    """
+    metrics = GameMetrics()
+    server = MetricsServer(metrics.registry, port, host).start()
+    print(f"Serving metrics on http://{host}:{server.port}/metrics")
+    return metrics, server
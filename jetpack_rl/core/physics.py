@@ -0,0 +1,87 @@
+from core.config import PHYSICS_VARIANT
+
+# Per-episode physics and difficulty parameters of the environments, in sampling order.
+PHYSICS_PARAMS = ("gravity", "thrust", "scroll_speed", "min_gap", "max_gap", "spawn_spacing")
+# Parameters drawn as whole numbers, so obstacles stay on whole pixels.
+INTEGER_PARAMS = ("scroll_speed", "min_gap", "max_gap")
+
+# Named physics distributions for experiments. Each maps parameters to a distribution:
+#   a number                   - a constant, overriding the environment's own value
+#   ("uniform", low, high)     - uniform between low and high (integers for INTEGER_PARAMS)
+#   ("choice", [a, b, ...])    - one of the listed values
+# Parameters left out keep the environment's value. "fixed" samples nothing.
+PHYSICS_VARIANTS = {
+    "fixed": {},
+    "randomized": {
+        "gravity": ("uniform", 0.3, 0.5),
+        "thrust": ("uniform", -1.2, -0.8),
+        "scroll_speed": ("choice", [4, 5, 6]),
+        "min_gap": ("uniform", 250, 350),
+        "max_gap": ("uniform", 400, 500),
+    },
+}
+
+def get_physics_distributions(physics=PHYSICS_VARIANT):
+    """
+    Return the distributions of a physics variant name (see PHYSICS_VARIANTS), or check and
+    pass a distributions dict through. None means "fixed".
+    """
+    if physics is None:
+        return {}
+    if isinstance(physics, str):
+        try:
+            return PHYSICS_VARIANTS[physics]
+        except KeyError:
+            raise ValueError(f"unknown physics variant {physics!r}; choose from {sorted(PHYSICS_VARIANTS)}") from None
+    for name, spec in physics.items():
+        if name not in PHYSICS_PARAMS:
+            raise ValueError(f"unknown physics parameter {name!r}; choose from {PHYSICS_PARAMS}")
+        if isinstance(spec, (list, tuple)) and (not spec or spec[0] not in ("uniform", "choice")):
+            raise ValueError(f"{name}: expected a number, ('uniform', low, high) or ('choice', values), got {spec!r}")
+    return physics
+
+def _sample(name, spec, rng):
+    if not isinstance(spec, (list, tuple)):
+        return spec
+    if spec[0] == "choice":
+        return rng.choice(spec[1])
+    low, high = spec[1], spec[2]
+    if name in INTEGER_PARAMS:
+        return rng.randint(int(low), int(high))
+    return rng.uniform(low, high)
+
+def sample_physics(distributions, rng, defaults):
+    """
+    Draw one episode's physics parameters.
+
+    Parameters:
+        distributions (dict): Distributions per parameter (see get_physics_distributions).
+        rng (random.Random): Random source; the environment's course generator, so a seed
+                             fixes both the physics and the course.
+        defaults (dict): Values of the parameters without a distribution.
+
+    Returns:
+        dict: A value for every name in PHYSICS_PARAMS.
+
+    Explanation:
+        Parameters are drawn in PHYSICS_PARAMS order and only random ones consume draws, so
+        without distributions the course generated from a seed is unchanged. If the drawn gap
+        range is empty, max_gap is raised to min_gap.
+    """
+    physics = dict(defaults)
+    for name in PHYSICS_PARAMS:
+        if name in distributions:
+            physics[name] = _sample(name, distributions[name], rng)
+    if physics["min_gap"] > physics["max_gap"]:
+        physics["max_gap"] = physics["min_gap"]
+    return physics
+
+def param_range(name, distributions, defaults):
+    """
+    Return the (lowest, highest) value a parameter can be drawn with (see sample_physics).
+    """
+    spec = distributions.get(name, defaults[name])
+    if not isinstance(spec, (list, tuple)):
+        return spec, spec
+    values = spec[1] if spec[0] == "choice" else spec[1:3]
+    return min(values), max(values)
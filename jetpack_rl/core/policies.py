@@ -0,0 +1,202 @@
+import numpy as np
+
+class MLPPolicy:
+    """
+    A small NumPy multilayer perceptron that maps observations to actions.
+
+    The policy has no trainable state of its own: its weights are one flat parameter
+    vector, so gradient-free trainers can perturb, average and evaluate many parameter
+    vectors at once (see act_batch). Observations are scaled to [-1, 1] with the
+    environment's observation bounds before the first layer.
+    """
+
+    def __init__(self, obs_low, obs_high, hidden_sizes=(32,), n_actions=2, params=None):
+        """
+        Parameters:
+            obs_low, obs_high (np.ndarray): Observation bounds (see JetpackEnv.observation_bounds).
+            hidden_sizes (tuple): Width of every hidden layer.
+            n_actions (int): Number of discrete actions.
+            params (np.ndarray, optional): Flat parameter vector. Defaults to zeros.
+        """
+        self.obs_low = np.asarray(obs_low, dtype=np.float64)
+        self.obs_high = np.asarray(obs_high, dtype=np.float64)
+        self.hidden_sizes = tuple(int(size) for size in hidden_sizes)
+        self.n_actions = n_actions
+        sizes = (len(self.obs_low),) + self.hidden_sizes + (n_actions,)
+        self.layer_shapes = list(zip(sizes[:-1], sizes[1:]))
+        self.num_params = sum(n_in * n_out + n_out for n_in, n_out in self.layer_shapes)
+        self.params = np.zeros(self.num_params) if params is None else np.asarray(params, dtype=np.float64)
+        if self.params.shape != (self.num_params,):
+            raise ValueError(f"expected {self.num_params} parameters, got {self.params.shape}")
+
+    def initial_params(self, rng):
+        """
+        Return a randomly initialized parameter vector (scaled by fan-in, zero biases).
+        """
+        chunks = []
+        for n_in, n_out in self.layer_shapes:
+            chunks.append(rng.standard_normal(n_in * n_out) / np.sqrt(n_in))
+            chunks.append(np.zeros(n_out))
+        return np.concatenate(chunks)
+
+    def _layers(self, params):
+        """
+        Split (K, num_params) parameter vectors into per-layer (K, n_in, n_out) weights and (K, n_out) biases.
+        """
+        offset = 0
+        for n_in, n_out in self.layer_shapes:
+            weights = params[:, offset:offset + n_in * n_out].reshape(-1, n_in, n_out)
+            offset += n_in * n_out
+            biases = params[:, offset:offset + n_out]
+            offset += n_out
+            yield weights, biases
+
+    def act_batch(self, params, obs):
+        """
+        Choose actions for K observations, each with its own parameter vector.
+
+        Parameters:
+            params (np.ndarray): (K, num_params) parameter vectors.
+            obs (np.ndarray): (K, obs_dim) observations.
+
+        Returns:
+            np.ndarray: (K,) greedy actions.
+        """
+        h = 2.0 * (obs - self.obs_low) / (self.obs_high - self.obs_low) - 1.0
+        layers = list(self._layers(params))
+        for index, (weights, biases) in enumerate(layers):
+            h = np.einsum("ki,kio->ko", h, weights) + biases
+            if index < len(layers) - 1:
+                h = np.tanh(h)
+        return h.argmax(axis=1)
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """
+        Return (action, state) like a Stable-Baselines3 model, so evaluation code can use either.
+
+        Parameters:
+            observation (np.ndarray): An (obs_dim,) observation or an (N, obs_dim) batch.
+        """
+        obs = np.asarray(observation, dtype=np.float64)
+        single = obs.ndim == 1
+        obs = obs.reshape(-1, len(self.obs_low))
+        params = np.broadcast_to(self.params, (len(obs), self.num_params))
+        actions = self.act_batch(params, obs)
+        return (int(actions[0]) if single else actions), state
+
+    def save(self, path):
+        """
+        Save the policy (architecture, observation bounds and parameters) to an .npz file.
+        """
+        np.savez(path, params=self.params, obs_low=self.obs_low, obs_high=self.obs_high,
+                 hidden_sizes=np.array(self.hidden_sizes), n_actions=self.n_actions)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a policy saved with save().
+        """
+        data = np.load(path)
+        return cls(data["obs_low"], data["obs_high"], hidden_sizes=tuple(data["hidden_sizes"]),
+                   n_actions=int(data["n_actions"]), params=data["params"])
+
+class LookupTablePolicy:
+    """
+    A policy distilled into a table of actions over a quantized observation grid.
+
+    Every observation dimension is split into equal-width bins between the observation
+    bounds; an observation's cell is found with a few integer operations and its action
+    is read from a uint8 table. Observations outside the bounds fall into the edge bins.
+    """
+
+    def __init__(self, obs_low, obs_high, bins, table=None):
+        """
+        Parameters:
+            obs_low, obs_high (np.ndarray): Observation bounds (see JetpackEnv.observation_bounds).
+            bins (sequence): Number of bins per observation dimension (1 ignores a dimension).
+            table (np.ndarray, optional): uint8 action per cell, flattened in C order. Defaults to zeros.
+        """
+        self.obs_low = np.asarray(obs_low, dtype=np.float64)
+        self.obs_high = np.asarray(obs_high, dtype=np.float64)
+        self.bins = np.asarray(bins, dtype=np.int64)
+        if self.bins.shape != self.obs_low.shape or (self.bins < 1).any():
+            raise ValueError(f"expected {len(self.obs_low)} positive bin counts, got {list(bins)}")
+        self.num_cells = int(np.prod(self.bins))
+        self.table = np.zeros(self.num_cells, dtype=np.uint8) if table is None else np.asarray(table, dtype=np.uint8)
+        if self.table.shape != (self.num_cells,):
+            raise ValueError(f"expected a table of {self.num_cells} cells, got {self.table.shape}")
+        self.scale = self.bins / (self.obs_high - self.obs_low)
+        # Flat index = sum(cell * stride), with C-order strides.
+        self.strides = np.concatenate([np.cumprod(self.bins[::-1])[::-1][1:], [1]]).astype(np.int64)
+        # Plain Python copies for the single-observation path, which avoids NumPy call overhead.
+        self._dims = list(zip(self.obs_low.tolist(), self.scale.tolist(), (self.bins - 1).tolist(), self.strides.tolist()))
+
+    def cells(self, obs):
+        """
+        Return the flat cell index of every observation in an (N, obs_dim) batch.
+        """
+        cell = ((np.asarray(obs, dtype=np.float64) - self.obs_low) * self.scale).astype(np.int64)
+        np.clip(cell, 0, self.bins - 1, out=cell)
+        return cell @ self.strides
+
+    def cell_centers(self, cells):
+        """
+        Return the observation at the center of each given cell.
+        """
+        cell = (np.asarray(cells, dtype=np.int64)[:, None] // self.strides) % self.bins
+        return self.obs_low + (cell + 0.5) / self.scale
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """
+        Return (action, state) like a Stable-Baselines3 model.
+
+        Parameters:
+            observation (np.ndarray): An (obs_dim,) observation or an (N, obs_dim) batch.
+        """
+        if np.ndim(observation) == 1:
+            index = 0
+            for value, (low, scale, last, stride) in zip(observation.tolist(), self._dims):
+                cell = int((value - low) * scale)
+                index += (0 if cell < 0 else last if cell > last else cell) * stride
+            return int(self.table[index]), state
+        return self.table[self.cells(observation)].astype(np.int64), state
+
+    def save(self, path):
+        """
+        Save the table and its grid to an .npz file.
+        """
+        np.savez_compressed(path, table=self.table, bins=self.bins, obs_low=self.obs_low, obs_high=self.obs_high)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a table saved with save().
+        """
+        data = np.load(path)
+        return cls(data["obs_low"], data["obs_high"], data["bins"], table=data["table"])
+
+def load_policy(path):
+    """
+    Load a trained policy for evaluation.
+
+    Parameters:
+        path (str): An .npz file saved by MLPPolicy (e.g. by the evolution strategies trainer)
+                    or LookupTablePolicy (by the distillation tool), a .pt Stable-Baselines3 policy
+                    file (e.g. the best checkpoint of background evaluation), a PPO model, or
+                    "unix:<socket path>" to use a running policy server (see core.policy_server).
+
+    Returns:
+        An object with an SB3-style predict(obs) method.
+    """
+    if path.startswith("unix:"):
+        from core.policy_server import PolicyClient
+        return PolicyClient(path[len("unix:"):])
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            is_table = "table" in data.files
+        return LookupTablePolicy.load(path) if is_table else MLPPolicy.load(path)
+    if path.endswith(".pt"):
+        from stable_baselines3.common.policies import ActorCriticPolicy
+        return ActorCriticPolicy.load(path)
+    from stable_baselines3 import PPO
+    return PPO.load(path)
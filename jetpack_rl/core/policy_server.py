@@ -0,0 +1,357 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+import numpy as np
+
+from core.metrics import MetricsRegistry, LATENCY_BUCKETS
+from core.policies import load_policy
+
+DEFAULT_SOCKET_PATH = "/tmp/jetpack_policy.sock"
+
+# Request: op (uint8), observation rows (uint16), payload bytes (uint32), then the payload.
+# Response: status (uint8, 0 for success), payload bytes (uint32), then the payload.
+REQUEST_HEADER = struct.Struct("<BHI")
+RESPONSE_HEADER = struct.Struct("<BI")
+OP_PREDICT = 1  # float32 observations in, int32 actions out
+OP_STATS = 2    # JSON statistics out
+OP_RELOAD = 3   # UTF-8 model path in (empty: reload the current one), JSON model info out
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+def _recv_exact(sock, size):
+    """
+    Read exactly size bytes from a socket, or return None if the peer closed the connection.
+    """
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            return None
+        received += count
+    return bytes(data)
+
+
+def _observation_size(policy):
+    """
+    Return the number of observation values a policy takes, or None if it cannot tell.
+    """
+    if hasattr(policy, "obs_low"):
+        return len(policy.obs_low)
+    space = getattr(policy, "observation_space", None)
+    if space is not None and space.shape:
+        return int(np.prod(space.shape))
+    return None
+
+
+def _model_file(path):
+    """
+    Return the file a model path refers to, or None if there is none (e.g. a socket address).
+    PPO models are saved and loaded without their .zip extension.
+    """
+    for candidate in (path, path + ".zip"):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def _model_mtime(path):
+    model_file = _model_file(path)
+    return os.path.getmtime(model_file) if model_file is not None else None
+
+
+class _Request:
+    """
+    Observations waiting for the batcher, and the slot for their actions.
+    """
+
+    __slots__ = ("observations", "received", "done", "actions", "error")
+
+    def __init__(self, observations):
+        self.observations = observations
+        self.received = time.perf_counter()
+        self.done = threading.Event()
+        self.actions = None
+        self.error = None
+
+
+class PolicyServer:
+    """
+    Serve a trained policy to local processes over a Unix socket, batching concurrent requests.
+
+    Every client connection is handled on its own thread, which queues its observations
+    and waits. Observations of the wrong size are rejected before they are queued, so one
+    misbehaving client cannot fail the batches of the others. A single batcher thread takes
+    the first waiting request and, while fewer requests than connected clients are in hand,
+    keeps collecting for up to max_wait seconds; it then runs one batched predict for all of
+    them. A lone client is therefore never delayed, and concurrent clients share forward passes.
+
+    The model is loaded once (with core.policies.load_policy, so PPO models, .pt policies
+    and .npz policies all work) and can be swapped without a restart, on request or when
+    the model file changes. Requests in flight finish on the model they started with.
+    """
+
+    def __init__(self, model_path, socket_path=DEFAULT_SOCKET_PATH, max_batch=256, max_wait=0.002,
+                 registry=None):
+        """
+        Parameters:
+            model_path (str): Model to serve.
+            socket_path (str): Unix socket to listen on (replaced if it exists).
+            max_batch (int): Most observations per forward pass.
+            max_wait (float): Longest time (seconds) a batch waits for more requests.
+            registry (MetricsRegistry, optional): Registry to add the server's metrics to.
+        """
+        self.model_path = model_path
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.policy = load_policy(model_path)
+        self.observation_size = _observation_size(self.policy)
+        self.model_mtime = _model_mtime(model_path)
+        self._failed_mtime = None
+        self.reloads = 0
+        self.clients = 0
+        self._clients_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._stop = threading.Event()
+
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.requests = r.counter("policy_server_requests_total", "Predict requests served.")
+        self.observations = r.counter("policy_server_observations_total", "Observations served.")
+        self.requests_per_second = r.rate("policy_server_requests_per_second", "Predict requests per second since the previous scrape.", self.requests)
+        self.latency = r.histogram("policy_server_request_seconds", "Time from receiving a request to its actions being ready.", LATENCY_BUCKETS)
+        self.inference = r.histogram("policy_server_inference_seconds", "Duration of a batched forward pass.", LATENCY_BUCKETS)
+        self.batch_size = r.histogram("policy_server_batch_observations", "Observations per batched forward pass.", BATCH_SIZE_BUCKETS)
+
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with server._clients_lock:
+                    server.clients += 1
+                try:
+                    server._serve_connection(self.request)
+                finally:
+                    with server._clients_lock:
+                        server.clients -= 1
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        self.server.daemon_threads = True
+        self._threads = [threading.Thread(target=self.server.serve_forever, daemon=True),
+                         threading.Thread(target=self._batch_loop, daemon=True)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._requests.put(None)
+        self.server.shutdown()
+        self.server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def _serve_connection(self, sock):
+        while True:
+            header = _recv_exact(sock, REQUEST_HEADER.size)
+            if header is None:
+                return
+            op, rows, size = REQUEST_HEADER.unpack(header)
+            payload = _recv_exact(sock, size) if size else b""
+            if payload is None:
+                return
+            try:
+                if op == OP_PREDICT:
+                    response = self._predict(np.frombuffer(payload, dtype=np.float32).reshape(rows, -1))
+                elif op == OP_STATS:
+                    response = json.dumps(self.stats()).encode()
+                elif op == OP_RELOAD:
+                    response = json.dumps(self.reload(payload.decode() or None)).encode()
+                else:
+                    raise ValueError(f"unknown operation {op}")
+                status = STATUS_OK
+            except Exception as error:
+                response = f"{type(error).__name__}: {error}".encode()
+                status = STATUS_ERROR
+            sock.sendall(RESPONSE_HEADER.pack(status, len(response)) + response)
+
+    def _predict(self, observations):
+        size = self.observation_size
+        if size is not None and observations.shape[1] != size:
+            raise ValueError(f"expected observations of {size} values, got {observations.shape[1]}")
+        request = _Request(observations)
+        self._requests.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.actions.astype(np.int32).tobytes()
+
+    def _batch_loop(self):
+        while not self._stop.is_set():
+            first = self._requests.get()
+            if first is None:
+                return
+            batch = [first]
+            rows = len(first.observations)
+            deadline = time.perf_counter() + self.max_wait
+            # Wait for more requests only while other connected clients may still send theirs.
+            while rows < self.max_batch:
+                try:
+                    if len(batch) >= self.clients:
+                        request = self._requests.get_nowait()
+                    else:
+                        request = self._requests.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._stop.set()
+                    break
+                batch.append(request)
+                rows += len(request.observations)
+            self._run_batch(batch, rows)
+
+    def _run_batch(self, batch, rows):
+        policy = self.policy
+        start = time.perf_counter()
+        try:
+            observations = np.concatenate([request.observations for request in batch])
+            actions, _ = policy.predict(observations, deterministic=True)
+            actions = np.asarray(actions).reshape(-1)
+            error = None
+        except Exception as exception:
+            error = exception
+        finished = time.perf_counter()
+        self.inference.observe(finished - start)
+        self.batch_size.observe(rows)
+
+        offset = 0
+        for request in batch:
+            count = len(request.observations)
+            if error is None:
+                request.actions = actions[offset:offset + count]
+            else:
+                request.error = error
+            offset += count
+            self.requests.inc()
+            self.observations.inc(count)
+            self.latency.observe(finished - request.received)
+            request.done.set()
+
+    def reload(self, model_path=None):
+        """
+        Load a model (by default the current model file again) and serve it from the next batch on.
+
+        Returns:
+            dict: The served model path and the number of reloads.
+        """
+        with self._reload_lock:
+            path = model_path or self.model_path
+            policy = load_policy(path)
+            self.policy = policy
+            self.observation_size = _observation_size(policy)
+            self.model_path = path
+            self.model_mtime = _model_mtime(path)
+            self.reloads += 1
+        return {"model": self.model_path, "reloads": self.reloads}
+
+    def reload_if_changed(self):
+        """
+        Reload the model if its file was modified since it was loaded.
+
+        If loading fails (e.g. the file is still being written), the current model keeps
+        being served, the error is raised, and the file is tried again once it changes.
+
+        Returns:
+            bool: True if the model was reloaded.
+        """
+        mtime = _model_mtime(self.model_path)
+        if mtime is None:
+            return False
+        if (self.model_mtime is not None and mtime <= self.model_mtime) or mtime == self._failed_mtime:
+            return False
+        try:
+            self.reload()
+        except Exception:
+            self._failed_mtime = mtime
+            raise
+        return True
+
+    def stats(self):
+        """
+        Return a summary of the traffic served so far.
+        """
+        batches = sum(self.batch_size.counts)
+        requests = self.requests.value
+        return {
+            "model": self.model_path,
+            "reloads": self.reloads,
+            "clients": self.clients,
+            "requests": requests,
+            "observations": self.observations.value,
+            "batches": batches,
+            "mean_batch_observations": self.observations.value / batches if batches else 0.0,
+            "mean_latency_ms": 1000 * self.latency.sum / requests if requests else 0.0,
+            "mean_inference_ms": 1000 * self.inference.sum / batches if batches else 0.0,
+        }
+
+
+class PolicyClient:
+    """
+    A connection to a PolicyServer with the predict() interface of a Stable-Baselines3 model.
+
+    The server always acts deterministically, whatever deterministic is passed.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, timeout=None):
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+
+    def _call(self, op, rows=0, payload=b""):
+        self.sock.sendall(REQUEST_HEADER.pack(op, rows, len(payload)) + payload)
+        header = _recv_exact(self.sock, RESPONSE_HEADER.size)
+        if header is None:
+            raise ConnectionError("policy server closed the connection")
+        status, size = RESPONSE_HEADER.unpack(header)
+        response = _recv_exact(self.sock, size) if size else b""
+        if response is None:
+            raise ConnectionError("policy server closed the connection")
+        if status != STATUS_OK:
+            raise RuntimeError(f"policy server error: {response.decode()}")
+        return response
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """
+        Return (action, state) for an (obs_dim,) observation or an (N, obs_dim) batch.
+        """
+        obs = np.ascontiguousarray(observation, dtype=np.float32)
+        single = obs.ndim == 1
+        obs = obs.reshape(1, -1) if single else obs
+        actions = np.frombuffer(self._call(OP_PREDICT, len(obs), obs.tobytes()), dtype=np.int32)
+        return (int(actions[0]) if single else actions.astype(np.int64)), state
+
+    def stats(self):
+        return json.loads(self._call(OP_STATS))
+
+    def reload(self, model_path=None):
+        """
+        Ask the server to swap to another model file (or to reload its current one).
+        """
+        return json.loads(self._call(OP_RELOAD, payload=(model_path or "").encode()))
+
+    def close(self):
+        self.sock.close()
@@ -1,14 +1,29 @@
 import random
-from core.config import SCREEN_WIDTH, SCREEN_HEIGHT, OBSTACLE_WIDTH, GAP_HEIGHT
+import multiprocessing as mp
+import numpy as np
+from core.config import (SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, OBSTACLE_WIDTH, GAP_HEIGHT, SCROLL_SPEED,
+                         OBSTACLE_SPAWN_FRACTION)
 from envs.entities import Obstacle
 
-def generate_obstacle(x_position=None):
+# Keep gaps at least this far (in pixels) from the top and bottom of the screen.
+GAP_MARGIN = 50
+# Range of the dynamic gap height, for difficulty control.
+MIN_GAP_HEIGHT = 300
+MAX_GAP_HEIGHT = 500
+# Distance the last obstacle scrolls in from the right edge before the next one spawns.
+SPAWN_SPACING = SCREEN_WIDTH * (1 - OBSTACLE_SPAWN_FRACTION)
+
+def generate_obstacle(x_position=None, min_gap=MIN_GAP_HEIGHT, max_gap=MAX_GAP_HEIGHT, rng=random):
     """
     Generate a new obstacle with a randomized gap position.
     
     Parameters:
         x_position (int, optional): The x coordinate where the obstacle will be placed.
                                     Defaults to SCREEN_WIDTH (i.e. the right edge of the screen).
+        min_gap (int): Smallest gap height. Defaults to MIN_GAP_HEIGHT.
+        max_gap (int): Largest gap height. Defaults to MAX_GAP_HEIGHT.
+        rng (random.Random, optional): Random source, for reproducible courses. Defaults to the
+                                       global random module.
     
     Returns:
         Obstacle: A new obstacle instance with a top barrier, a bottom barrier, and a gap.
@@ -21,16 +36,26 @@ def generate_obstacle(x_position=None):
     if x_position is None:
         x_position = SCREEN_WIDTH
 
-    margin = 50
+    gap_y, dynamic_gap_height = sample_gap(min_gap, max_gap, rng)
+    return Obstacle(x_position, gap_y, dynamic_gap_height)
+
+def sample_gap(min_gap=MIN_GAP_HEIGHT, max_gap=MAX_GAP_HEIGHT, rng=random):
+    """
+    Draw the gap of a new obstacle, as generate_obstacle() does.
+
+    Returns:
+        tuple: (gap_y, gap_height) integers.
+
+    Explanation:
+        Engines that keep obstacles in arrays draw from the same random source in the same
+        order as generate_obstacle(), so a seed gives them the same course as JetpackEnv.
+    """
     # Randomize gap_y as before
-    gap_y = random.randint(margin, SCREEN_HEIGHT - GAP_HEIGHT - margin)
+    gap_y = rng.randint(GAP_MARGIN, SCREEN_HEIGHT - GAP_HEIGHT - GAP_MARGIN)
     
     # Introduce dynamic gap height: choose a gap height in a given range.
-    min_gap = 300  # Minimum gap height for difficulty control
-    max_gap = 500  # Maximum gap height
-    dynamic_gap_height = random.randint(min_gap, max_gap)
-    
-    return Obstacle(x_position, gap_y, dynamic_gap_height)
+    dynamic_gap_height = rng.randint(min_gap, max_gap)
+    return gap_y, dynamic_gap_height
 
 def get_next_obstacles(window_x, obstacles):
     """
@@ -52,3 +77,186 @@ def get_next_obstacles(window_x, obstacles):
     # Filter obstacles: Only keep obstacles whose right edge is still to the right of window_x.
     next_obstacles = [obs for obs in obstacles if (obs.x + OBSTACLE_WIDTH) > window_x]
     return next_obstacles
+
+
+def obstacle_spacing(scroll_speed=SCROLL_SPEED):
+    """
+    Return the horizontal distance between consecutive obstacles in the environment.
+    
+    The environment spawns an obstacle at SCREEN_WIDTH once the previous one has scrolled left of
+    SCREEN_WIDTH * OBSTACLE_SPAWN_FRACTION, moving scroll_speed pixels per frame, so the spacing is
+    the first multiple of scroll_speed that crosses that threshold.
+    """
+    frames = int((SCREEN_WIDTH - SCREEN_WIDTH * OBSTACLE_SPAWN_FRACTION) // scroll_speed) + 1
+    return frames * scroll_speed
+
+def generate_obstacles(n, rng=None, x_start=SCREEN_WIDTH, spacing=None, min_gap=MIN_GAP_HEIGHT, max_gap=MAX_GAP_HEIGHT):
+    """
+    Generate n obstacles at once as plain arrays.
+    
+    Parameters:
+        n (int): Number of obstacles to generate.
+        rng (np.random.Generator, optional): Random generator. Defaults to a freshly seeded one.
+        x_start (int): The x coordinate of the first obstacle.
+        spacing (int, optional): Distance between consecutive obstacles. Defaults to obstacle_spacing().
+        min_gap, max_gap (int): Range of the gap heights, as in generate_obstacle().
+    
+    Returns:
+        tuple: (x, gap_y, gap_height) integer arrays of length n, sorted by x.
+    
+    Explanation:
+        This is the bulk counterpart of generate_obstacle(): gap positions and heights are drawn from
+        the same ranges, but no Obstacle objects (or pygame Rects) are built. Batch environments,
+        planners and course caches can generate and query thousands of obstacles per call.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if spacing is None:
+        spacing = obstacle_spacing()
+
+    x = x_start + spacing * np.arange(n, dtype=np.int64)
+    # Generator.integers excludes the upper bound, unlike random.randint.
+    gap_y = rng.integers(GAP_MARGIN, SCREEN_HEIGHT - GAP_HEIGHT - GAP_MARGIN + 1, size=n)
+    gap_height = rng.integers(min_gap, max_gap + 1, size=n)
+    return x, gap_y, gap_height
+
+def get_next_obstacle_arrays(window_x, x, gap_y, gap_height, assume_sorted=True):
+    """
+    Retrieve the obstacles that are still ahead of a given x-coordinate, from obstacle arrays.
+    
+    Parameters:
+        window_x (int): The x coordinate representing the current view or player's x position.
+        x, gap_y, gap_height (np.ndarray): Obstacle arrays, as returned by generate_obstacles().
+        assume_sorted (bool): Whether x is sorted in ascending order. Sorted arrays are cut with
+                              a binary search (and returned as views); unsorted ones are filtered
+                              with a boolean mask.
+    
+    Returns:
+        tuple: (x, gap_y, gap_height) arrays of the obstacles whose right edge is past window_x.
+    
+    Explanation:
+        This is the array counterpart of get_next_obstacles().
+    """
+    if assume_sorted:
+        # x + OBSTACLE_WIDTH > window_x  <=>  x > window_x - OBSTACLE_WIDTH
+        start = np.searchsorted(x, window_x - OBSTACLE_WIDTH, side="right")
+        return x[start:], gap_y[start:], gap_height[start:]
+    mask = (x + OBSTACLE_WIDTH) > window_x
+    return x[mask], gap_y[mask], gap_height[mask]
+
+
+class CurriculumScheduler:
+    """
+    Adaptive difficulty: the gap height, the spread of gap heights and the spacing between
+    obstacles follow a difficulty level that rises while episodes succeed and falls while
+    they fail.
+
+    The trainer records finished episodes; once a window of episodes has been played at the
+    current level, the level steps up if the success rate is above promote, or down if it is
+    below demote, and the window starts over. An episode succeeds when it survives
+    target_frames frames (or reaches the time limit).
+
+    The current parameters live in a shared array, so environments in other processes
+    (e.g. SubprocVecEnv workers created with the scheduler) read the latest schedule on reset.
+    Environments take it through their curriculum argument.
+    """
+
+    FIELDS = ("level", "min_gap", "max_gap", "spawn_spacing", "success_rate")
+    # Difficulty endpoints: gap height (center of the range), spread (half-width of the range)
+    # and spawn spacing, in pixels. Level 0.5 is about the default game (gaps 300-500, spacing ~273).
+    EASY = {"gap_height": 500, "gap_spread": 25, "spawn_spacing": 400}
+    HARD = {"gap_height": 300, "gap_spread": 175, "spawn_spacing": 150}
+
+    def __init__(self, target_frames=1000, window=50, promote=0.7, demote=0.3, step=0.05, level=0.0,
+                 easy=None, hard=None, ctx=None):
+        """
+        Parameters:
+            target_frames (int): Frames an episode must survive to count as a success.
+            window (int): Episodes played at a level before it is reconsidered.
+            promote, demote (float): Success rates above / below which the level changes.
+            step (float): Level change per decision; levels range from 0 (easy) to 1 (hard).
+            level (float): Starting level.
+            easy, hard (dict): Difficulty endpoints (see EASY and HARD).
+            ctx: Multiprocessing context used to create the shared array. Defaults to the default context.
+        """
+        if not 0 <= demote < promote <= 1:
+            raise ValueError(f"expected 0 <= demote < promote <= 1, got demote={demote}, promote={promote}")
+        self.target_frames = target_frames
+        self.window = window
+        self.promote = promote
+        self.demote = demote
+        self.step = step
+        self.easy = dict(self.EASY, **(easy or {}))
+        self.hard = dict(self.HARD, **(hard or {}))
+        self.episodes = 0
+        self._successes = np.zeros(window, dtype=bool)
+        self._filled = 0
+        self._shared = (ctx or mp).Array("d", len(self.FIELDS))
+        self._publish(level, 0.0)
+
+    def schedule(self, level):
+        """
+        Return the environment parameters (min_gap, max_gap, spawn_spacing) of a difficulty level.
+        """
+        def lerp(name):
+            return self.easy[name] + (self.hard[name] - self.easy[name]) * level
+        center, spread = lerp("gap_height"), lerp("gap_spread")
+        min_gap = max(PLAYER_HEIGHT + 1, int(round(center - spread)))
+        return {"min_gap": min_gap, "max_gap": max(min_gap, int(round(center + spread))),
+                "spawn_spacing": max(OBSTACLE_WIDTH + PLAYER_WIDTH, lerp("spawn_spacing"))}
+
+    def _publish(self, level, success_rate):
+        params = self.schedule(level)
+        with self._shared.get_lock():
+            self._shared[:] = [level, params["min_gap"], params["max_gap"], params["spawn_spacing"], success_rate]
+
+    def state(self):
+        """
+        Return the current schedule as a dict of FIELDS.
+        """
+        with self._shared.get_lock():
+            values = self._shared[:]
+        return dict(zip(self.FIELDS, values))
+
+    def params(self):
+        """
+        Return the current environment parameters (min_gap, max_gap, spawn_spacing), for environment resets.
+        """
+        with self._shared.get_lock():
+            _, min_gap, max_gap, spawn_spacing, _ = self._shared[:]
+        return {"min_gap": int(min_gap), "max_gap": int(max_gap), "spawn_spacing": spawn_spacing}
+
+    @property
+    def level(self):
+        return self._shared[0]
+
+    def record(self, frame_count, truncated=False):
+        """
+        Record a finished episode and update the level if its window is complete.
+
+        Returns:
+            bool: True if the level changed.
+        """
+        self._successes[self._filled] = truncated or frame_count >= self.target_frames
+        self._filled += 1
+        self.episodes += 1
+        if self._filled < self.window:
+            return False
+        rate = float(self._successes.mean())
+        level = self.level
+        if rate > self.promote:
+            level = min(1.0, level + self.step)
+        elif rate < self.demote:
+            level = max(0.0, level - self.step)
+        changed = level != self.level
+        self._filled = 0
+        self._publish(level, rate)
+        return changed
+
+    def record_info(self, info):
+        """
+        Record an episode ending from a step's info dict (steps that did not end an episode are ignored).
+        """
+        if "episode_stats" in info:
+            return self.record(info["frame_count"], info.get("truncated", False))
+        return False
@@ -0,0 +1,102 @@
+import json
+import os
+import numpy as np
+
+class FrameRecorder:
+    """
+    Stream rendered frames to disk as raw RGB data that can be memory-mapped back.
+
+    A recording at <path> consists of <path>.frames, the uint8 frames stored back to back,
+    and <path>.json, a small header with the frame shape and count. Only every stride-th
+    frame is kept, optionally downscaled, and frames are only rendered when they are kept,
+    so recording costs little beyond the frames it stores.
+    """
+
+    def __init__(self, path, stride=1, downscale=1):
+        """
+        Open a recording.
+
+        Parameters:
+            path (str): Recording path, without extension.
+            stride (int): Keep one frame out of every stride frames offered.
+            downscale (int): Keep every downscale-th pixel in both directions.
+        """
+        if stride < 1 or downscale < 1:
+            raise ValueError("stride and downscale must be at least 1")
+        self.path = path
+        self.stride = stride
+        self.downscale = downscale
+        self.frame_shape = None
+        self.frames_written = 0
+        self._offered = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path + ".frames", "wb")
+
+    def capture(self, get_frame):
+        """
+        Offer the current frame to the recording.
+
+        Parameters:
+            get_frame (callable): Returns the frame as a (height, width, 3) uint8 array. It is only
+                                  called for the frames that are kept.
+
+        Returns:
+            bool: True if the frame was recorded.
+        """
+        keep = self._offered % self.stride == 0
+        self._offered += 1
+        if not keep:
+            return False
+
+        frame = get_frame()
+        if self.downscale > 1:
+            frame = frame[::self.downscale, ::self.downscale]
+        if self.frame_shape is None:
+            self.frame_shape = frame.shape
+        elif frame.shape != self.frame_shape:
+            raise ValueError(f"frame shape {frame.shape} does not match the recording's {self.frame_shape}")
+
+        self._file.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+        self.frames_written += 1
+        return True
+
+    def close(self):
+        """
+        Flush the frames and write the header.
+        """
+        if self._file.closed:
+            return
+        self._file.close()
+        header = {
+            "frames": self.frames_written,
+            "shape": list(self.frame_shape) if self.frame_shape is not None else None,
+            "stride": self.stride,
+            "downscale": self.downscale,
+        }
+        with open(self.path + ".json", "w") as f:
+            json.dump(header, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def load_frames(path):
+    """
+    Memory-map a recording written by FrameRecorder.
+
+    Parameters:
+        path (str): Recording path, without extension.
+
+    Returns:
+        np.memmap: A read-only (frames, height, width, 3) uint8 array.
+    """
+    with open(path + ".json", "r") as f:
+        header = json.load(f)
+    if not header["frames"]:
+        return np.zeros((0, 0, 0, 3), dtype=np.uint8)
+    shape = (header["frames"], *header["shape"])
+    return np.memmap(path + ".frames", dtype=np.uint8, mode="r", shape=shape)
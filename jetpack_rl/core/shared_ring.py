@@ -0,0 +1,184 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+class _SharedArrays:
+    """
+    A set of named NumPy arrays backed by shared memory blocks.
+
+    The creating process owns (and eventually unlinks) the blocks; other processes attach
+    to them by name through the picklable spec().
+    """
+
+    def __init__(self, layout, names=None):
+        """
+        Parameters:
+            layout (dict): name -> (shape, dtype) of every array.
+            names (dict, optional): name -> shared memory block name, to attach to existing blocks.
+        """
+        self.layout = layout
+        self.owner = names is None
+        self._blocks = {}
+        self.arrays = {}
+        for name, (shape, dtype) in layout.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            if self.owner:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                # Child processes share the owner's resource tracker, which unlinks
+                # the block if the owner dies without closing the ring.
+                block = shared_memory.SharedMemory(name=names[name])
+            self._blocks[name] = block
+            self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def block_names(self):
+        return {name: block.name for name, block in self._blocks.items()}
+
+    def close(self):
+        """
+        Detach from the blocks, unlinking them if this process created them.
+        """
+        self.arrays.clear()
+        for block in self._blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self._blocks.clear()
+
+
+class TrajectoryRing:
+    """
+    A fixed pool of trajectory slots in shared memory, passed between actors and a learner.
+
+    Trajectory data never goes through a pipe: an actor takes a free slot index from
+    free_slots, writes rollout_length steps directly into the shared arrays, and puts the
+    index on full_slots. The learner takes full slots, copies out what it needs and
+    returns the indices to free_slots. The queues only carry small integers.
+
+    Arrays (per slot):
+        obs (rollout_length + 1, obs_dim): observations the policy acted on, plus the one after the last step.
+        final_obs (rollout_length, obs_dim): the last observation of an episode truncated at step t.
+        actions, rewards, terminated, truncated, behaviour_logp (rollout_length,).
+        policy_version (): version of the parameters the actor used.
+    """
+
+    def __init__(self, num_slots, rollout_length, obs_dim, ctx, _attach=None):
+        """
+        Create a ring. Use TrajectoryRing.attach(spec) in other processes.
+
+        Parameters:
+            num_slots (int): Number of trajectory slots.
+            rollout_length (int): Steps per trajectory.
+            obs_dim (int): Size of an observation.
+            ctx: The multiprocessing context used to create the slot queues.
+        """
+        self.num_slots = num_slots
+        self.rollout_length = rollout_length
+        self.obs_dim = obs_dim
+        T = rollout_length
+        layout = {
+            "obs": ((num_slots, T + 1, obs_dim), np.float32),
+            "final_obs": ((num_slots, T, obs_dim), np.float32),
+            "actions": ((num_slots, T), np.int64),
+            "rewards": ((num_slots, T), np.float32),
+            "terminated": ((num_slots, T), np.bool_),
+            "truncated": ((num_slots, T), np.bool_),
+            "behaviour_logp": ((num_slots, T), np.float32),
+            "policy_version": ((num_slots,), np.int64),
+        }
+        if _attach is None:
+            self._shared = _SharedArrays(layout)
+            self.free_slots = ctx.Queue()
+            self.full_slots = ctx.Queue()
+            for slot in range(num_slots):
+                self.free_slots.put(slot)
+        else:
+            names, self.free_slots, self.full_slots = _attach
+            self._shared = _SharedArrays(layout, names)
+        for name, array in self._shared.arrays.items():
+            setattr(self, name, array)
+
+    def spec(self):
+        """
+        Return a picklable description to pass to child processes.
+        """
+        return (self.num_slots, self.rollout_length, self.obs_dim,
+                self._shared.block_names(), self.free_slots, self.full_slots)
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        Attach to a ring created in another process.
+        """
+        num_slots, rollout_length, obs_dim, names, free_slots, full_slots = spec
+        return cls(num_slots, rollout_length, obs_dim, None, _attach=(names, free_slots, full_slots))
+
+    def gather(self, slots):
+        """
+        Copy the given slots out of shared memory, so they can be handed back to the actors.
+
+        Returns:
+            dict: Array name -> (len(slots), ...) copies.
+        """
+        return {name: array[slots] for name, array in self._shared.arrays.items()}
+
+    def close(self):
+        # Drop the array views first; shared memory cannot be closed while they exist.
+        for name in self._shared.layout:
+            delattr(self, name)
+        self._shared.close()
+
+
+class SharedParameters:
+    """
+    A flat float32 parameter vector in shared memory with a version counter.
+
+    The learner publishes new parameters; actors check the version cheaply and only copy
+    the vector when it changed.
+    """
+
+    def __init__(self, size, ctx, _attach=None):
+        """
+        Parameters:
+            size (int): Number of parameters.
+            ctx: The multiprocessing context used to create the lock and version counter.
+        """
+        self.size = size
+        layout = {"params": ((size,), np.float32)}
+        if _attach is None:
+            self._shared = _SharedArrays(layout)
+            self._version = ctx.Value("q", -1)
+        else:
+            names, self._version = _attach
+            self._shared = _SharedArrays(layout, names)
+        self.params = self._shared.arrays["params"]
+
+    def spec(self):
+        return self.size, self._shared.block_names(), self._version
+
+    @classmethod
+    def attach(cls, spec):
+        size, names, version = spec
+        return cls(size, None, _attach=(names, version))
+
+    @property
+    def version(self):
+        return self._version.value
+
+    def publish(self, vector):
+        """
+        Copy a new parameter vector in and bump the version.
+        """
+        with self._version.get_lock():
+            self.params[:] = vector
+            self._version.value += 1
+
+    def read(self):
+        """
+        Return a (version, copy of the parameters) pair.
+        """
+        with self._version.get_lock():
+            return self._version.value, self.params.copy()
+
+    def close(self):
+        del self.params
+        self._shared.close()
@@ -0,0 +1,62 @@
+import numpy as np
+from core.config import EPISODE_STATS_WINDOW
+
+class RollingEpisodeStats:
+    """
+    Rolling statistics over the last N finished episodes.
+
+    The tracker keeps a fixed-size ring buffer per tracked quantity (episode length,
+    total reward and obstacles passed), so its memory use does not grow with the
+    number of episodes recorded.
+    """
+
+    FIELDS = ("length", "reward", "obstacles_passed")
+
+    def __init__(self, window=EPISODE_STATS_WINDOW, percentiles=(10, 50, 90)):
+        """
+        Initialize the tracker.
+
+        Parameters:
+            window (int): Number of most recent episodes the statistics are computed over.
+            percentiles (tuple): Percentiles reported for every tracked quantity.
+        """
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        self.window = window
+        self.percentiles = tuple(percentiles)
+        self._values = np.zeros((len(self.FIELDS), window), dtype=np.float64)
+        self._next = 0
+        self.episodes = 0  # Total number of episodes recorded so far.
+
+    def record(self, length, reward, obstacles_passed):
+        """
+        Record a finished episode, overwriting the oldest one once the window is full.
+        """
+        column = self._values[:, self._next]
+        column[0] = length
+        column[1] = reward
+        column[2] = obstacles_passed
+        self._next = (self._next + 1) % self.window
+        self.episodes += 1
+
+    def summary(self):
+        """
+        Return the mean and percentiles of every tracked quantity over the window.
+
+        Returns:
+            dict: Keys such as 'reward_mean' or 'length_p90', plus 'episodes' (the total
+                  number of episodes recorded). Empty statistics are reported as 0.
+        """
+        stats = {"episodes": self.episodes}
+        filled = self._values[:, :min(self.episodes, self.window)]
+        for row, field in enumerate(self.FIELDS):
+            values = filled[row]
+            if values.size:
+                stats[f"{field}_mean"] = float(values.mean())
+                for q, value in zip(self.percentiles, np.percentile(values, self.percentiles)):
+                    stats[f"{field}_p{q}"] = float(value)
+            else:
+                stats[f"{field}_mean"] = 0.0
+                for q in self.percentiles:
+                    stats[f"{field}_p{q}"] = 0.0
+        return stats
@@ -0,0 +1,140 @@
+import itertools
+import math
+import random
+import numpy as np
+
+# Sweep parameters that configure the environment; every other parameter is passed to PPO.
+ENV_PARAMS = ("gravity", "thrust", "min_gap", "max_gap", "lookahead", "dt", "reward", "scroll_speed", "physics",
+              "spawn_spacing")
+# Parameters that only take integer values.
+INT_PARAMS = ("n_steps", "batch_size", "n_epochs", "min_gap", "max_gap", "lookahead", "dt", "scroll_speed")
+
+
+def _convert(name, value):
+    try:
+        value = float(value)
+    except ValueError:
+        # Non-numeric values (e.g. a reward variant name) are kept as strings.
+        return value
+    return int(round(value)) if name in INT_PARAMS else value
+
+def parse_param(spec):
+    """
+    Parse a search dimension given on the command line.
+
+    Parameters:
+        spec (str): 'name=v1,v2,...' for a list of values, 'name=low:high' for a uniform
+                    range, or 'name=low:high:log' for a log-uniform range.
+
+    Returns:
+        tuple: (name, values) where values is either a list of values or a
+               (low, high, log) tuple describing a range.
+    """
+    name, sep, values = spec.partition("=")
+    if not sep or not name or not values:
+        raise ValueError(f"expected name=values, got {spec!r}")
+    if ":" in values:
+        parts = values.split(":")
+        if len(parts) not in (2, 3) or (len(parts) == 3 and parts[2] != "log"):
+            raise ValueError(f"expected name=low:high or name=low:high:log, got {spec!r}")
+        low, high = float(parts[0]), float(parts[1])
+        log = len(parts) == 3
+        if high < low or (log and low <= 0):
+            raise ValueError(f"invalid range in {spec!r}")
+        return name, (low, high, log)
+    return name, [_convert(name, value) for value in values.split(",")]
+
+def grid_trials(space):
+    """
+    Return every combination of the listed values of a search space.
+
+    Parameters:
+        space (dict): name -> list of values. Ranges are not allowed in a grid.
+
+    Returns:
+        list: One parameter dict per trial.
+    """
+    for name, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"grid search needs a list of values for {name!r}, not a range")
+    names = list(space)
+    return [dict(zip(names, combination)) for combination in itertools.product(*space.values())]
+
+def random_trials(space, n, seed=None):
+    """
+    Sample n parameter sets from a search space.
+
+    Parameters:
+        space (dict): name -> list of values (sampled uniformly) or (low, high, log) range.
+        n (int): Number of trials.
+        seed (int, optional): Seed for reproducible sampling.
+
+    Returns:
+        list: One parameter dict per trial.
+    """
+    rng = random.Random(seed)
+    trials = []
+    for _ in range(n):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                params[name] = rng.choice(values)
+            else:
+                low, high, log = values
+                value = math.exp(rng.uniform(math.log(low), math.log(high))) if log else rng.uniform(low, high)
+                params[name] = _convert(name, value)
+        trials.append(params)
+    return trials
+
+def split_params(params):
+    """
+    Split a trial's parameters into (env_kwargs, ppo_kwargs).
+    """
+    env_kwargs = {name: value for name, value in params.items() if name in ENV_PARAMS}
+    ppo_kwargs = {name: value for name, value in params.items() if name not in ENV_PARAMS}
+    return env_kwargs, ppo_kwargs
+
+
+class MedianStoppingRule:
+    """
+    Early stopping of weak trials by comparing intermediate results across trials.
+
+    Every trial reports its metric (e.g. the rolling mean episode reward) at numbered
+    checkpoints. A trial is stopped at a checkpoint when its value is below the median
+    of what the other trials reported at the same checkpoint. The reports live in a
+    shared dict (e.g. a multiprocessing Manager dict), so trials running in different
+    processes are compared with each other.
+    """
+
+    def __init__(self, reports, lock, min_trials=3, grace_checkpoints=1):
+        """
+        Parameters:
+            reports (dict): Shared checkpoint -> {trial: value} mapping.
+            lock: Lock guarding updates of reports.
+            min_trials (int): Only stop a trial once this many other trials have reported at the checkpoint.
+            grace_checkpoints (int): Never stop a trial at its first grace_checkpoints checkpoints.
+        """
+        self.reports = reports
+        self.lock = lock
+        self.min_trials = min_trials
+        self.grace_checkpoints = grace_checkpoints
+
+    def report(self, trial, checkpoint, value):
+        """
+        Record a trial's value at a checkpoint.
+
+        Returns:
+            bool: True if the trial should stop.
+        """
+        with self.lock:
+            # Reassign the whole entry: mutating a value fetched from a Manager dict is not shared.
+            at_checkpoint = dict(self.reports.get(checkpoint, {}))
+            at_checkpoint[trial] = value
+            self.reports[checkpoint] = at_checkpoint
+
+        if checkpoint < self.grace_checkpoints:
+            return False
+        others = [v for t, v in at_checkpoint.items() if t != trial]
+        if len(others) < self.min_trials:
+            return False
+        return value < float(np.median(others))
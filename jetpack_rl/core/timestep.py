@@ -0,0 +1,37 @@
+from core.config import FPS, MAX_FRAME_TIME
+
+class FixedTimestep:
+    """
+    Accumulator for running the simulation at a fixed rate, independent of the display rate.
+
+    Each rendered frame feeds its duration to advance(), which returns how many fixed
+    physics steps to run. The time left over in the accumulator is exposed as alpha,
+    the interpolation factor between the previous and current physics state to render.
+    """
+
+    def __init__(self, step_seconds=1.0 / FPS, max_frame_time=MAX_FRAME_TIME):
+        """
+        Parameters:
+            step_seconds (float): Duration of one physics step.
+            max_frame_time (float): Frame durations are clamped to this value, so a long hitch
+                                    (e.g. dragging the window) does not trigger a burst of catch-up steps.
+        """
+        self.step_seconds = step_seconds
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """
+        Add a frame's duration (in seconds) and return the number of physics steps to run.
+        """
+        self.accumulator += min(frame_time, self.max_frame_time)
+        steps = int(self.accumulator // self.step_seconds)
+        self.accumulator -= steps * self.step_seconds
+        return steps
+
+    @property
+    def alpha(self):
+        """
+        Fraction of a physics step left in the accumulator, in [0, 1).
+        """
+        return self.accumulator / self.step_seconds
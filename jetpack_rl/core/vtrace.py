@@ -0,0 +1,45 @@
+import numpy as np
+
+def vtrace(behaviour_logp, target_logp, rewards, discounts, values, bootstrap_value,
+           clip_rho=1.0, clip_c=1.0, clip_pg_rho=1.0):
+    """
+    Compute V-trace value targets and policy-gradient advantages (Espeholt et al., 2018, IMPALA).
+
+    Parameters:
+        behaviour_logp (np.ndarray): (T, B) log-probabilities of the taken actions under the actor's policy.
+        target_logp (np.ndarray): (T, B) log-probabilities of the same actions under the learner's policy.
+        rewards (np.ndarray): (T, B) rewards.
+        discounts (np.ndarray): (T, B) per-step discounts, i.e. gamma, or 0 where an episode ended.
+        values (np.ndarray): (T, B) learner value estimates V(x_t).
+        bootstrap_value (np.ndarray): (B,) learner value estimate of the state after the last step.
+        clip_rho (float): Truncation of the importance weights in the value targets (rho-bar).
+        clip_c (float): Truncation of the trace coefficients (c-bar).
+        clip_pg_rho (float): Truncation of the importance weights in the policy-gradient advantages.
+
+    Returns:
+        tuple: (vs, pg_advantages), both (T, B) arrays.
+
+    Explanation:
+        Actors act with a policy that lags behind the learner's. V-trace corrects for that lag with
+        truncated importance weights, so trajectories collected with slightly stale parameters can
+        still be used on-policy-style. With identical policies and clip values >= 1, vs reduces to
+        the bootstrapped discounted return.
+    """
+    ratios = np.exp(target_logp - behaviour_logp)
+    rhos = np.minimum(clip_rho, ratios)
+    cs = np.minimum(clip_c, ratios)
+
+    values_tp1 = np.concatenate([values[1:], bootstrap_value[None]], axis=0)
+    deltas = rhos * (rewards + discounts * values_tp1 - values)
+
+    # vs_t - V(x_t) = delta_t + discount_t * c_t * (vs_{t+1} - V(x_{t+1}))
+    vs_minus_values = np.empty_like(values)
+    acc = np.zeros_like(bootstrap_value)
+    for t in reversed(range(values.shape[0])):
+        acc = deltas[t] + discounts[t] * cs[t] * acc
+        vs_minus_values[t] = acc
+    vs = vs_minus_values + values
+
+    vs_tp1 = np.concatenate([vs[1:], bootstrap_value[None]], axis=0)
+    pg_advantages = np.minimum(clip_pg_rho, ratios) * (rewards + discounts * vs_tp1 - values)
+    return vs, pg_advantages
@@ -0,0 +1,401 @@
+import math
+import random
+import numpy as np
+from core.config import (SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, GRAVITY, THRUST, SCROLL_SPEED,
+                         OBSTACLE_WIDTH, LOOKAHEAD_OBSTACLES, MAX_FRAMES, REWARD_VARIANT,
+                         PHYSICS_VARIANT)
+from core.game_logic import COLLISION_CAUSES, TOP_BARRIER, BOTTOM_BARRIER, CEILING, FLOOR
+from core.physics import get_physics_distributions, sample_physics
+from core.procedural_gen import sample_gap, MIN_GAP_HEIGHT, MAX_GAP_HEIGHT, SPAWN_SPACING
+from core.rewards import get_reward_function
+from core.stats import RollingEpisodeStats
+from envs.entities import Player
+from envs.jetpack_env import BASE_OBSERVATION_SIZE, OBSTACLE_OBSERVATION_SIZE
+
+# Indices into COLLISION_CAUSES, as stored in BatchJetpackEnv.collision_cause (-1: no collision).
+_TOP, _BOTTOM, _CEILING, _FLOOR = (COLLISION_CAUSES.index(cause) for cause in (TOP_BARRIER, BOTTOM_BARRIER, CEILING, FLOOR))
+
+def _overlaps(top, bottom, other_top, other_bottom):
+    """
+    Element-wise game_logic._overlaps: pygame.Rect.colliderect semantics on vertical extents.
+    """
+    top, bottom = np.minimum(top, bottom), np.maximum(top, bottom)
+    other_top, other_bottom = np.minimum(other_top, other_bottom), np.maximum(other_top, other_bottom)
+    return (top < bottom) & (other_top < other_bottom) & (top < other_bottom) & (other_top < bottom)
+
+
+class BatchJetpackEnv:
+    """
+    Many Jetpack games stepped together, with their state (including physics) in NumPy arrays.
+
+    Every environment has its own gravity, thrust, scroll speed, gap range and spawn spacing,
+    drawn on each reset from the physics distributions (see core.physics) and the curriculum
+    (see core.procedural_gen.CurriculumScheduler), so one batch can mix settings
+    and a single vectorized step advances all of them. Obstacles are kept in fixed-size
+    (num_envs, capacity) arrays; only spawning a new obstacle, which draws its gap from the
+    environment's own random source, runs per environment.
+
+    Every environment follows JetpackEnv's per-frame step (dt=1) exactly: with the same seed
+    and actions it produces the same observations, rewards, collisions and courses (checked
+    by the conformance harness through SingleBatchEnv).
+
+    Attributes:
+        y, velocity (np.ndarray): (num_envs,) player state.
+        gravity, thrust, scroll_speed, min_gap, max_gap, spawn_spacing (np.ndarray): (num_envs,)
+                                                                                     physics of the
+                                                                                     current episodes.
+        obstacle_x, gap_y, gap_height, passed (np.ndarray): (num_envs, capacity) obstacles, sorted
+                                                            by x; slots past obstacle_count are unused.
+        collision_cause (np.ndarray): (num_envs,) index into COLLISION_CAUSES, or -1.
+    """
+
+    def __init__(self, num_envs, lookahead=LOOKAHEAD_OBSTACLES, max_frames=MAX_FRAMES, gravity=GRAVITY, thrust=THRUST,
+                 min_gap=MIN_GAP_HEIGHT, max_gap=MAX_GAP_HEIGHT, reward=REWARD_VARIANT, scroll_speed=SCROLL_SPEED,
+                 physics=PHYSICS_VARIANT, spawn_spacing=SPAWN_SPACING, curriculum=None, auto_reset=True):
+        """
+        Parameters:
+            num_envs (int): Number of environments.
+            lookahead, max_frames, gravity, thrust, min_gap, max_gap, reward, scroll_speed, physics,
+            spawn_spacing, curriculum: As in JetpackEnv, shared by all environments.
+            auto_reset (bool): Reset finished environments at the end of step() (see step).
+        """
+        if lookahead < 1:
+            raise ValueError(f"lookahead must be at least 1, got {lookahead}")
+        self.num_envs = num_envs
+        self.lookahead = lookahead
+        self.max_frames = max_frames
+        self.auto_reset = auto_reset
+        self.observation_size = BASE_OBSERVATION_SIZE + OBSTACLE_OBSERVATION_SIZE * (lookahead - 1)
+        self.reward_function = get_reward_function(reward)
+        self.base_physics = {"gravity": gravity, "thrust": thrust, "scroll_speed": scroll_speed,
+                             "min_gap": min_gap, "max_gap": max_gap, "spawn_spacing": spawn_spacing}
+        self.physics_distributions = get_physics_distributions(physics)
+        self.curriculum = curriculum
+        self.rngs = [random.Random() for _ in range(num_envs)]
+
+        player = Player()
+        player.reset()
+        self.player_x, self.start_y = player.x, player.y
+        # Obstacles on screen at once: one per spawn interval across the screen, plus the one
+        # leaving it. Closer spacings grow the obstacle arrays when needed.
+        self.capacity = math.ceil((SCREEN_WIDTH + OBSTACLE_WIDTH) / spawn_spacing) + 2
+
+        n = num_envs
+        self.y = np.zeros(n)
+        self.velocity = np.zeros(n)
+        self.prev_y = np.zeros(n)
+        self.gravity = np.zeros(n)
+        self.thrust = np.zeros(n)
+        self.scroll_speed = np.zeros(n)
+        self.min_gap = np.zeros(n, dtype=np.int64)
+        self.max_gap = np.zeros(n, dtype=np.int64)
+        self.spawn_spacing = np.zeros(n)
+        # Unused obstacle slots hold x = inf, so they never overlap, count as passed or leave the screen.
+        self.obstacle_x = np.full((n, self.capacity), np.inf)
+        self.gap_y = np.zeros((n, self.capacity), dtype=np.int64)
+        self.gap_height = np.zeros((n, self.capacity), dtype=np.int64)
+        self.passed = np.zeros((n, self.capacity), dtype=bool)
+        self.obstacle_count = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frame_count = np.zeros(n, dtype=np.int64)
+        self.obstacles_passed = np.zeros(n, dtype=np.int64)
+        self.episode_reward = np.zeros(n)
+        self.done = np.zeros(n, dtype=bool)
+        self.truncated = np.zeros(n, dtype=bool)
+        self.collision_cause = np.full(n, -1, dtype=np.int64)
+        self.episode_stats = RollingEpisodeStats()
+
+        self._rows = np.arange(n)
+        self._obs_buffers = np.zeros((2, n, self.observation_size), dtype=np.float32)
+        self._obs_index = 0
+
+    def reset(self, seed=None):
+        """
+        Reset every environment and return the (num_envs, observation_size) observations.
+
+        Parameters:
+            seed (int or sequence, optional): Environment i is seeded with seed + i (or with
+                                              seed[i]), like JetpackEnv.reset(seed). Without a
+                                              seed, each environment continues its sequence.
+        """
+        if seed is not None:
+            seeds = [seed + i for i in range(self.num_envs)] if np.isscalar(seed) else list(seed)
+            self.rngs = [random.Random(s) for s in seeds]
+        self.reset_envs(self._rows)
+        return self.get_state()
+
+    def reset_envs(self, indices):
+        """
+        Start new episodes in the given environments, drawing their physics.
+        """
+        schedule = self.curriculum.params() if self.curriculum is not None else None
+        for i in indices:
+            physics = self.base_physics
+            if self.physics_distributions or schedule is not None:
+                physics = sample_physics(self.physics_distributions, self.rngs[i], self.base_physics)
+                if schedule is not None:
+                    physics.update(schedule)
+            self.gravity[i] = physics["gravity"]
+            self.thrust[i] = physics["thrust"]
+            self.scroll_speed[i] = physics["scroll_speed"]
+            self.min_gap[i] = physics["min_gap"]
+            self.max_gap[i] = physics["max_gap"]
+            self.spawn_spacing[i] = physics["spawn_spacing"]
+        self.y[indices] = self.start_y
+        self.velocity[indices] = 0.0
+        self.prev_y[indices] = self.start_y
+        self.obstacle_x[indices] = np.inf
+        self.passed[indices] = False
+        self.obstacle_count[indices] = 0
+        self.score[indices] = 0
+        self.frame_count[indices] = 0
+        self.obstacles_passed[indices] = 0
+        self.episode_reward[indices] = 0.0
+        self.done[indices] = False
+        self.truncated[indices] = False
+        self.collision_cause[indices] = -1
+
+    def physics(self, index):
+        """
+        Return the physics of an environment's current episode, as JetpackEnv.physics.
+        """
+        return {"gravity": float(self.gravity[index]), "thrust": float(self.thrust[index]),
+                "scroll_speed": self.scroll_speed[index].item(), "min_gap": int(self.min_gap[index]),
+                "max_gap": int(self.max_gap[index]), "spawn_spacing": self.spawn_spacing[index].item()}
+
+    def step(self, actions):
+        """
+        Advance every environment by one frame.
+
+        Parameters:
+            actions (np.ndarray): (num_envs,) actions, 1 to thrust.
+
+        Returns:
+            tuple: (observations, rewards, dones, info). observations is (num_envs, observation_size)
+                   float32 (a reused buffer, see JetpackEnv.get_state), rewards and dones are
+                   (num_envs,) arrays. info holds (num_envs,) arrays: score, frame_count,
+                   truncated, obstacles_passed, episode_reward and collision_cause (indices into
+                   COLLISION_CAUSES, -1 without a collision), all as of the end of the step.
+                   With auto_reset, finished environments start a new episode: their rows of
+                   observations are the new episodes' first observations, and the final ones
+                   are in info["terminal_observation"].
+        """
+        thrusting = np.asarray(actions) == 1
+
+        # Player: thrust, then gravity, then position (Player.update).
+        self.prev_y[:] = self.y
+        self.velocity += np.where(thrusting, self.thrust, 0.0)
+        self.velocity += self.gravity
+        self.y += self.velocity
+
+        # Obstacles scroll, are counted once their right edge is behind the player, and leave the screen.
+        x = self.obstacle_x
+        x -= self.scroll_speed[:, None]
+        right = x + OBSTACLE_WIDTH
+        newly_passed = ~self.passed & (right < self.player_x)
+        self.passed |= newly_passed
+        passed = newly_passed.sum(axis=1)
+        self.obstacles_passed += passed
+        gone = (right <= 0).sum(axis=1)
+        if gone.any():
+            self._drop_obstacles(gone)
+        self._spawn_obstacles()
+
+        self.score += 1
+        self.frame_count += 1
+        collided = self._handle_collisions()
+
+        observations = self.get_state()
+        rewards = self.reward_function(collided, 1, passed, observations[:, 5].astype(np.float64))
+        self.episode_reward += rewards
+        if self.max_frames is not None:
+            self.truncated |= ~self.done & (self.frame_count >= self.max_frames)
+        dones = self.done | self.truncated
+
+        info = {"score": self.score.copy(), "frame_count": self.frame_count.copy(), "truncated": self.truncated.copy(),
+                "obstacles_passed": self.obstacles_passed.copy(), "episode_reward": self.episode_reward.copy(),
+                "collision_cause": self.collision_cause.copy()}
+        finished = np.flatnonzero(dones)
+        for i in finished:
+            self.episode_stats.record(self.frame_count[i], self.episode_reward[i], self.obstacles_passed[i])
+        if self.auto_reset and len(finished):
+            info["terminal_observation"] = observations.copy()
+            self.reset_envs(finished)
+            first_observations = np.empty((len(finished), self.observation_size), dtype=np.float32)
+            self._write_state(first_observations, finished)
+            observations[finished] = first_observations
+        return observations, rewards, dones, info
+
+    def _drop_obstacles(self, gone):
+        """
+        Remove the first gone[i] obstacles of every environment, shifting the rest to the front.
+        """
+        columns = np.minimum(np.arange(self.capacity) + gone[:, None], self.capacity - 1)
+        vacated = np.arange(self.capacity) >= self.capacity - gone[:, None]
+        for array, empty in ((self.obstacle_x, np.inf), (self.gap_y, 0), (self.gap_height, 0), (self.passed, False)):
+            shifted = np.take_along_axis(array, columns, axis=1)
+            shifted[vacated] = empty
+            array[:] = shifted
+        self.obstacle_count -= gone
+
+    def _spawn_obstacles(self):
+        """
+        Append obstacles as JetpackEnv._spawn_obstacles does, for the environments that need one.
+        """
+        count = self.obstacle_count
+        threshold = SCREEN_WIDTH - self.spawn_spacing
+        last_x = self.obstacle_x[self._rows, np.maximum(count - 1, 0)]
+        for i in np.flatnonzero((count == 0) | (last_x < threshold)):
+            rng = self.rngs[i]
+            speed = self.scroll_speed[i].item()
+            min_gap, max_gap = int(self.min_gap[i]), int(self.max_gap[i])
+            limit = threshold[i].item()
+            n = int(count[i])
+            while n == 0 or self.obstacle_x[i, n - 1] < limit:
+                x_position = SCREEN_WIDTH
+                if n:
+                    x_position -= speed * (math.ceil((limit - self.obstacle_x[i, n - 1]) / speed) - 1)
+                if n == self.capacity:
+                    self._grow()
+                self.obstacle_x[i, n] = x_position
+                self.gap_y[i, n], self.gap_height[i, n] = sample_gap(min_gap, max_gap, rng)
+                self.passed[i, n] = False
+                n += 1
+            count[i] = n
+
+    def _grow(self):
+        """
+        Double the obstacle capacity of every environment.
+        """
+        capacity = self.capacity
+        for name, empty in (("obstacle_x", np.inf), ("gap_y", 0), ("gap_height", 0), ("passed", False)):
+            array = getattr(self, name)
+            grown = np.full((self.num_envs, 2 * capacity), empty, dtype=array.dtype)
+            grown[:, :capacity] = array
+            setattr(self, name, grown)
+        self.capacity = 2 * capacity
+
+    def _handle_collisions(self):
+        """
+        Element-wise game_logic.collision_cause for the environments still running. Returns
+        the (num_envs,) mask of environments that collided during this step.
+        """
+        top = np.trunc(self.y)[:, None]
+        bottom = top + PLAYER_HEIGHT
+        x = self.obstacle_x
+        overlapping = (x < self.player_x + PLAYER_WIDTH) & (x + OBSTACLE_WIDTH > self.player_x)
+        gap_bottom = self.gap_y + self.gap_height
+        top_hit = overlapping & _overlaps(top, bottom, 0, self.gap_y)
+        bottom_hit = overlapping & _overlaps(top, bottom, gap_bottom, SCREEN_HEIGHT)
+        # The first obstacle hit decides, and its top barrier is checked before its bottom one.
+        hit = top_hit | bottom_hit
+        first = hit.argmax(axis=1)
+        cause = np.where(top_hit[self._rows, first], _TOP, _BOTTOM)
+        cause = np.where(hit.any(axis=1), cause,
+                         np.where(self.y < 0, _CEILING, np.where(self.y + PLAYER_HEIGHT > SCREEN_HEIGHT, _FLOOR, -1)))
+        collided = (cause >= 0) & ~self.done
+        self.collision_cause[collided] = cause[collided]
+        self.done |= collided
+        return collided
+
+    def get_state(self):
+        """
+        Return the (num_envs, observation_size) observations, laid out as JetpackEnv.get_state.
+        """
+        self._obs_index ^= 1
+        obs = self._obs_buffers[self._obs_index]
+        self._write_state(obs, slice(None))
+        return obs
+
+    def _write_state(self, obs, rows):
+        """
+        Write the observations of the environments selected by rows (an index array or a slice) into obs.
+        """
+        x = self.obstacle_x[rows]
+        gap_y = self.gap_y[rows]
+        gap_height = self.gap_height[rows]
+        count = self.obstacle_count[rows]
+        y = self.y[rows]
+        px = self.player_x
+        obs[:, 0] = y
+        obs[:, 1] = self.velocity[rows]
+
+        # Obstacles are sorted by x, so those ahead of the player are a contiguous tail.
+        first = (x + OBSTACLE_WIDTH <= px).sum(axis=1)
+        offset = BASE_OBSERVATION_SIZE
+        for k in range(self.lookahead):
+            index = first + k
+            present = index < count
+            column = np.minimum(index, self.capacity - 1)[:, None]
+            next_x = np.take_along_axis(x, column, axis=1)[:, 0]
+            next_gap_y = np.take_along_axis(gap_y, column, axis=1)[:, 0]
+            next_gap_height = np.take_along_axis(gap_height, column, axis=1)[:, 0]
+            distance = np.where(present, next_x - px, SCREEN_WIDTH - px)
+            next_gap_y = np.where(present, next_gap_y, 0)
+            next_gap_height = np.where(present, next_gap_height, 0)
+            if k == 0:
+                obs[:, 2] = next_gap_y
+                obs[:, 3] = next_gap_height
+                obs[:, 4] = distance
+                obs[:, 5] = np.where(present, y - (next_gap_y + next_gap_height / 2), 0.0)
+            else:
+                obs[:, offset] = distance
+                obs[:, offset + 1] = next_gap_y
+                obs[:, offset + 2] = next_gap_height
+                offset += OBSTACLE_OBSERVATION_SIZE
+
+
+class SingleBatchEnv:
+    """
+    A BatchJetpackEnv of one environment behind JetpackEnv's reset(seed)/step(action) interface,
+    for the conformance harness (registered there as the "batch" candidate).
+    """
+
+    def __init__(self, headless=True, human_control=False, **kwargs):
+        self.batch = BatchJetpackEnv(1, auto_reset=False, **kwargs)
+        self._actions = np.zeros(1, dtype=np.int64)
+
+    def reset(self, seed=None):
+        return self.batch.reset(seed=seed)[0]
+
+    def step(self, action, dt=1):
+        if dt != 1:
+            raise ValueError("the batched engine only steps one frame at a time")
+        batch = self.batch
+        self._actions[0] = action
+        observations, rewards, dones, batch_info = batch.step(self._actions)
+        observation = observations[0]
+        done = bool(dones[0])
+        info = {"score": int(batch.score[0]), "frame_count": int(batch.frame_count[0]),
+                "truncated": bool(batch.truncated[0])}
+        if done:
+            info["obstacles_passed"] = int(batch.obstacles_passed[0])
+            info["episode_reward"] = float(batch.episode_reward[0])
+            info["episode_stats"] = batch.episode_stats.summary()
+            info["physics"] = batch.physics(0)
+        if batch.done[0]:
+            info["collision"] = {
+                "cause": COLLISION_CAUSES[batch.collision_cause[0]],
+                "player_y": float(observation[0]),
+                "velocity": float(observation[1]),
+                "gap_y": float(observation[2]),
+                "gap_height": float(observation[3]),
+                "gap_offset": float(observation[5]),
+            }
+        return observation, rewards[0].item(), done, info
+
+    def conformance_state(self):
+        batch = self.batch
+        count = int(batch.obstacle_count[0])
+        obstacles = zip(batch.obstacle_x[0, :count].tolist(), batch.gap_y[0, :count].tolist(),
+                        batch.gap_height[0, :count].tolist(), batch.passed[0, :count].tolist())
+        return {
+            "player.y": batch.y[0].item(),
+            "player.velocity": batch.velocity[0].item(),
+            "obstacles": list(obstacles),
+            "score": int(batch.score[0]),
+            "frame_count": int(batch.frame_count[0]),
+            "obstacles_passed": int(batch.obstacles_passed[0]),
+            "done": bool(batch.done[0]),
+            "truncated": bool(batch.truncated[0]),
+        }
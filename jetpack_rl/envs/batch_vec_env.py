@@ -0,0 +1,92 @@
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from core.game_logic import COLLISION_CAUSES
+from envs.batch_env import BatchJetpackEnv
+from envs.jetpack_env import max_gap_height, observation_bounds
+
+class BatchVecEnv(VecEnv):
+    """
+    A Stable-Baselines3 VecEnv over a BatchJetpackEnv, so PPO collects rollouts from all
+    environments with one vectorized step instead of one Python env object per environment.
+
+    Finished environments are reset automatically, as in other VecEnvs. The info dicts of
+    finished environments carry what JetpackGymWrapper reports at episode end (terminal
+    observation, episode totals, rolling statistics and the collision), so the training
+    callbacks work unchanged; the other environments get empty info dicts.
+    """
+
+    render_mode = None
+
+    def __init__(self, num_envs, **env_kwargs):
+        """
+        Parameters:
+            num_envs (int): Number of environments.
+            env_kwargs: BatchJetpackEnv keyword arguments (physics, reward, lookahead, ...).
+        """
+        self.batch = BatchJetpackEnv(num_envs, auto_reset=True, **env_kwargs)
+        batch = self.batch
+        low, high = observation_bounds(batch.lookahead, max_gap_height(batch.base_physics, batch.physics_distributions,
+                                                                       batch.curriculum))
+        super().__init__(num_envs, spaces.Box(low=low, high=high, dtype=np.float32), spaces.Discrete(2))
+        self._actions = None
+
+    def reset(self):
+        seeds = self._seeds
+        observations = self.batch.reset(seed=seeds if seeds[0] is not None else None)
+        self._reset_seeds()
+        return observations.copy()
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        batch = self.batch
+        observations, rewards, dones, info = batch.step(self._actions)
+        infos = [{} for _ in range(self.num_envs)]
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            stats = batch.episode_stats.summary()
+            terminal = info["terminal_observation"]
+            for i in finished:
+                truncated = bool(info["truncated"][i])
+                episode_info = infos[i]
+                episode_info["terminal_observation"] = terminal[i]
+                episode_info["TimeLimit.truncated"] = truncated
+                episode_info["truncated"] = truncated
+                episode_info["frame_count"] = int(info["frame_count"][i])
+                episode_info["obstacles_passed"] = int(info["obstacles_passed"][i])
+                episode_info["episode_reward"] = float(info["episode_reward"][i])
+                episode_info["episode_stats"] = stats
+                cause = info["collision_cause"][i]
+                if cause >= 0:
+                    episode_info["collision"] = {
+                        "cause": COLLISION_CAUSES[cause],
+                        "player_y": float(terminal[i, 0]),
+                        "velocity": float(terminal[i, 1]),
+                        "gap_y": float(terminal[i, 2]),
+                        "gap_height": float(terminal[i, 3]),
+                        "gap_offset": float(terminal[i, 5]),
+                    }
+        return observations.copy(), rewards.astype(np.float32), dones.copy(), infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        # Attributes are shared by the batch; per-environment arrays are indexed.
+        value = getattr(self, attr_name) if attr_name == "render_mode" else getattr(self.batch, attr_name)
+        indices = self._get_indices(indices)
+        if isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,):
+            return [value[i] for i in indices]
+        return [value for _ in indices]
+
+    def set_attr(self, attr_name, value, indices=None):
+        raise NotImplementedError("the environments of a BatchVecEnv share their attributes")
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        raise NotImplementedError("the environments of a BatchVecEnv are not separate objects")
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
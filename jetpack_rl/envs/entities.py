@@ -1,31 +1,43 @@
 import pygame
+from core import assets
 from core.config import GRAVITY, THRUST, PLAYER_WIDTH, PLAYER_HEIGHT, SCREEN_HEIGHT, SCROLL_SPEED, OBSTACLE_WIDTH, GAP_HEIGHT
 
 
 class Player:
-    def __init__(self, start_x=100, start_y=300):
+    # Only numeric state is stored per player: no __dict__, and no Rect or sprite until one is asked for.
+    __slots__ = ("x", "y", "velocity", "gravity", "thrust")
+
+    def __init__(self, start_x=100, start_y=300, gravity=GRAVITY, thrust=THRUST):
         """
         Initialize the Player.
         
         Attributes:
             x, y: Position of the player.
             velocity: Current vertical velocity.
-            rect: Pygame Rect for collision detection and drawing.
+            gravity, thrust: Per-frame velocity changes applied by update(). Default to the config values.
+            rect: Pygame Rect for drawing, built from the position when accessed.
+            image: The player's sprite, loaded on first draw.
         """
         self.x = start_x
         self.y = start_y
         self.velocity = 0
-        
-        # Create a rectangle representing the player's position and size
-        self.rect = pygame.Rect(self.x, self.y, PLAYER_WIDTH, PLAYER_HEIGHT)
-        
-        # Adjust the path if necessary based on your project structure.
-        self.image = pygame.image.load("assets/CaptainCwack.png").convert_alpha()
+        self.gravity = gravity
+        self.thrust = thrust
 
-        # Optionally scale the image to match the player's dimensions.
-        self.image = pygame.transform.scale(self.image, (PLAYER_WIDTH * 2.3, PLAYER_HEIGHT * 2.3))
+    @property
+    def rect(self):
+        """
+        A pygame Rect at the player's position (y truncated to whole pixels).
 
-        
+        The Rect is built on each access, so changing it does not move the player.
+        """
+        return pygame.Rect(self.x, int(self.y), PLAYER_WIDTH, PLAYER_HEIGHT)
+
+    @property
+    def image(self):
+        # The sprite scaled to the player's dimensions. The surface is loaded once per
+        # process and shared between all players.
+        return assets.load_image("CaptainCwack.png", (round(PLAYER_WIDTH * 2.3), round(PLAYER_HEIGHT * 2.3)), alpha=True)
 
     def reset(self):
         """
@@ -34,7 +46,6 @@ class Player:
         self.x = 200
         self.y = 375
         self.velocity = 0
-        self.rect.topleft = (self.x, self.y)
 
     def update_gravity(self, gravity_value=GRAVITY):
         """
@@ -48,45 +59,61 @@ class Player:
         """
         self.velocity += thrust_value
 
-    def update_position(self):
+    def update_position(self, dt=1):
         """
         Update the player's position based on its velocity.
         """
-        self.y += self.velocity
-        self.rect.y = int(self.y)
+        self.y += self.velocity * dt
 
-    def update(self, thrust=False):
+    def update(self, thrust=False, dt=1):
         """
-        Update the player's state for one frame.
+        Update the player's state for dt frames (one frame by default).
         
         If thrust is True, apply thrust before gravity.
         Then, update gravity and the player's position.
+
+        Longer steps land where dt per-frame updates would: with the per-frame acceleration a,
+        the velocity grows by a*dt and the position by dt*v + a*dt*(dt+1)/2 (the sum of the
+        velocities after each frame).
         """
-        if thrust:
-            self.apply_thrust()
-        self.update_gravity()
-        self.update_position()
+        if dt == 1:
+            if thrust:
+                self.apply_thrust(self.thrust)
+            self.update_gravity(self.gravity)
+            self.update_position()
+            return
+        acceleration = self.gravity + (self.thrust if thrust else 0)
+        self.y += self.velocity * dt + acceleration * dt * (dt + 1) / 2
+        self.velocity += acceleration * dt
 
-    def draw(self, screen):
+    def draw(self, screen, y=None):
         """
         Render the player on the given Pygame screen.
         
         This method encapsulates all the drawing logic for the player.
+
+        Parameters:
+            y (float, optional): Vertical position to draw at (e.g. an interpolated one).
+                                 Defaults to the player's current position.
         """
+        rect = pygame.Rect(self.x, int(self.y if y is None else y), PLAYER_WIDTH, PLAYER_HEIGHT)
         # If using an image, you could do:
-        screen.blit(self.image, self.rect)
+        screen.blit(self.image, rect)
         # Otherwise, draw a simple rectangle:
         #pygame.draw.rect(screen, (255, 0, 0), self.rect)
 
     def get_rect(self):
         """
-        Return the player's rect for collision detection.
+        Return the player's rect (see the rect property).
         """
         return self.rect
 
 
 
 class Obstacle:
+    # Only numeric state is stored per obstacle; the barrier Rects are built when accessed.
+    __slots__ = ("x", "gap_y", "gap_height", "passed")
+
     def __init__(self, x_pos, gap_y, gap_height=GAP_HEIGHT):
         """
         Initialize an obstacle consisting of a top barrier and a bottom barrier.
@@ -99,13 +126,22 @@ class Obstacle:
         self.x = x_pos
         self.gap_y = gap_y  # Starting y position of the gap
         self.gap_height = gap_height
-
-        # The top barrier extends from the top of the screen (y=0) to gap_y.
-        self.top_rect = pygame.Rect(self.x, 0, OBSTACLE_WIDTH, self.gap_y)
-        # The bottom barrier extends from gap_y + gap_height to the bottom of the screen.
-        self.bottom_rect = pygame.Rect(self.x, self.gap_y + self.gap_height, OBSTACLE_WIDTH, SCREEN_HEIGHT - (self.gap_y + self.gap_height))
         self.passed = False
 
+    @property
+    def top_rect(self):
+        """
+        The top barrier, from the top of the screen (y=0) to gap_y.
+        """
+        return pygame.Rect(self.x, 0, OBSTACLE_WIDTH, self.gap_y)
+
+    @property
+    def bottom_rect(self):
+        """
+        The bottom barrier, from gap_y + gap_height to the bottom of the screen.
+        """
+        bottom = self.gap_y + self.gap_height
+        return pygame.Rect(self.x, bottom, OBSTACLE_WIDTH, SCREEN_HEIGHT - bottom)
 
     def update_position(self, delta_x=SCROLL_SPEED):
         """
@@ -115,28 +151,35 @@ class Obstacle:
             delta_x (int): The amount to move the obstacle horizontally.
                              Default is the SCROLL_SPEED from your config.
                              
-        This method updates both the top and bottom barrier positions.
+        The barrier rects follow x, since they are built from it.
         """
         self.x -= delta_x  # Move the obstacle to the left.
-        self.top_rect.x = self.x
-        self.bottom_rect.x = self.x
     
-    def draw(self, screen):
+    def draw(self, screen, offset_x=0):
         """
         Draw the obstacle on the screen with a colored fill and a border.
+
+        Parameters:
+            offset_x (float): Horizontal offset to draw at (e.g. for interpolated rendering).
         """
         # Define your colors.
         fill_color = (255, 0, 0)       # Red fill.
         border_color = (0, 0, 0)       # Black border.
         border_width = 3             # Border thickness.
 
+        top_rect = self.top_rect
+        bottom_rect = self.bottom_rect
+        if offset_x:
+            top_rect = top_rect.move(round(offset_x), 0)
+            bottom_rect = bottom_rect.move(round(offset_x), 0)
+
         # Draw the top barrier: fill first, then draw the border.
-        pygame.draw.rect(screen, fill_color, self.top_rect)
-        pygame.draw.rect(screen, border_color, self.top_rect, border_width)
+        pygame.draw.rect(screen, fill_color, top_rect)
+        pygame.draw.rect(screen, border_color, top_rect, border_width)
 
         # Draw the bottom barrier: fill first, then draw the border.
-        pygame.draw.rect(screen, fill_color, self.bottom_rect)
-        pygame.draw.rect(screen, border_color, self.bottom_rect, border_width)
+        pygame.draw.rect(screen, fill_color, bottom_rect)
+        pygame.draw.rect(screen, border_color, bottom_rect, border_width)
 
     
     def get_gap_rect(self):
@@ -1,14 +1,68 @@
+import math
+import random
 import pygame
 import numpy as np
-from core.config import SCREEN_WIDTH, SCREEN_HEIGHT, GRAVITY, SCROLL_SPEED, OBSTACLE_WIDTH  # adjust as needed
-from core.procedural_gen import generate_obstacle  # function to generate obstacles
-from core import game_logic
+from core.config import SCREEN_WIDTH, SCREEN_HEIGHT, GRAVITY, THRUST, SCROLL_SPEED, OBSTACLE_WIDTH, LOOKAHEAD_OBSTACLES, MAX_FRAMES, REWARD_VARIANT, PHYSICS_VARIANT  # adjust as needed
+from core.procedural_gen import generate_obstacle, MIN_GAP_HEIGHT, MAX_GAP_HEIGHT, SPAWN_SPACING  # function to generate obstacles
+from core import assets, game_logic
+from core.physics import get_physics_distributions, param_range, sample_physics
+from core.rewards import get_reward_function
+from core.stats import RollingEpisodeStats
 from envs.entities import Player, Obstacle  # your game entity classes
 
 
+# Number of features describing the player and the nearest obstacle (the default layout).
+BASE_OBSERVATION_SIZE = 6
+# Number of features appended for every additional obstacle of lookahead.
+OBSTACLE_OBSERVATION_SIZE = 3
+
+
+def observation_bounds(lookahead=LOOKAHEAD_OBSTACLES, max_gap=MAX_GAP_HEIGHT):
+    """
+    Return the (low, high) bounds of the observations for a lookahead.
+
+    The first six entries are the default layout; each additional obstacle of lookahead
+    adds bounds for its x distance, gap_y and gap_height.
+
+    Parameters:
+        lookahead (int): Obstacles described in the observation.
+        max_gap (int): Largest gap height the environment generates (see max_gap_height).
+
+    Returns:
+        tuple: Two float32 arrays of length observation_size.
+    """
+    #   player_y in [0, SCREEN_HEIGHT]
+    #   player_y_velocity in [-50, 50] (adjust as needed)
+    #   gap_y in [0, SCREEN_HEIGHT]
+    #   gap_height in [0, max_gap] (0 where no obstacle is ahead, e.g. padded lookahead slots)
+    #   obstacle_x_distance in [0, SCREEN_WIDTH]
+    #   player_to_gap_center_y in [-SCREEN_HEIGHT, SCREEN_HEIGHT]
+    low = [0, -50.0, 0, 0, 0, -SCREEN_HEIGHT]
+    high = [SCREEN_HEIGHT, 50.0, SCREEN_HEIGHT, max_gap, SCREEN_WIDTH, SCREEN_HEIGHT]
+    for _ in range(lookahead - 1):
+        low += [0, 0, 0]
+        high += [SCREEN_WIDTH, SCREEN_HEIGHT, max_gap]
+    return np.array(low, dtype=np.float32), np.array(high, dtype=np.float32)
+
+def max_gap_height(base_physics, distributions=None, curriculum=None):
+    """
+    Return the largest gap height an environment can generate with its physics distributions
+    and curriculum (see core.physics and CurriculumScheduler).
+    """
+    distributions = distributions or {}
+    # sample_physics raises max_gap to min_gap when the drawn range is empty.
+    largest = max(param_range("max_gap", distributions, base_physics)[1],
+                  param_range("min_gap", distributions, base_physics)[1])
+    if curriculum is not None:
+        # The schedule's gap range changes linearly with the level, so its ends bound it.
+        largest = max(largest, *(curriculum.schedule(level)["max_gap"] for level in (0.0, 1.0)))
+    return largest
+
 
 class JetpackEnv:
-    def __init__(self, human_control=False):
+    def __init__(self, human_control=False, lookahead=LOOKAHEAD_OBSTACLES, max_frames=MAX_FRAMES, headless=False,
+                 gravity=GRAVITY, thrust=THRUST, min_gap=MIN_GAP_HEIGHT, max_gap=MAX_GAP_HEIGHT, reward=REWARD_VARIANT,
+                 scroll_speed=SCROLL_SPEED, physics=PHYSICS_VARIANT, spawn_spacing=SPAWN_SPACING, curriculum=None):
         """
         Initialize the Jetpack environment.
         
@@ -18,21 +72,85 @@ class JetpackEnv:
         - Set up background elements (image, position, etc.).
         - Initialize game variables (score, frame count, etc.).
         - Optionally set a flag for human control.
+        - Preallocate the observation buffers for the requested lookahead.
+        - Set up the episode time limit and the rolling episode statistics.
+
+        Parameters:
+            human_control (bool): Whether a human is playing the game.
+            lookahead (int): Number of upcoming obstacles described in the observation.
+                             A lookahead of 1 gives the default six-feature layout.
+            max_frames (int, optional): Episodes are truncated after this many frames.
+                                        None disables the time limit.
+            headless (bool): Draw into an offscreen surface instead of opening a window, so the
+                             game can be rendered (e.g. recorded) on machines without a display.
+            gravity, thrust (float): Player physics. Default to the config values.
+            min_gap, max_gap (int): Range of the obstacle gap heights (see generate_obstacle).
+            reward (str or RewardFunction): Reward variant name (see core.rewards.REWARD_VARIANTS)
+                                            or a reward function. Defaults to REWARD_VARIANT.
+            scroll_speed (int): Pixels the world scrolls per frame. Defaults to SCROLL_SPEED.
+            physics (str or dict): Physics variant name (see core.physics.PHYSICS_VARIANTS) or
+                                   distributions of gravity, thrust, scroll_speed and the gap range,
+                                   sampled anew on every reset. The arguments above are the values
+                                   of the parameters without a distribution.
+            spawn_spacing (float): Distance (pixels) the last obstacle scrolls in from the right
+                                   edge before the next one spawns. Defaults to SPAWN_SPACING.
+            curriculum (CurriculumScheduler, optional): Adaptive difficulty; its current gap range
+                                                        and spawn spacing replace the physics values
+                                                        on every reset (see core.procedural_gen).
         """
+        if lookahead < 1:
+            raise ValueError(f"lookahead must be at least 1, got {lookahead}")
+        if not 0 < min_gap <= max_gap:
+            raise ValueError(f"gap range must satisfy 0 < min_gap <= max_gap, got ({min_gap}, {max_gap})")
+        if scroll_speed <= 0:
+            raise ValueError(f"scroll_speed must be positive, got {scroll_speed}")
+
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("JetpackRL")
+        self.headless = headless
+        if headless:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("JetpackRL")
         self.clock = pygame.time.Clock()
         
         # Game control flags
         self.human_control = human_control
         self.done = False
+        self.truncated = False
+        self.collision_cause = None  # what ended the episode (see game_logic.collision_cause)
+        self.collision_obstacle = None  # the obstacle hit (None for the screen bounds)
+        self.collision_contact = None  # the player's (y, velocity) at the contact
+        self.max_frames = max_frames
         
         # Initialize player, obstacles, background, score, and frame count
-        self.player = Player()  # ensure Player class is defined in entities.py
+        self.player = Player(gravity=gravity, thrust=thrust)  # ensure Player class is defined in entities.py
+        # Physics of the current episode, drawn on reset from the distributions (see core.physics).
+        self.base_physics = {"gravity": gravity, "thrust": thrust, "scroll_speed": scroll_speed,
+                             "min_gap": min_gap, "max_gap": max_gap, "spawn_spacing": spawn_spacing}
+        self.physics_distributions = get_physics_distributions(physics)
+        self.curriculum = curriculum
+        self._apply_physics(dict(self.base_physics))
+        # Random source for the course; reset(seed) replaces it with a seeded one.
+        self.rng = random
+        self.prev_player_y = self.player.y  # player position before the last step, for interpolated rendering
+        self.last_dt = 1  # length (in frames) of the last step
         self.obstacles = []     # list to hold obstacle instances
         self.score = 0
         self.frame_count = 0
+
+        # Observations are written in place into two alternating buffers, so the previous
+        # observation (e.g. a terminal one) stays valid while the next one is computed.
+        self.lookahead = lookahead
+        self.observation_size = BASE_OBSERVATION_SIZE + OBSTACLE_OBSERVATION_SIZE * (lookahead - 1)
+        self._obs_buffers = np.zeros((2, self.observation_size), dtype=np.float32)
+        self._obs_index = 0
+
+        # Per-episode totals and rolling statistics over recently finished episodes.
+        self.episode_reward = 0
+        self.obstacles_passed = 0
+        self.episode_stats = RollingEpisodeStats()
+        self.reward_function = get_reward_function(reward)
         
         # Load background image if available
         self.background = None  # TODO: Load your background image here
@@ -41,17 +159,22 @@ class JetpackEnv:
         # Reset the velocity log for the new episode.
         #self.velocity_log = []
 
-        # Load the background image (assumes bg.png is in the assets folder).
-        self.background = pygame.image.load("assets/bg2.png").convert()
-        # Optionally scale the background to SCREEN_WIDTH and SCREEN_HEIGHT.
-        self.background = pygame.transform.scale(self.background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Load the background image scaled to SCREEN_WIDTH and SCREEN_HEIGHT (assumes bg2.png is in
+        # the assets folder). The surface is loaded once per process and shared between environments.
+        self.background = assets.load_image("bg2.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
         self.bg_x = 0
+
+        # Font for the score overlay, created on first render.
+        self.font = None
         
 
-    def reset(self):
+    def reset(self, seed=None):
         """
         Reset the game environment to its initial state.
         
+        - Reseed the course generator if a seed is given: the same seed gives the same
+          sequence of obstacles. Later resets without a seed continue that sequence.
+        - Draw the episode's physics from the physics distributions, if any.
         - Reset the player's position and velocity via its own reset() method.
         - Clear the obstacles list (obstacles are maintained by the environment).
         - Reset the score and frame counter.
@@ -60,8 +183,20 @@ class JetpackEnv:
         - Optionally, generate initial obstacles if needed.
         - Return the initial observation state.
         """
+        if seed is not None:
+            self.rng = random.Random(seed)
+        # Draw this episode's physics before its course, from the same random source, and
+        # follow the curriculum's current difficulty.
+        if self.physics_distributions or self.curriculum is not None:
+            physics = sample_physics(self.physics_distributions, self.rng, self.base_physics)
+            if self.curriculum is not None:
+                physics.update(self.curriculum.params())
+            self._apply_physics(physics)
+
         # Reset the player (assumes Player.reset() is implemented)
         self.player.reset()
+        self.prev_player_y = self.player.y
+        self.last_dt = 1
         
         # Clear obstacles; this is managed by the environment, not the Obstacle class
         self.obstacles = []
@@ -69,12 +204,18 @@ class JetpackEnv:
         # Reset score and frame counter
         self.score = 0
         self.frame_count = 0
+        self.episode_reward = 0
+        self.obstacles_passed = 0
         
         # Reset background scroll (assuming you scroll the background horizontally)
         self.bg_x = 0
         
         # Mark environment as active (not done)
         self.done = False
+        self.truncated = False
+        self.collision_cause = None
+        self.collision_obstacle = None
+        self.collision_contact = None
         
         # Optionally, initialize the first obstacle if required:
         # from core.procedural_gen import generate_obstacle
@@ -84,10 +225,14 @@ class JetpackEnv:
         return self.get_state()
 
 
-    def step(self, action):
+    def step(self, action, dt=1):
         """
         Take a single step in the game based on the action.
         
+        dt is the length of the step in frames. dt=1 is the reference per-frame step;
+        larger values advance physics, scrolling, score and survival reward by dt frames
+        at once and use swept collision, so obstacles cannot be tunneled through.
+
         - Process the action (e.g., thrust if action == 1).
         - Apply gravity to update player's velocity (handled in the Player.update method).
         - Update player's position based on velocity.
@@ -95,70 +240,85 @@ class JetpackEnv:
         - Use procedural_gen.generate_obstacle() to add new obstacles when needed.
         - Update score (e.g., +1 per frame) and frame counter.
         - Check for collisions and set self.done = True if a collision is detected.
+        - Truncate the episode (self.truncated = True) once max_frames is reached.
         - Return (observation, reward, done, info) where observation is from get_state().
+          done is True when the episode ended for either reason; info["truncated"] tells
+          them apart, and info["episode_stats"] holds the rolling statistics at episode end.
         """
         
         # Process the input action: if action is 1, apply thrust; otherwise, do nothing.
         thrust = (action == 1)
         
         # Update the player (this applies thrust if needed, then gravity, then updates position).
-        self.player.update(thrust)
+        self.prev_player_y = self.player.y
+        self.last_dt = dt
+        self.player.update(thrust, dt)
         
         # Update obstacles: move each obstacle left by calling its update_position method.
+        scroll_distance = self.scroll_speed * dt
         for obs in self.obstacles:
-            obs.update_position()
+            obs.update_position(scroll_distance)
 
-            # Check if any obstacles have been passed (and haven't been rewarded yet).
-        bonus_reward = 0
+        # Check if any obstacles have been passed (and haven't been counted yet).
+        passed = 0
         # We assume the player's x position is fixed (e.g., at 100).
         for obs in self.obstacles:
             if not obs.passed and (obs.x + OBSTACLE_WIDTH) < self.player.x:
-                #bonus_reward += 15
-                obs.passed = True  # Mark as passed so we don't add reward again.
+                obs.passed = True  # Mark as passed so we don't count it again.
+                passed += 1
+        self.obstacles_passed += passed
+
+        # Check for collisions. This sets self.done = True if a collision is detected. It runs
+        # before off-screen obstacles are removed, so that a long step still sweeps through an
+        # obstacle that has scrolled past the left edge by the end of the step.
+        self._handle_collisions(dt, thrust)
         
         # Remove obstacles that have scrolled completely off-screen.
-        self.obstacles = [obs for obs in self.obstacles if (obs.x + obs.top_rect.width) > 0]
+        self.obstacles = [obs for obs in self.obstacles if (obs.x + OBSTACLE_WIDTH) > 0]
         
-        # Optionally generate a new obstacle if none exist or if the last obstacle is far enough to the left.
-        # For example, if there are no obstacles or the rightmost obstacle's x position is less than 80% of the screen width.
-        if not self.obstacles or (self.obstacles[-1].x < SCREEN_WIDTH * 0.8):
-            from core.procedural_gen import generate_obstacle
-            new_obstacle = generate_obstacle(x_position=SCREEN_WIDTH)
-            self.obstacles.append(new_obstacle)
+        # Generate new obstacles if none exist or if the last obstacle is far enough to the left.
+        self._spawn_obstacles()
         
         # Update background scroll if using a background image.
         if self.background is not None:
-            self.bg_x -= SCROLL_SPEED
+            self.bg_x -= scroll_distance
             # Reset bg_x if the background image has completely scrolled off.
             if self.bg_x <= -self.background.get_width():
                 self.bg_x = 0
         
         # Increment score and frame counter.
-        self.score += 1
-        self.frame_count += 1
-        
-        # Check for collisions. This sets self.done = True if a collision is detected.
-        self._handle_collisions()
+        self.score += dt
+        self.frame_count += dt
         
         # Log the player's current velocity.
         #self.velocity_log.append(self.player.velocity)
 
-        # Compute reward: using game_logic.compute_reward (which returns -100 on collision, +1 otherwise).
-        # Here, we assume that if a collision occurs (self.done is True), the state dictionary includes a collision flag.
-        from core import game_logic
-        state_info = {"collision": self.done}
-        base_reward = game_logic.compute_reward(state_info, action)
-
-        # Add bonus reward for passed obstacles.
-        reward = base_reward + bonus_reward
-        
         # Get the current observation state.
         observation = self.get_state()
+
+        # Compute the reward with the configured reward function (see core.rewards). The
+        # default variant gives -100 on collision and +1 per frame survived otherwise.
+        reward = self.reward_function(self.done, dt, passed, float(observation[5]))
+        self.episode_reward += reward
+
+        # Truncate surviving episodes at the time limit.
+        if not self.done and self.max_frames is not None and self.frame_count >= self.max_frames:
+            self.truncated = True
         
         # Construct extra info, such as the current score and frame count.
-        info = {"score": self.score, "frame_count": self.frame_count}
-        
-        return observation, reward, self.done, info
+        info = {"score": self.score, "frame_count": self.frame_count, "truncated": self.truncated}
+
+        episode_over = self.done or self.truncated
+        if episode_over:
+            self.episode_stats.record(self.frame_count, self.episode_reward, self.obstacles_passed)
+            info["obstacles_passed"] = self.obstacles_passed
+            info["episode_reward"] = self.episode_reward
+            info["episode_stats"] = self.episode_stats.summary()
+            info["physics"] = self.physics
+        if self.done:
+            info["collision"] = self._collision_info(observation)
+        
+        return observation, reward, episode_over, info
 
 
     def print_velocity_stats(self):
@@ -173,46 +333,91 @@ class JetpackEnv:
         avg_velocity = sum(self.velocity_log) / len(self.velocity_log)
         print(f"Player Velocity Stats: min={min_velocity}, max={max_velocity}, avg={avg_velocity}")
 
-    def render(self):
+    def render(self, alpha=1.0):
+        """
+        Render the game elements onto the screen and update the display.
+
+        Parameters:
+            alpha (float): Interpolation factor, see draw().
         """
-        Render the game elements onto the screen.
+        self.draw(alpha)
+        if not self.headless:
+            # Update the display to show the new frame.
+            pygame.display.flip()
+
+    def draw(self, alpha=1.0):
+        """
+        Draw the game elements onto the screen surface, without updating the display.
         
         - Draw the scrolling background.
         - Draw all obstacles.
         - Draw the player.
         - Optionally, display the current score.
-        - Update the display.
+
+        Parameters:
+            alpha (float): Interpolation factor between the previous (0.0) and the current (1.0)
+                           physics state. A fixed-timestep loop passes the fraction of a step
+                           left in its accumulator so motion stays smooth at any display rate.
         """
+        # Everything in the world scrolls scroll_speed per step, so interpolated positions
+        # are the current ones shifted right by the part of the step not yet shown.
+        lag = self.scroll_speed * self.last_dt * (1.0 - alpha)
+
         # Render the background.
         # If a background image is set, we implement scrolling by blitting it twice.
         if self.background is not None:
+            bg_width = self.background.get_width()
+            bg_x = self.bg_x + lag
+            if bg_x > 0:
+                bg_x -= bg_width
             # Blit the background image at the current scroll position.
-            self.screen.blit(self.background, (self.bg_x, 0))
+            self.screen.blit(self.background, (bg_x, 0))
             # Blit a second copy to create a seamless scrolling effect.
-            self.screen.blit(self.background, (self.bg_x + self.background.get_width(), 0))
+            self.screen.blit(self.background, (bg_x + bg_width, 0))
         else:
             # If no background image is set, fill the screen with a solid color (e.g., sky blue).
             self.screen.fill((135, 206, 250))
         
         # Draw each obstacle using its draw method.
         for obstacle in self.obstacles:
-            obstacle.draw(self.screen)
+            obstacle.draw(self.screen, offset_x=lag)
         
-        # Draw the player using its draw method.
-        self.player.draw(self.screen)
+        # Draw the player using its draw method, between its previous and current position.
+        player_y = self.prev_player_y + (self.player.y - self.prev_player_y) * alpha
+        self.player.draw(self.screen, y=player_y)
         
         # Optionally, display the current score.
-        # Create a font for rendering the score. (You can adjust font size and type as needed.)
-        font = pygame.font.SysFont("Arial", 30)
-        score_surface = font.render(f"Score: {int(self.score)}", True, (0, 0, 0))
+        # Create a font for rendering the score once and reuse it. (You can adjust font size and type as needed.)
+        if self.font is None:
+            self.font = pygame.font.SysFont("Arial", 30)
+        score_surface = self.font.render(f"Score: {int(self.score)}", True, (0, 0, 0))
         # Blit the score in the top left corner.
         self.screen.blit(score_surface, (10, 10))
-        
-        # Update the display to show the new frame.
-        pygame.display.flip()
+
+    def get_frame(self):
+        """
+        Return the last drawn frame as an RGB array.
+
+        Returns:
+            np.ndarray: A (SCREEN_HEIGHT, SCREEN_WIDTH, 3) uint8 array (a copy of the screen pixels).
+        """
+        pixels = pygame.image.tobytes(self.screen, "RGB")
+        return np.frombuffer(pixels, dtype=np.uint8).reshape(SCREEN_HEIGHT, SCREEN_WIDTH, 3)
+
 
 
 
+    def get_render_state(self):
+        """
+        Return a compact snapshot of what is on screen, for lightweight external viewers.
+
+        Returns:
+            tuple: (player_x, player_y, score, obstacles, done) where obstacles is a list of
+                   (x, gap_y, gap_height) tuples. The snapshot is cheap to pickle, so it can
+                   be fetched from environments running in worker processes.
+        """
+        obstacles = [(obs.x, obs.gap_y, obs.gap_height) for obs in self.obstacles]
+        return self.player.x, self.player.y, self.score, obstacles, self.done
 
     def get_state(self):
         """
@@ -227,46 +432,152 @@ class JetpackEnv:
             - player_to_gap_center_y: The vertical difference between the player's position and
                                     the center of the gap.
         
+        With a lookahead of K > 1, three features are appended for each of the following
+        K - 1 obstacles: obstacle_x_distance, gap_y and gap_height.
+
         Returns:
-            np.array: An array of these features.
+            np.array: An array of these features. The array is a reused buffer that is
+                      overwritten by the next-but-one call, so copy it if you keep it around.
         """
+        self._obs_index ^= 1
+        obs = self._obs_buffers[self._obs_index]
+
         # Get player's state from the Player object.
         player_y = self.player.y
-        player_y_velocity = self.player.velocity
         player_x = self.player.x  # Assume player's x is fixed (e.g., 100)
-        
+        obs[0] = player_y
+        obs[1] = self.player.velocity
+
         # Determine the next obstacle.
-        # We assume obstacles are moving left, so any obstacle with its right edge greater than
-        # the player's x is still ahead.
-        obstacles_ahead = [obs for obs in self.obstacles if (obs.x + OBSTACLE_WIDTH) > player_x]
-        
-        if obstacles_ahead:
-            # Choose the closest obstacle (i.e., with the minimum x value).
-            next_obstacle = min(obstacles_ahead, key=lambda obs: obs.x)
-            gap_y = next_obstacle.gap_y         # Top of the gap.
-            gap_height = next_obstacle.gap_height # Height of the gap.
-            obstacle_x_distance = next_obstacle.x - player_x
+        # Obstacles always spawn at the right edge and scroll at the same speed, so
+        # self.obstacles is sorted by x and the obstacles ahead of the player (right edge
+        # greater than the player's x) form a contiguous tail of the list.
+        obstacles = self.obstacles
+        first = 0
+        while first < len(obstacles) and (obstacles[first].x + OBSTACLE_WIDTH) <= player_x:
+            first += 1
+
+        if first < len(obstacles):
+            next_obstacle = obstacles[first]
+            obs[2] = next_obstacle.gap_y         # Top of the gap.
+            obs[3] = next_obstacle.gap_height    # Height of the gap.
+            obs[4] = next_obstacle.x - player_x
             # Calculate vertical distance from player to the gap center.
-            player_to_gap_center_y = player_y - (gap_y + gap_height / 2)
+            obs[5] = player_y - (next_obstacle.gap_y + next_obstacle.gap_height / 2)
         else:
             # No obstacles ahead: use default values.
-            gap_y = 0
-            gap_height = 0
+            obs[2] = 0
+            obs[3] = 0
             # Set the distance to a high default value (e.g., the width of the screen).
-            obstacle_x_distance = SCREEN_WIDTH - player_x
-            player_to_gap_center_y = 0
-
-        return np.array([
-            player_y,
-            player_y_velocity,
-            gap_y,
-            gap_height,
-            obstacle_x_distance,
-            player_to_gap_center_y
-        ], dtype=np.float32)
-
-    def _handle_collisions(self):    
-    # Call the collision checking function.
-        if game_logic.check_collision(self.player, self.obstacles):
+            obs[4] = SCREEN_WIDTH - player_x
+            obs[5] = 0
+
+        # Describe the following obstacles, padding with the "no obstacle" defaults.
+        offset = BASE_OBSERVATION_SIZE
+        for idx in range(first + 1, first + self.lookahead):
+            if idx < len(obstacles):
+                obstacle = obstacles[idx]
+                obs[offset] = obstacle.x - player_x
+                obs[offset + 1] = obstacle.gap_y
+                obs[offset + 2] = obstacle.gap_height
+            else:
+                obs[offset] = SCREEN_WIDTH - player_x
+                obs[offset + 1] = 0
+                obs[offset + 2] = 0
+            offset += OBSTACLE_OBSERVATION_SIZE
+
+        return obs
+
+    def observation_bounds(self):
+        """
+        Return the (low, high) bounds of the observation returned by get_state() (see observation_bounds).
+        """
+        return observation_bounds(self.lookahead, max_gap_height(self.base_physics, self.physics_distributions,
+                                                                 self.curriculum))
+
+    def _spawn_obstacles(self):
+        """
+        Append new obstacles at the right edge once the last one has scrolled spawn_spacing
+        pixels in from it. The spacing is the episode's physics value: the constructor's
+        spawn_spacing (procedural_gen.SPAWN_SPACING by default), unless a physics distribution
+        or the curriculum sets it on reset.
+
+        An obstacle is placed where per-frame stepping would have it by now: if the spawn threshold
+        was crossed some whole frames ago (which only happens with dt > 1), it is shifted left by
+        the distance scrolled since. Likewise, the first obstacle of an episode spawned on the
+        step's first frame. With dt=1 it always spawns exactly at SCREEN_WIDTH.
+        """
+        threshold = SCREEN_WIDTH - self.spawn_spacing
+        while not self.obstacles or (self.obstacles[-1].x < threshold):
+            if self.obstacles:
+                # Whole frames since the last obstacle crossed the threshold (0 if it just did).
+                frames_late = math.ceil((threshold - self.obstacles[-1].x) / self.scroll_speed) - 1
+            else:
+                frames_late = self.last_dt - 1
+            x_position = SCREEN_WIDTH - self.scroll_speed * frames_late
+            self.obstacles.append(generate_obstacle(x_position=x_position, min_gap=self.min_gap, max_gap=self.max_gap,
+                                                     rng=self.rng))
+
+    def _apply_physics(self, physics):
+        """
+        Use a set of physics parameters (see core.physics.PHYSICS_PARAMS) from now on.
+        """
+        self.physics = physics
+        self.player.gravity = physics["gravity"]
+        self.player.thrust = physics["thrust"]
+        self.scroll_speed = physics["scroll_speed"]
+        self.min_gap = physics["min_gap"]
+        self.max_gap = physics["max_gap"]
+        self.spawn_spacing = physics["spawn_spacing"]
+
+    def _handle_collisions(self, dt=1, thrust=False):
+        """
+        Check for collisions and mark the episode as done if one occurred, recording what
+        was hit in self.collision_cause.
+
+        Per-frame steps use the discrete overlap test; longer steps sweep the player's and
+        the obstacles' motion over the step.
+
+        Parameters:
+            dt (int): Length of the step in frames.
+            thrust (bool): Whether thrust was applied during the step.
+        """
+        if dt == 1:
+            collision = game_logic.find_collision(self.player, self.obstacles)
+            if collision is not None:
+                self.collision_contact = (self.player.y, self.player.velocity)
+        else:
+            acceleration = self.player.gravity + (self.player.thrust if thrust else 0)
+            collision = game_logic.find_collision_swept(
+                self.player, self.prev_player_y, self.obstacles, self.scroll_speed * dt, dt, acceleration)
+            if collision is not None:
+                # The player's position and velocity after t*dt frames along the step (see Player.update).
+                frames = collision[2] * dt
+                start_velocity = self.player.velocity - acceleration * dt
+                contact_y = self.prev_player_y + frames * start_velocity + acceleration * frames * (frames + 1) / 2
+                self.collision_contact = (contact_y, start_velocity + acceleration * frames)
+        if collision is not None:
+            self.collision_cause, self.collision_obstacle = collision[0], collision[1]
             # If a collision is detected, mark the episode as done.
-            self.done = True
\ No newline at end of file
+            self.done = True
+
+    def _collision_info(self, observation):
+        """
+        Return the info["collision"] entry of a step that ended in a collision: what was hit,
+        and the player and the gap of the obstacle hit at the contact. For the screen bounds,
+        the gap is that of the obstacle being flown through (or the next one) after the step.
+        """
+        player_y, velocity = self.collision_contact
+        obstacle = self.collision_obstacle
+        if obstacle is not None:
+            gap_y, gap_height = float(obstacle.gap_y), float(obstacle.gap_height)
+        else:
+            gap_y, gap_height = float(observation[2]), float(observation[3])
+        return {
+            "cause": self.collision_cause,
+            "player_y": float(player_y),
+            "velocity": float(velocity),
+            "gap_y": gap_y,
+            "gap_height": gap_height,
+            "gap_offset": float(player_y - (gap_y + gap_height / 2)) if gap_height else 0.0,
+        }
@@ -1,7 +1,8 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-from core.config import SCREEN_HEIGHT, SCREEN_WIDTH
+from core.config import LOOKAHEAD_OBSTACLES, MAX_FRAMES, FPS, GRAVITY, THRUST, REWARD_VARIANT, SCROLL_SPEED, PHYSICS_VARIANT
+from core.procedural_gen import MIN_GAP_HEIGHT, MAX_GAP_HEIGHT, SPAWN_SPACING
 from envs.jetpack_env import JetpackEnv
 
 class JetpackGymWrapper(gym.Env):
@@ -14,33 +15,46 @@ class JetpackGymWrapper(gym.Env):
           1 - Apply thrust
     
     Observation Space:
-        A Box with six features:
+        A Box with six features by default:
           [player_y, player_y_velocity, gap_y, gap_height, obstacle_x_distance, player_to_gap_center_y]
+        With a lookahead of K > 1, three features per following obstacle are appended:
+          [obstacle_x_distance, gap_y, gap_height] * (K - 1)
+
+    Render Modes:
+        'human' draws to the game window; 'rgb_array' draws to an offscreen surface and
+        returns the frame as a (height, width, 3) array. Creating the wrapper with
+        render_mode='rgb_array' never opens a window, so it works on headless machines.
     """
-    def __init__(self, human_control=False):
+    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": FPS}
+
+    def __init__(self, human_control=False, lookahead=LOOKAHEAD_OBSTACLES, max_frames=MAX_FRAMES, dt=1, render_mode=None,
+                 gravity=GRAVITY, thrust=THRUST, min_gap=MIN_GAP_HEIGHT, max_gap=MAX_GAP_HEIGHT, reward=REWARD_VARIANT,
+                 scroll_speed=SCROLL_SPEED, physics=PHYSICS_VARIANT, spawn_spacing=SPAWN_SPACING, curriculum=None):
         super().__init__()
-        self.env = JetpackEnv(human_control=human_control)
+        # Every step advances the game by dt frames (see JetpackEnv.step).
+        self.dt = dt
+        self.render_mode = render_mode
+        self.env = JetpackEnv(human_control=human_control, lookahead=lookahead, max_frames=max_frames,
+                              headless=(render_mode == "rgb_array"), gravity=gravity, thrust=thrust,
+                              min_gap=min_gap, max_gap=max_gap, reward=reward,
+                              scroll_speed=scroll_speed, physics=physics, spawn_spacing=spawn_spacing,
+                              curriculum=curriculum)
         
         # Define action space: 0 (no thrust) or 1 (thrust)
         self.action_space = spaces.Discrete(2)
         
-        # Define observation space:
-        # For example, we assume:
-        #   player_y in [0, SCREEN_HEIGHT]
-        #   player_y_velocity in [-50, 50] (adjust as needed)
-        #   gap_y in [0, SCREEN_HEIGHT]
-        #   gap_height in [100, 250] (adjust based on dynamic gap range)
-        #   obstacle_x_distance in [0, SCREEN_WIDTH]
-        #   player_to_gap_center_y in [-SCREEN_HEIGHT, SCREEN_HEIGHT]
-        low = np.array([0, -50.0, 0, 150, 0, -SCREEN_HEIGHT], dtype=np.float32)
-        high = np.array([SCREEN_HEIGHT, 50.0, SCREEN_HEIGHT, 400, SCREEN_WIDTH, SCREEN_HEIGHT], dtype=np.float32)
+        # Define observation space from the bounds of the environment's observation layout.
+        low, high = self.env.observation_bounds()
         self.observation_space = spaces.Box(low=low, high=high, dtype=np.float32)
         
-    def reset(self, **kwargs):
+    def reset(self, seed=None, options=None):
         """
         Reset the environment and return the initial observation and an info dict.
+
+        A seed makes the course (the sequence of obstacles) reproducible.
         """
-        observation = self.env.reset()
+        super().reset(seed=seed)
+        observation = self.env.reset(seed=seed)
         return observation, {}
     
     def step(self, action):
@@ -51,19 +65,37 @@ class JetpackGymWrapper(gym.Env):
             observation (np.array): The current state.
             reward (float): The reward for the step.
             terminated (bool): Whether the episode ended due to a terminal condition (collision).
-            truncated (bool): False (unless you implement a separate timeout mechanism).
-            info (dict): Additional information (e.g., score, frame count).
+            truncated (bool): Whether the episode hit the time limit (max_frames).
+            info (dict): Additional information (e.g., score, frame count, rolling episode stats).
         """
-        observation, reward, done, info = self.env.step(action)
+        observation, reward, done, info = self.env.step(action, self.dt)
+        truncated = info["truncated"]
         # In Gymnasium, step returns (obs, reward, terminated, truncated, info)
-        return observation, reward, done, False, info
+        return observation, reward, done and not truncated, truncated, info
     
-    def render(self, mode='human'):
+    def render(self, mode=None):
         """
         Render the environment.
+
+        Parameters:
+            mode (str, optional): 'human' or 'rgb_array'. Defaults to the wrapper's render_mode,
+                                  or 'human' if none was given.
+
+        Returns:
+            np.ndarray: The frame in 'rgb_array' mode, otherwise None.
         """
+        mode = mode or self.render_mode or "human"
+        if mode == "rgb_array":
+            self.env.draw()
+            return self.env.get_frame()
         self.env.render()
     
+    def render_state(self):
+        """
+        Return the compact render snapshot of the environment (see JetpackEnv.get_render_state).
+        """
+        return self.env.get_render_state()
+
     def close(self):
         """
         Clean up the environment.
@@ -0,0 +1,124 @@
+import math
+import os
+import time
+import pygame
+from core.config import SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, OBSTACLE_WIDTH, MONITOR_TILE_WIDTH, MONITOR_REFRESH_HZ
+
+
+class TiledMonitor:
+    """
+    A live view of many environments at once, drawn as thumbnails into one tiled window.
+
+    Each environment is drawn from its compact render snapshot (JetpackEnv.get_render_state)
+    with plain rectangles instead of sprites, and the view only refreshes refresh_hz times
+    per second, so watching training costs little of the rollout throughput. With an
+    output_dir the monitor draws offscreen and saves every refresh as a PNG instead.
+    """
+
+    SKY_COLOR = (135, 206, 250)
+    OBSTACLE_COLOR = (255, 0, 0)
+    PLAYER_COLOR = (255, 200, 0)
+    CRASHED_COLOR = (60, 60, 60)
+    BORDER_COLOR = (0, 0, 0)
+
+    def __init__(self, num_envs, columns=None, tile_width=MONITOR_TILE_WIDTH, refresh_hz=MONITOR_REFRESH_HZ, output_dir=None):
+        """
+        Initialize the monitor.
+
+        Parameters:
+            num_envs (int): Number of environments shown.
+            columns (int, optional): Number of tile columns. Defaults to a near-square grid.
+            tile_width (int): Width of each thumbnail; the height follows the screen's aspect ratio.
+            refresh_hz (float): Maximum number of redraws per second.
+            output_dir (str, optional): Save frames as PNGs in this directory instead of opening a window.
+        """
+        self.num_envs = num_envs
+        self.columns = columns or math.ceil(math.sqrt(num_envs))
+        self.rows = math.ceil(num_envs / self.columns)
+        self.scale = tile_width / SCREEN_WIDTH
+        self.tile_width = tile_width
+        self.tile_height = round(SCREEN_HEIGHT * self.scale)
+        self.refresh_interval = 1.0 / refresh_hz
+        self.output_dir = output_dir
+        self.frames = 0
+        self._last_refresh = -math.inf
+
+        size = (self.columns * self.tile_width, self.rows * self.tile_height)
+        if output_dir is None:
+            pygame.init()
+            self.surface = pygame.display.set_mode(size)
+            pygame.display.set_caption("JetpackRL Training Monitor")
+        else:
+            pygame.font.init()
+            os.makedirs(output_dir, exist_ok=True)
+            self.surface = pygame.Surface(size)
+        self.font = pygame.font.SysFont("Arial", 14)
+
+        # Player size in thumbnail pixels (at least one pixel so it never disappears).
+        self.player_size = (max(1, round(PLAYER_WIDTH * self.scale)), max(1, round(PLAYER_HEIGHT * self.scale)))
+        self.obstacle_width = max(1, round(OBSTACLE_WIDTH * self.scale))
+
+    def due(self):
+        """
+        Return whether enough time has passed since the last refresh to draw again.
+        """
+        return time.perf_counter() - self._last_refresh >= self.refresh_interval
+
+    def update(self, get_states):
+        """
+        Redraw the monitor if a refresh is due.
+
+        Parameters:
+            get_states (callable): Returns a list of render snapshots, one per environment. It is
+                                   only called when a refresh is due, so fetching snapshots from
+                                   worker processes happens at the refresh rate, not every step.
+
+        Returns:
+            bool: True if the monitor was redrawn.
+        """
+        if not self.due():
+            return False
+        self._last_refresh = time.perf_counter()
+        self.draw(get_states())
+        self.present()
+        return True
+
+    def draw(self, states):
+        """
+        Draw one thumbnail per render snapshot.
+        """
+        scale = self.scale
+        for index, (player_x, player_y, score, obstacles, done) in enumerate(states[:self.num_envs]):
+            left = (index % self.columns) * self.tile_width
+            top = (index // self.columns) * self.tile_height
+            tile = pygame.Rect(left, top, self.tile_width, self.tile_height)
+            self.surface.fill(self.CRASHED_COLOR if done else self.SKY_COLOR, tile)
+
+            for x, gap_y, gap_height in obstacles:
+                obstacle_x = left + round(x * scale)
+                if obstacle_x >= tile.right or obstacle_x + self.obstacle_width <= left:
+                    continue
+                gap_top = round(gap_y * scale)
+                gap_bottom = round((gap_y + gap_height) * scale)
+                top_barrier = pygame.Rect(obstacle_x, top, self.obstacle_width, gap_top).clip(tile)
+                bottom_barrier = pygame.Rect(obstacle_x, top + gap_bottom, self.obstacle_width, self.tile_height - gap_bottom).clip(tile)
+                self.surface.fill(self.OBSTACLE_COLOR, top_barrier)
+                self.surface.fill(self.OBSTACLE_COLOR, bottom_barrier)
+
+            player = pygame.Rect((left + round(player_x * scale), top + round(player_y * scale)), self.player_size)
+            self.surface.fill(self.PLAYER_COLOR, player.clip(tile))
+
+            self.surface.blit(self.font.render(f"#{index} {int(score)}", False, self.BORDER_COLOR), (left + 4, top + 2))
+            pygame.draw.rect(self.surface, self.BORDER_COLOR, tile, 1)
+
+    def present(self):
+        """
+        Show the drawn frame in the window, or save it to output_dir.
+        """
+        if self.output_dir is None:
+            # Keep the window responsive; training loops do not handle events themselves.
+            pygame.event.pump()
+            pygame.display.flip()
+        else:
+            pygame.image.save(self.surface, os.path.join(self.output_dir, f"monitor_{self.frames:06d}.png"))
+        self.frames += 1
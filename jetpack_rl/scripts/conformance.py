@@ -0,0 +1,58 @@
+import argparse
+import json
+import sys
+
+from core.conformance import CANDIDATES, benchmark_engine, load_engine, run_conformance
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Check that a candidate simulation engine reproduces JetpackEnv step for step, and time both."
+    )
+    parser.add_argument("--candidate", type=str, default="reference",
+                        help=f"Registered candidate ({', '.join(CANDIDATES)}) or module:callable creating the engine.")
+    parser.add_argument("--reference", type=str, default="envs.jetpack_env:JetpackEnv",
+                        help="module:callable creating the reference engine.")
+    parser.add_argument("--steps", type=int, default=1000000,
+                        help="Total steps to compare.")
+    parser.add_argument("--actions", type=str, default="mixed", choices=("random", "adversarial", "mixed"),
+                        help="Action stream: random thrusts, adversarial edge cases, or a mix per episode.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Base seed of the courses and action streams (episode i uses seed + i).")
+    parser.add_argument("--atol", type=float, default=0.0,
+                        help="Absolute tolerance of numeric comparisons (0 requires identical results).")
+    parser.add_argument("--benchmark_steps", type=int, default=200000,
+                        help="Steps each engine is timed for on its own after the comparison (0 skips timing).")
+    parser.add_argument("--benchmark_rounds", type=int, default=3,
+                        help="Alternating timing rounds per engine; the best round counts.")
+    parser.add_argument("--max_frames", type=int, default=5000,
+                        help="Frame limit of the compared episodes.")
+    parser.add_argument("--env_kwargs", type=json.loads, default={},
+                        help='Extra keyword arguments of both engines, as JSON (e.g. \'{"lookahead": 2}\').')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    env_kwargs = {"headless": True, "max_frames": args.max_frames, **args.env_kwargs}
+    reference, candidate = load_engine(args.reference), load_engine(args.candidate)
+    result = run_conformance(reference, candidate, args.steps, actions=args.actions, seed=args.seed,
+                             atol=args.atol, env_kwargs=env_kwargs)
+    print(f"Compared {result.steps} steps over {result.episodes} episodes.")
+    if result.passed:
+        print("No divergence.")
+    else:
+        print(result.divergence)
+
+    if args.benchmark_steps > 0:
+        timing = dict(steps=args.benchmark_steps, actions=args.actions, seed=args.seed, env_kwargs=env_kwargs)
+        # Alternate the engines and keep each one's best round, so warm-up and noise from
+        # other processes do not favour whichever engine runs second.
+        reference_speed = candidate_speed = 0.0
+        for _ in range(max(1, args.benchmark_rounds)):
+            reference_speed = max(reference_speed, benchmark_engine(reference, **timing))
+            candidate_speed = max(candidate_speed, benchmark_engine(candidate, **timing))
+        print(f"Reference: {reference_speed:,.0f} steps/s, candidate: {candidate_speed:,.0f} steps/s "
+              f"(speedup {candidate_speed / reference_speed:.2f}x)")
+    return 0 if result.passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+
+from core.policies import LookupTablePolicy, load_policy
+from envs.jetpack_env import JetpackEnv
+
+
+def sample_states(teacher, num_samples, num_envs, epsilon, max_frames, rng):
+    """
+    Collect observations visited by the teacher, labeled with the teacher's actions.
+
+    num_envs headless games are stepped in lockstep and the teacher is queried once per
+    step for all of them, so labeling costs one batched forward pass per num_envs states.
+    With probability epsilon the games take a random action instead of the teacher's, to
+    visit states slightly off the teacher's own trajectories.
+
+    Returns:
+        tuple: (observations (N, obs_dim) float32, teacher actions (N,) uint8).
+    """
+    envs = [JetpackEnv(headless=True, max_frames=max_frames) for _ in range(num_envs)]
+    obs = np.stack([env.reset(seed=int(rng.integers(2**31))) for env in envs])
+    states = np.empty((num_samples, obs.shape[1]), dtype=np.float32)
+    labels = np.empty(num_samples, dtype=np.uint8)
+    filled = 0
+    while filled < num_samples:
+        actions, _ = teacher.predict(obs, deterministic=True)
+        count = min(num_envs, num_samples - filled)
+        states[filled:filled + count] = obs[:count]
+        labels[filled:filled + count] = actions[:count]
+        filled += count
+
+        explore = rng.random(num_envs) < epsilon
+        actions = np.where(explore, rng.integers(0, 2, size=num_envs), actions)
+        for i, env in enumerate(envs):
+            state, _, done, _ = env.step(int(actions[i]))
+            obs[i] = env.reset(seed=int(rng.integers(2**31))) if done else state
+    return states, labels
+
+def build_table(policy, teacher, states, labels, fill_unvisited, batch_size):
+    """
+    Fill the table with the teacher's majority action in every visited cell.
+
+    Unvisited cells get the teacher's action at the cell center (fill_unvisited), or the
+    overall majority action.
+
+    Returns:
+        np.ndarray: Boolean mask of the visited cells.
+    """
+    cells = policy.cells(states)
+    votes = np.bincount(cells * 2 + labels, minlength=policy.num_cells * 2).reshape(-1, 2)
+    visited = votes.sum(axis=1) > 0
+    policy.table[:] = votes.argmax(axis=1)
+
+    unvisited = np.flatnonzero(~visited)
+    if fill_unvisited:
+        for start in range(0, len(unvisited), batch_size):
+            chunk = unvisited[start:start + batch_size]
+            actions, _ = teacher.predict(policy.cell_centers(chunk).astype(np.float32), deterministic=True)
+            policy.table[chunk] = actions
+    else:
+        policy.table[unvisited] = int(np.bincount(labels, minlength=2).argmax())
+    return visited
+
+def play_episodes(policy, seeds, max_frames):
+    """
+    Play one episode per seed with a policy and return the episode rewards and the mean time per action.
+    """
+    env = JetpackEnv(headless=True, max_frames=max_frames)
+    rewards = []
+    inference = 0.0
+    steps = 0
+    for seed in seeds:
+        obs = env.reset(seed=seed)
+        done = False
+        total = 0
+        while not done:
+            start = time.perf_counter()
+            action, _ = policy.predict(obs, deterministic=True)
+            inference += time.perf_counter() - start
+            obs, reward, done, _ = env.step(int(action))
+            total += reward
+            steps += 1
+        rewards.append(total)
+    return rewards, inference / max(1, steps)
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Distill a trained policy into a lookup table over a quantized observation grid."
+    )
+    parser.add_argument("--model_path", type=str, default="saves/models/ppo_model",
+                        help="Policy to distill (a PPO model or an .npz policy).")
+    parser.add_argument("--save_path", type=str, default="saves/models/lookup_policy.npz",
+                        help="Where to save the table (loadable by evaluate.py).")
+    parser.add_argument("--bins", type=int, nargs="+", default=[16, 12, 12, 6, 12, 16],
+                        help="Bins per observation feature: player_y, velocity, gap_y, gap_height, "
+                             "obstacle distance, offset to gap center.")
+    parser.add_argument("--range_quantile", type=float, default=0.001,
+                        help="Each feature's grid covers its sampled values between this quantile and 1 minus it.")
+    parser.add_argument("--samples", type=int, default=1000000,
+                        help="Labeled states sampled from the simulator to build the table.")
+    parser.add_argument("--holdout", type=int, default=100000,
+                        help="Additional labeled states used only to measure agreement.")
+    parser.add_argument("--envs", type=int, default=256,
+                        help="Games stepped in lockstep while sampling (the teacher's batch size).")
+    parser.add_argument("--epsilon", type=float, default=0.1,
+                        help="Probability of a random action while sampling.")
+    parser.add_argument("--max_frames", type=int, default=5000,
+                        help="Frame limit of the sampling and evaluation episodes.")
+    parser.add_argument("--no_fill", action="store_true",
+                        help="Fill unvisited cells with the majority action instead of querying the teacher at their centers.")
+    parser.add_argument("--batch_size", type=int, default=65536,
+                        help="Batch size when querying the teacher at cell centers.")
+    parser.add_argument("--eval_episodes", type=int, default=10,
+                        help="Seeded episodes played by both the teacher and the table.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    os.makedirs(os.path.dirname(args.save_path) or ".", exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    teacher = load_policy(args.model_path)
+
+    start = time.perf_counter()
+    states, labels = sample_states(teacher, args.samples + args.holdout, args.envs, args.epsilon,
+                                   args.max_frames, rng)
+    print(f"Sampled {len(states)} labeled states in {time.perf_counter() - start:.1f}s")
+    train_states, train_labels = states[:args.samples], labels[:args.samples]
+    holdout_states, holdout_labels = states[args.samples:], labels[args.samples:]
+
+    # Spread the bins over the range the states actually cover rather than the (much wider)
+    # observation bounds, clipped to those bounds; outliers fall into the edge bins.
+    bounds_low, bounds_high = JetpackEnv(headless=True).observation_bounds()
+    low = np.maximum(np.quantile(train_states, args.range_quantile, axis=0), bounds_low)
+    high = np.minimum(np.quantile(train_states, 1 - args.range_quantile, axis=0), bounds_high)
+    high = np.maximum(high, low + 1e-3)
+    policy = LookupTablePolicy(low, high, args.bins)
+    print(f"Grid of {policy.num_cells} cells ({policy.table.nbytes / 1e6:.1f} MB)")
+
+    visited = build_table(policy, teacher, train_states, train_labels, not args.no_fill, args.batch_size)
+    policy.save(args.save_path)
+
+    # Agreement with the teacher: on the states the table was built from (bounded by how
+    # pure the cells are), and on held-out states from fresh episodes.
+    stats = {
+        "cells": policy.num_cells,
+        "visited_cells": int(visited.sum()),
+        "train_agreement": float((policy.predict(train_states)[0] == train_labels).mean()),
+    }
+    if len(holdout_states):
+        holdout_cells = policy.cells(holdout_states)
+        stats["holdout_agreement"] = float((policy.table[holdout_cells] == holdout_labels).mean())
+        stats["holdout_coverage"] = float(visited[holdout_cells].mean())
+
+    if args.eval_episodes:
+        seeds = [10**6 + i for i in range(args.eval_episodes)]
+        teacher_rewards, teacher_time = play_episodes(teacher, seeds, args.max_frames)
+        table_rewards, table_time = play_episodes(policy, seeds, args.max_frames)
+        stats.update({
+            "teacher_reward_mean": float(np.mean(teacher_rewards)),
+            "table_reward_mean": float(np.mean(table_rewards)),
+            "teacher_inference_us": teacher_time * 1e6,
+            "table_inference_us": table_time * 1e6,
+        })
+
+    stats_path = os.path.splitext(args.save_path)[0] + "_stats.json"
+    with open(stats_path, "w") as f:
+        json.dump(stats, f, indent=2)
+    for key, value in stats.items():
+        print(f"{key}: {value:.4g}" if isinstance(value, float) else f"{key}: {value}")
+    print(f"Saved table to {args.save_path} and statistics to {stats_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import argparse
+import os
+import time
 import pygame
-from stable_baselines3 import PPO
+from core.failure_stats import FailureStats, plot_failure_stats
+from core.metrics import start_metrics_server
+from core.policies import load_policy
+from core.recording import FrameRecorder
 from envs.jetpack_gym_wrapper import JetpackGymWrapper
 
 def wait_for_enter(env):
@@ -47,40 +52,74 @@ def wait_for_enter(env):
         pygame.time.delay(100)
     return True
 
-def evaluate(model, num_episodes=5):
+def evaluate(model, num_episodes=5, headless=False, record_dir=None, record_every=1, frame_stride=1, downscale=1, seed=None,
+             metrics=None, failure_stats=None):
     """
     Evaluate the provided model for a number of episodes and render the performance.
     
     Parameters:
-        model: A trained PPO model.
+        model: A trained policy with a predict(obs) method (a PPO model or an MLPPolicy).
         num_episodes (int): The number of evaluation episodes to run.
+        headless (bool): Run without a window, prompt or frame delay (e.g. on a server).
+        record_dir (str, optional): Record episodes into this directory (see core.recording).
+        record_every (int): Record every record_every-th episode.
+        frame_stride (int): Keep one frame out of every frame_stride steps of a recorded episode.
+        downscale (int): Downscale recorded frames by this factor in both directions.
+        seed (int, optional): Seed the first episode's course, so different policies can be
+                              compared on the same sequence of obstacles.
+        metrics (GameMetrics, optional): Report step and inference timings, FPS and episodes to these live metrics.
+        failure_stats (FailureStats, optional): Fold every episode ending into these failure statistics.
     """
-    # Create the evaluation environment (agent-controlled).
-    env = JetpackGymWrapper(human_control=False)
+    # Create the evaluation environment (agent-controlled), drawing offscreen when headless.
+    env = JetpackGymWrapper(human_control=False, render_mode="rgb_array" if headless else "human")
     
     # Wait for the user to press ENTER using the pygame window.
-    if not wait_for_enter(env):
+    if not headless and not wait_for_enter(env):
         return
     
     for ep in range(num_episodes):
-        obs, _ = env.reset()
+        obs, _ = env.reset(seed=seed if ep == 0 else None)
         done = False
         total_reward = 0
+
+        recorder = None
+        if record_dir is not None and ep % record_every == 0:
+            recorder = FrameRecorder(os.path.join(record_dir, f"episode_{ep+1:03d}"), stride=frame_stride, downscale=downscale)
         
+        clock = pygame.time.Clock()
         while not done:
             # Use the trained model to predict the next action.
+            start = time.perf_counter()
             action, _states = model.predict(obs)
+            inferred = time.perf_counter()
             obs, reward, terminated, truncated, info = env.step(action)
+            if metrics is not None:
+                metrics.inference_seconds.observe(inferred - start)
+                metrics.record_step(time.perf_counter() - inferred)
             total_reward += reward
             
             # Render the environment.
-            env.render()
-            pygame.time.delay(20)
+            if not headless:
+                env.render()
+                pygame.time.delay(20)
+                clock.tick()
+                if metrics is not None:
+                    metrics.fps.set(clock.get_fps())
+            if recorder is not None:
+                recorder.capture(lambda: env.render(mode="rgb_array"))
             
-            # Check if the episode has ended.
+            # Check if the episode has ended (collision or time limit).
             done = terminated or truncated
 
-        print(f"Episode {ep+1}: Total Reward: {total_reward}")
+        if recorder is not None:
+            recorder.close()
+        if metrics is not None:
+            metrics.record_episode(info["frame_count"], total_reward)
+        if failure_stats is not None:
+            failure_stats.record_info(info)
+
+        suffix = " (time limit reached)" if truncated else f" ({info['collision']['cause']})"
+        print(f"Episode {ep+1}: Total Reward: {total_reward}{suffix}")
 
     env.close()
     pygame.quit()
@@ -88,13 +127,13 @@ def evaluate(model, num_episodes=5):
 def main():
     # Parse command-line arguments.
     parser = argparse.ArgumentParser(
-        description="Evaluate a trained PPO model on the Jetpack RL environment."
+        description="Evaluate a trained PPO model (or a NumPy .npz policy) on the Jetpack RL environment."
     )
     parser.add_argument(
         "--model_path",
         type=str,
         default="saves/models/ppo_model",
-        help="Path to the trained model to evaluate."
+        help="Path to the trained model to evaluate (a PPO model, or an .npz policy from train_es)."
     )
     parser.add_argument(
         "--episodes",
@@ -102,13 +141,76 @@ def main():
         default=5,
         help="Number of evaluation episodes to run."
     )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run without opening a window (no start prompt, no frame delay)."
+    )
+    parser.add_argument(
+        "--record_dir",
+        type=str,
+        default=None,
+        help="Record evaluation episodes as memory-mappable raw frames in this directory."
+    )
+    parser.add_argument(
+        "--record_every",
+        type=int,
+        default=1,
+        help="Record every Nth evaluation episode."
+    )
+    parser.add_argument(
+        "--frame_stride",
+        type=int,
+        default=1,
+        help="Keep one frame out of every N steps of a recorded episode."
+    )
+    parser.add_argument(
+        "--downscale",
+        type=int,
+        default=1,
+        help="Downscale recorded frames by this factor in both directions."
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed the evaluation courses, to compare policies on the same obstacles."
+    )
+    parser.add_argument(
+        "--metrics_port",
+        type=int,
+        default=None,
+        help="Serve live Prometheus-style metrics on this local port."
+    )
+    parser.add_argument(
+        "--failure_stats",
+        type=str,
+        default=None,
+        help="Aggregate how the episodes end (collision causes, death heatmaps) and save them to "
+             "this .npz file, with a plot next to it."
+    )
     args = parser.parse_args()
     
-    # Load the trained PPO model from the provided path.
-    model = PPO.load(args.model_path)
+    # Start the live metrics endpoint if requested.
+    metrics = None
+    if args.metrics_port is not None:
+        metrics, _server = start_metrics_server(args.metrics_port)
+    
+    # Load the trained model (PPO or NumPy policy) from the provided path.
+    model = load_policy(args.model_path)
+    
+    failure_stats = FailureStats() if args.failure_stats else None
     
     # Run evaluation.
-    evaluate(model, num_episodes=args.episodes)
+    evaluate(model, num_episodes=args.episodes, headless=args.headless, record_dir=args.record_dir,
+             record_every=args.record_every, frame_stride=args.frame_stride, downscale=args.downscale,
+             seed=args.seed, metrics=metrics, failure_stats=failure_stats)
+    
+    if failure_stats is not None:
+        os.makedirs(os.path.dirname(args.failure_stats) or ".", exist_ok=True)
+        failure_stats.save(args.failure_stats)
+        plot_failure_stats(failure_stats, os.path.splitext(args.failure_stats)[0] + ".png")
+        print(f"Episode endings: {failure_stats.summary()}")
 
 if __name__ == "__main__":
     main()
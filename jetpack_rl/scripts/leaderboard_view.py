@@ -0,0 +1,254 @@
+import argparse
+import random
+import time
+import pygame
+import numpy as np
+
+from core.assets import TextCache
+from core.config import SCREEN_WIDTH, SCREEN_HEIGHT, RENDER_FPS
+from core.leaderboard import SCORE_HISTORY_PATH, RankedScores, load_score_history
+
+ROW_HEIGHT = 32
+HEADER_HEIGHT = 56
+FOOTER_HEIGHT = 36
+BACKGROUND_COLOR = (24, 26, 34)
+ROW_COLORS = ((34, 37, 48), (40, 44, 57))
+SELECTED_COLOR = (70, 90, 140)
+TEXT_COLOR = (230, 230, 230)
+DIM_COLOR = (150, 155, 170)
+GOLD_COLOR = (240, 200, 80)
+
+def format_score(score):
+    return str(int(score)) if float(score).is_integer() else f"{score:.1f}"
+
+
+class LeaderboardView:
+    """
+    A scrollable leaderboard screen that only draws the rows currently visible.
+
+    The view keeps an index of its first visible row and the selected row; every frame
+    it fetches just the visible entries from the RankedScores and blits their text from
+    a TextCache, so the cost of a frame does not depend on the number of entries.
+
+    Keys:
+        Up/Down, Page Up/Page Down, Home/End and the mouse wheel scroll.
+        / (or Ctrl+F) searches by name: the list is filtered to the matching entries,
+        which keep their overall rank. Escape clears the search.
+        G jumps to a rank (in a filtered list, to the nearest matching entry at or below it).
+        Escape or Q quits.
+    """
+
+    def __init__(self, scores, surface):
+        """
+        Parameters:
+            scores (RankedScores): Entries to show.
+            surface (pygame.Surface): Surface to draw on.
+        """
+        self.scores = scores
+        self.surface = surface
+        self.text = TextCache(pygame.font.SysFont("Arial", 20))
+        self.title_text = TextCache(pygame.font.SysFont("Arial", 30, bold=True), capacity=8)
+        self.matches = None  # 0-based ranks matching the search, or None to show every entry
+        self.search_text = ""
+        self.top = 0  # First visible row
+        self.selected = 0
+        self.prompt = None  # ("search" or "rank", text typed so far) while typing
+        self.message = ""
+
+    @property
+    def num_rows(self):
+        return len(self.scores) if self.matches is None else len(self.matches)
+
+    @property
+    def page_rows(self):
+        return max(1, (self.surface.get_height() - HEADER_HEIGHT - FOOTER_HEIGHT) // ROW_HEIGHT)
+
+    def rank_of_row(self, row):
+        return row if self.matches is None else int(self.matches[row])
+
+    def select(self, row):
+        """
+        Select a row (clamped to the list) and scroll just enough to keep it visible.
+        """
+        self.selected = min(max(row, 0), max(self.num_rows - 1, 0))
+        self.message = ""
+        if self.selected < self.top:
+            self.top = self.selected
+        elif self.selected >= self.top + self.page_rows:
+            self.top = self.selected - self.page_rows + 1
+        self.top = min(max(self.top, 0), max(self.num_rows - self.page_rows, 0))
+
+    def scroll(self, rows):
+        """
+        Scroll the view without moving the selection off-screen.
+        """
+        self.top = min(max(self.top + rows, 0), max(self.num_rows - self.page_rows, 0))
+        self.selected = min(max(self.selected, self.top), self.top + self.page_rows - 1)
+
+    def apply_search(self, text):
+        """
+        Filter the list to the names containing text (an empty text shows every entry).
+        """
+        start = time.perf_counter()
+        self.search_text = text
+        self.matches = self.scores.search(text) if text else None
+        self.top = 0
+        self.select(0)
+        if text:
+            self.message = f"{self.num_rows} matches for '{text}' ({(time.perf_counter() - start) * 1000:.0f} ms)"
+
+    def jump_to_rank(self, rank):
+        """
+        Select the entry with the given 1-based rank (or, when filtered, the first match ranked at or below it).
+        """
+        index = rank - 1
+        row = index if self.matches is None else int(np.searchsorted(self.matches, index))
+        # Put the entry at the top of the page.
+        self.top = row
+        self.select(row)
+        self.message = f"Rank {rank}"
+
+    def handle_event(self, event):
+        """
+        Handle one pygame event.
+
+        Returns:
+            bool: False when the viewer should close.
+        """
+        if event.type == pygame.QUIT:
+            return False
+        if event.type == pygame.MOUSEWHEEL:
+            self.scroll(-3 * event.y)
+        elif self.prompt is not None:
+            self._handle_prompt_event(event)
+        elif event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_ESCAPE, pygame.K_q):
+                if self.matches is not None and event.key == pygame.K_ESCAPE:
+                    self.apply_search("")
+                else:
+                    return False
+            elif event.key == pygame.K_DOWN:
+                self.select(self.selected + 1)
+            elif event.key == pygame.K_UP:
+                self.select(self.selected - 1)
+            elif event.key == pygame.K_PAGEDOWN:
+                self.select(self.selected + self.page_rows)
+            elif event.key == pygame.K_PAGEUP:
+                self.select(self.selected - self.page_rows)
+            elif event.key == pygame.K_HOME:
+                self.select(0)
+            elif event.key == pygame.K_END:
+                self.select(self.num_rows - 1)
+            elif event.key == pygame.K_SLASH or (event.key == pygame.K_f and event.mod & pygame.KMOD_CTRL):
+                self.prompt = ("search", "")
+            elif event.key == pygame.K_g:
+                self.prompt = ("rank", "")
+        return True
+
+    def _handle_prompt_event(self, event):
+        kind, text = self.prompt
+        if event.type == pygame.TEXTINPUT:
+            # Ignore the character that opened the prompt, and non-digits when typing a rank.
+            if kind == "rank":
+                text += "".join(c for c in event.text if c.isdigit())
+            elif not (text == "" and event.text == "/"):
+                text += event.text
+            self.prompt = (kind, text)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.prompt = None
+            elif event.key == pygame.K_BACKSPACE:
+                self.prompt = (kind, text[:-1])
+            elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                self.prompt = None
+                if kind == "search":
+                    self.apply_search(text)
+                elif text:
+                    self.jump_to_rank(int(text))
+
+    def draw(self, fps=None):
+        surface = self.surface
+        width, height = surface.get_size()
+        surface.fill(BACKGROUND_COLOR)
+
+        title = "Leaderboard" if self.matches is None else f"Leaderboard - '{self.search_text}'"
+        surface.blit(self.title_text.render(title, GOLD_COLOR), (24, 12))
+        count = self.text.render(f"{len(self.scores)} games", DIM_COLOR)
+        surface.blit(count, (width - count.get_width() - 24, 20))
+
+        rank_x, name_x, score_x = 24, 160, width - 40
+        for i in range(min(self.page_rows, self.num_rows - self.top)):
+            row = self.top + i
+            y = HEADER_HEIGHT + i * ROW_HEIGHT
+            color = SELECTED_COLOR if row == self.selected else ROW_COLORS[row % 2]
+            surface.fill(color, (0, y, width, ROW_HEIGHT))
+
+            rank, name, score = self.scores.rows([self.rank_of_row(row)])[0]
+            text_y = y + (ROW_HEIGHT - self.text.font.get_height()) // 2
+            surface.blit(self.text.render(f"#{rank}", GOLD_COLOR if rank <= 3 else DIM_COLOR), (rank_x, text_y))
+            surface.blit(self.text.render(name, TEXT_COLOR), (name_x, text_y))
+            score_surface = self.text.render(format_score(score), TEXT_COLOR)
+            surface.blit(score_surface, (score_x - score_surface.get_width(), text_y))
+
+        # Scroll bar: the thumb covers the visible fraction of the list.
+        if self.num_rows > self.page_rows:
+            track = height - HEADER_HEIGHT - FOOTER_HEIGHT
+            thumb = max(12, track * self.page_rows // self.num_rows)
+            thumb_y = HEADER_HEIGHT + (track - thumb) * self.top // (self.num_rows - self.page_rows)
+            surface.fill(DIM_COLOR, (width - 10, thumb_y, 6, thumb))
+
+        # Footer: the prompt being typed, or the last message and the key help.
+        if self.prompt is not None:
+            kind, text = self.prompt
+            footer = f"{'Search name' if kind == 'search' else 'Jump to rank'}: {text}_"
+        else:
+            footer = self.message or "/ search   G jump to rank   Esc clear/quit"
+        if fps is not None:
+            footer += f"   {fps:.0f} fps"
+        surface.blit(self.text.render(footer, TEXT_COLOR if self.prompt else DIM_COLOR),
+                     (24, height - FOOTER_HEIGHT + 6))
+
+def random_scores(count, seed=0):
+    """
+    Generate a synthetic score history (e.g. to check that the viewer stays smooth with many entries).
+    """
+    rng = random.Random(seed)
+    syllables = ["ka", "zu", "mi", "ro", "jet", "pak", "lo", "ne", "tri", "vo"]
+    names = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) + str(rng.randint(0, 99))
+             for _ in range(count)]
+    scores = np.random.default_rng(seed).exponential(8.0, size=count).astype(np.int64)
+    return RankedScores(names, scores)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Browse the full score history.")
+    parser.add_argument("--history", type=str, default=SCORE_HISTORY_PATH,
+                        help="Score history CSV (written by play_human.py).")
+    parser.add_argument("--random", type=int, default=None, metavar="N",
+                        help="Show N synthetic entries instead of the saved history.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    scores = random_scores(args.random) if args.random else load_score_history(args.history)
+    print(f"Loaded {len(scores)} entries in {time.perf_counter() - start:.2f}s")
+
+    pygame.init()
+    surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("JetpackRL Leaderboard")
+    pygame.key.set_repeat(300, 30)
+    view = LeaderboardView(scores, surface)
+    clock = pygame.time.Clock()
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if not view.handle_event(event):
+                running = False
+        view.draw(clock.get_fps())
+        pygame.display.flip()
+        clock.tick(RENDER_FPS)
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
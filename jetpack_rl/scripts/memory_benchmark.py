@@ -0,0 +1,85 @@
+import argparse
+import random
+import sys
+
+from core.config import STEP_ALLOCATION_BUDGET
+from core.conformance import make_actions
+from core.memory import allocation_profile
+from envs.jetpack_env import JetpackEnv
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure the memory JetpackEnv allocates per step and fail if it exceeds a budget."
+    )
+    parser.add_argument("--steps", type=int, default=20000,
+                        help="Measured steps.")
+    parser.add_argument("--warmup", type=int, default=2000,
+                        help="Steps played before measuring, so caches and buffers are filled "
+                             "(continued until the first episode has ended).")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the courses and action streams.")
+    parser.add_argument("--render", action="store_true",
+                        help="Also draw every step (offscreen), to include the rendering path.")
+    parser.add_argument("--lookahead", type=int, default=1,
+                        help="Obstacles described in the observation.")
+    parser.add_argument("--budget", type=float, default=STEP_ALLOCATION_BUDGET,
+                        help="Most bytes a step may allocate on average (peak above the live memory).")
+    parser.add_argument("--retained_budget", type=float, default=8.0,
+                        help="Most bytes a step may retain on average (memory growth).")
+    return parser.parse_args()
+
+def make_stepper(env, seed, render):
+    """
+    Return a callable playing one step of seeded episodes with mixed random and adversarial actions,
+    and its state (state["episode"] counts the episodes started).
+    """
+    state = {"episode": 0}
+
+    def new_episode():
+        episode_seed = seed + state["episode"]
+        state["episode"] += 1
+        state["policy"] = make_actions("mixed", random.Random(episode_seed))
+        state["observation"] = env.reset(seed=episode_seed)
+
+    def step():
+        observation, _, done, _ = env.step(state["policy"](state["observation"]))
+        state["observation"] = observation
+        if render:
+            env.draw()
+        if done:
+            new_episode()
+
+    new_episode()
+    return step, state
+
+def main():
+    args = parse_args()
+    env = JetpackEnv(headless=True, lookahead=args.lookahead)
+    step, state = make_stepper(env, args.seed, args.render)
+    # Warm up past the first episode end, so the one-time allocations of the reset path
+    # are not counted against the measured steps.
+    warmup = 0
+    while warmup < args.warmup or state["episode"] < 2:
+        step()
+        warmup += 1
+    profile = allocation_profile(step, args.steps)
+
+    print(f"{profile['steps']} steps{' with rendering' if args.render else ''}: "
+          f"{profile['peak_bytes_per_step']:.0f} bytes allocated per step (budget {args.budget:.0f}, "
+          f"largest step {profile['max_peak_bytes']}), "
+          f"{profile['retained_bytes_per_step']:.2f} bytes retained per step (budget {args.retained_budget:g})")
+    for site, size, count in profile["sites"]:
+        print(f"  retained +{size} bytes in {count:+d} blocks at {site}")
+
+    failures = []
+    if profile["peak_bytes_per_step"] > args.budget:
+        failures.append("allocations per step")
+    if profile["retained_bytes_per_step"] > args.retained_budget:
+        failures.append("retained memory per step")
+    if failures:
+        print(f"Over budget: {', '.join(failures)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
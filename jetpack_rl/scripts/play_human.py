@@ -1,16 +1,67 @@
+import argparse
+import time
 import pygame
+from core.config import FPS, RENDER_FPS, MEMORY_SNAPSHOT_INTERVAL
+from core.demonstrations import DemonstrationRecorder
+from core.memory import MemoryMonitor, format_snapshot
+from core.metrics import start_metrics_server
+from core.timestep import FixedTimestep
 from envs.jetpack_env import JetpackEnv
 from core.leaderboard import save_score, print_leaderboard
 import matplotlib.pyplot as plt
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Play the Jetpack game.")
+    parser.add_argument(
+        "--metrics_port",
+        type=int,
+        default=None,
+        help="Serve live Prometheus-style metrics (FPS, step timings) on this local port."
+    )
+    parser.add_argument(
+        "--record",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="Record the session's (observation, action) pairs for behavior cloning "
+             "(to PATH, or a timestamped file in saves/demonstrations)."
+    )
+    parser.add_argument(
+        "--memory_log",
+        type=str,
+        default=None,
+        help="Trace memory allocations and append periodic snapshots (RSS, traced memory, and the "
+             "envs/ and core/ call sites holding the growth) to this file, for long kiosk sessions."
+    )
+    parser.add_argument(
+        "--memory_interval",
+        type=float,
+        default=MEMORY_SNAPSHOT_INTERVAL,
+        help="Seconds between memory snapshots."
+    )
+    return parser.parse_args()
+
 def main():
-    # Initialize the human-playable environment.
-    env = JetpackEnv(human_control=True)
+    args = parse_args()
+    
+    # Start the live metrics endpoint if requested.
+    metrics = None
+    if args.metrics_port is not None:
+        metrics, _server = start_metrics_server(args.metrics_port)
+    
+    # Initialize the human-playable environment (no time limit for human players).
+    env = JetpackEnv(human_control=True, max_frames=None)
     # Reset the environment to start a new game.
     observation = env.reset()
+    recorder = DemonstrationRecorder(len(observation)) if args.record is not None else None
+    memory = MemoryMonitor(args.memory_interval, args.memory_log).start() if args.memory_log is not None else None
     
-    # Create a clock object to control the frame rate.
+    # Create a clock object to measure frame times, and a fixed-timestep accumulator so that
+    # physics always runs at FPS steps per second whatever the display rate.
     clock = pygame.time.Clock()
+    timestep = FixedTimestep(1.0 / FPS)
+    info = {"score": 0}
     
     # Game loop.
     running = True
@@ -20,23 +71,41 @@ def main():
             if event.type == pygame.QUIT:
                 running = False
         
-        # Read keyboard state.
-        keys = pygame.key.get_pressed()
-        # If space bar is pressed, set action to 1 (thrust); otherwise, action is 0.
-        action = 1 if keys[pygame.K_SPACE] else 0
-        
-        # Step the environment using the given action.
-        observation, reward, done, info = env.step(action)
-        
-        # Render the environment (background, obstacles, player, score, etc.)
-        env.render()
-        
-        # Check if the game is over.
-        if done:
-            running = False
+        # Run as many fixed physics steps as the elapsed time calls for.
+        frame_time = clock.tick(RENDER_FPS) / 1000.0
+        for _ in range(timestep.advance(frame_time)):
+            # Sample the keyboard right before every physics step.
+            pygame.event.pump()
+            keys = pygame.key.get_pressed()
+            # If space bar is pressed, set action to 1 (thrust); otherwise, action is 0.
+            action = 1 if keys[pygame.K_SPACE] else 0
+            if recorder is not None:
+                recorder.record(observation, action)
+            
+            # Step the environment using the given action.
+            start = time.perf_counter()
+            observation, reward, done, info = env.step(action)
+            if metrics is not None:
+                metrics.record_step(time.perf_counter() - start)
+            
+            # Check if the game is over.
+            if done:
+                running = False
+                break
         
-        # Cap the frame rate (e.g., 60 frames per second).
-        clock.tick(60)
+        # Render the environment (background, obstacles, player, score, etc.),
+        # interpolated between the last two physics states.
+        env.render(timestep.alpha)
+        if metrics is not None:
+            metrics.fps.set(clock.get_fps())
+        if memory is not None:
+            memory.maybe_snapshot(env.frame_count)
+    
+    if metrics is not None:
+        metrics.record_episode(env.frame_count, env.episode_reward)
+    if memory is not None:
+        memory.snapshot(env.frame_count)
+        print(format_snapshot(memory.stop()))
     
     # Quit Pygame.
     pygame.quit()
@@ -44,6 +113,10 @@ def main():
     # After game over, display the final score.
     print(f"Game Over! Final Score: {info.get('score', 0)}")
     
+    if recorder is not None:
+        path = recorder.save(args.record or None, score=info.get("score", 0), frames=env.frame_count)
+        print(f"Saved {recorder.size} recorded steps to {path}")
+    
     # Optionally, prompt for the player's name and save the score.
     name = input("Enter your name for the leaderboard: ")
     save_score(name, info.get("score", 0))
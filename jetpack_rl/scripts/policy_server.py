@@ -0,0 +1,60 @@
+import argparse
+import time
+
+from core.metrics import MetricsServer
+from core.policy_server import DEFAULT_SOCKET_PATH, PolicyServer
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Serve a trained policy to local processes over a Unix socket, batching concurrent requests."
+    )
+    parser.add_argument("--model_path", type=str, default="saves/models/ppo_model",
+                        help="Model to serve (a PPO model, a .pt policy or an .npz policy).")
+    parser.add_argument("--socket", type=str, default=DEFAULT_SOCKET_PATH,
+                        help="Unix socket to listen on. Clients use --model_path unix:<socket>.")
+    parser.add_argument("--max_batch", type=int, default=256,
+                        help="Most observations per batched forward pass.")
+    parser.add_argument("--max_wait_ms", type=float, default=2.0,
+                        help="Longest time a batch waits for requests from other connected clients.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Reload the model whenever its file changes (e.g. a new best checkpoint).")
+    parser.add_argument("--stats_interval", type=float, default=10.0,
+                        help="Print traffic statistics every this many seconds (0 disables it).")
+    parser.add_argument("--metrics_port", type=int, default=None,
+                        help="Also serve the statistics as Prometheus-style metrics on this local port.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    server = PolicyServer(args.model_path, args.socket, max_batch=args.max_batch,
+                          max_wait=args.max_wait_ms / 1000).start()
+    print(f"Serving {args.model_path} on {args.socket}")
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(server.registry, args.metrics_port).start()
+        print(f"Serving metrics on http://{metrics_server.host}:{metrics_server.port}/metrics")
+
+    last_stats = time.perf_counter()
+    try:
+        while True:
+            time.sleep(1.0)
+            if args.watch:
+                try:
+                    if server.reload_if_changed():
+                        print(f"Reloaded {server.model_path}")
+                except Exception as error:
+                    # E.g. a checkpoint that is still being written: keep serving the current model.
+                    print(f"Could not reload {server.model_path} ({type(error).__name__}: {error}); "
+                          f"keeping the current model until the file changes again")
+            if args.stats_interval and time.perf_counter() - last_stats >= args.stats_interval:
+                last_stats = time.perf_counter()
+                stats = server.stats()
+                print(f"requests={stats['requests']} clients={stats['clients']} "
+                      f"batch={stats['mean_batch_observations']:.1f} latency={stats['mean_latency_ms']:.3f}ms "
+                      f"inference={stats['mean_inference_ms']:.3f}ms reloads={stats['reloads']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import os
+import time
+import traceback
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import torch
+from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from core.stats import RollingEpisodeStats
+from core.sweep import parse_param, grid_trials, random_trials, split_params, MedianStoppingRule
+from envs.jetpack_gym_wrapper import JetpackGymWrapper
+
+# Columns of the results table that only completed and pruned trials fill in.
+RESULT_METRICS = ("timesteps", "episodes", "reward_mean", "reward_p10", "reward_p90", "length_mean",
+                  "obstacles_passed_mean")
+
+
+# Callback that tracks a trial's episodes and stops the trial if it falls behind the others.
+class PruningCallback(BaseCallback):
+    def __init__(self, trial, stopper, check_interval, verbose=0):
+        super(PruningCallback, self).__init__(verbose)
+        self.trial = trial
+        self.stopper = stopper  # None disables early stopping.
+        self.check_interval = check_interval
+        self.episode_stats = RollingEpisodeStats()
+        self.pruned = False
+        self._next_check = check_interval
+
+    def _on_step(self) -> bool:
+        # Collect the episodes of all the trial's environments in one rolling window.
+        for info in self.locals["infos"]:
+            if "episode_reward" in info:
+                self.episode_stats.record(info["frame_count"], info["episode_reward"], info["obstacles_passed"])
+        if self.num_timesteps >= self._next_check:
+            checkpoint = self._next_check // self.check_interval - 1
+            self._next_check += self.check_interval
+            stats = self.episode_stats.summary()
+            if self.stopper is not None and stats["episodes"] and \
+                    self.stopper.report(self.trial, checkpoint, stats["reward_mean"]):
+                self.pruned = True
+                return False
+        return True
+
+
+def _init_worker(cpu_queue):
+    """
+    Pin a pool worker to its own CPU and keep torch single-threaded, so concurrent
+    trials do not compete for cores and their timings stay comparable.
+    """
+    cpu = cpu_queue.get()
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+    torch.set_num_threads(1)
+
+def run_trial(trial, params, settings, reports, lock):
+    """
+    Train one configuration and return its row of the results table.
+
+    Parameters:
+        trial (int): Trial number.
+        params (dict): Sampled parameters (PPO hyperparameters and env config).
+        settings (dict): Sweep-wide settings (timesteps, envs per trial, pruning, output directory).
+        reports, lock: Shared state of the median stopping rule.
+    """
+    start = time.perf_counter()
+    row = {"trial": trial, **params}
+    try:
+        env_kwargs, ppo_kwargs = split_params(params)
+        env = DummyVecEnv([lambda: JetpackGymWrapper(render_mode="rgb_array", **env_kwargs)
+                           for _ in range(settings["n_envs"])])
+        model = PPO("MlpPolicy", env, device="cpu", seed=settings["seed"] + trial, verbose=0, **ppo_kwargs)
+        stopper = None
+        if settings["pruning"]:
+            stopper = MedianStoppingRule(reports, lock, min_trials=settings["min_trials"],
+                                         grace_checkpoints=settings["grace_checkpoints"])
+        callback = PruningCallback(trial, stopper, settings["check_interval"])
+        model.learn(total_timesteps=settings["total_timesteps"], callback=callback)
+        if settings["save_models"]:
+            model.save(os.path.join(settings["output_dir"], f"trial_{trial:03d}"))
+
+        row["status"] = "pruned" if callback.pruned else "completed"
+        row["timesteps"] = model.num_timesteps
+        stats = callback.episode_stats.summary()
+        row.update({key: stats[key] for key in RESULT_METRICS if key in stats})
+        env.close()
+    except Exception:
+        row["status"] = "failed"
+        row["error"] = traceback.format_exc(limit=1).strip().splitlines()[-1]
+    row["seconds"] = round(time.perf_counter() - start, 1)
+    return row
+
+def build_trials(args):
+    space = dict(parse_param(spec) for spec in args.param)
+    if args.mode == "grid":
+        return grid_trials(space)
+    return random_trials(space, args.trials, seed=args.seed)
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Sweep PPO hyperparameters and environment settings in parallel and collect the results in one table."
+    )
+    parser.add_argument("--name", type=str, default="sweep",
+                        help="Sweep name; results go to saves/sweeps/<name>/.")
+    parser.add_argument("--param", action="append", default=[],
+                        help="Search dimension: name=v1,v2 (values), name=low:high or name=low:high:log (ranges, random mode only). "
+                             "gravity, thrust, scroll_speed, min_gap, max_gap, spawn_spacing, lookahead, dt, reward and physics "
+                             "(variant names) configure the environment; "
+                             "anything else is passed to PPO (e.g. learning_rate, n_steps, ent_coef).")
+    parser.add_argument("--mode", choices=["grid", "random"], default="grid",
+                        help="Try every combination (grid) or sample --trials configurations (random).")
+    parser.add_argument("--trials", type=int, default=10,
+                        help="Number of configurations sampled in random mode.")
+    parser.add_argument("--total_timesteps", type=int, default=200000,
+                        help="Training timesteps per trial.")
+    parser.add_argument("--n_envs", type=int, default=1,
+                        help="Environments per trial.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Trials run in parallel (default: one per available CPU).")
+    parser.add_argument("--check_interval", type=int, default=20000,
+                        help="Timesteps between early-stopping checks.")
+    parser.add_argument("--min_trials", type=int, default=3,
+                        help="Other trials that must have reached a checkpoint before a trial can be stopped there.")
+    parser.add_argument("--grace_checkpoints", type=int, default=1,
+                        help="Checkpoints every trial survives before it can be stopped.")
+    parser.add_argument("--no_pruning", action="store_true",
+                        help="Run every trial to completion.")
+    parser.add_argument("--save_models", action="store_true",
+                        help="Save each trial's model next to the results.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed for sampling configurations and for the trials' PPO seeds.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.param:
+        raise SystemExit("Nothing to sweep: give at least one --param.")
+    trials = build_trials(args)
+
+    output_dir = os.path.join("saves", "sweeps", args.name)
+    os.makedirs(output_dir, exist_ok=True)
+    settings = {
+        "total_timesteps": args.total_timesteps,
+        "n_envs": args.n_envs,
+        "check_interval": args.check_interval,
+        "pruning": not args.no_pruning,
+        "min_trials": args.min_trials,
+        "grace_checkpoints": args.grace_checkpoints,
+        "save_models": args.save_models,
+        "output_dir": output_dir,
+        "seed": args.seed,
+    }
+
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else [None] * (os.cpu_count() or 1)
+    workers = min(args.workers or len(cpus), len(trials))
+    print(f"Running {len(trials)} trials on {workers} workers.")
+
+    ctx = mp.get_context("spawn")
+    with ctx.Manager() as manager:
+        reports = manager.dict()
+        lock = manager.Lock()
+        # One CPU per worker; workers beyond the CPU count share them round-robin.
+        cpu_queue = ctx.Queue()
+        for worker in range(workers):
+            cpu_queue.put(cpus[worker % len(cpus)])
+
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(cpu_queue,)) as pool:
+            futures = [pool.submit(run_trial, trial, params, settings, reports, lock)
+                       for trial, params in enumerate(trials)]
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                print(f"trial {row['trial']}: {row['status']} reward_mean={row.get('reward_mean', float('nan')):.1f} "
+                      f"({row['seconds']}s) {trials[row['trial']]}")
+
+    results = pd.DataFrame(rows)
+    # Failed trials have no metrics: add any missing columns so the table sorts even if every trial failed.
+    results = results.reindex(columns=[*results.columns, *(key for key in RESULT_METRICS if key not in results.columns)])
+    results = results.sort_values("reward_mean", ascending=False, na_position="last")
+    results_file = os.path.join(output_dir, "results.csv")
+    results.to_csv(results_file, index=False)
+    print(results.to_string(index=False))
+    print(f"Saved results to {results_file}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
+import argparse
+import csv
 import os
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
@@ -7,8 +10,19 @@ import gymnasium as gym
 from stable_baselines3 import PPO
 from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import DummyVecEnv, VecMonitor
 
+from core.background_eval import BackgroundEvaluator, EvaluationLog
+from core.config import EPISODE_STATS_WINDOW, MONITOR_REFRESH_HZ, MAX_FRAMES, PHYSICS_VARIANT, MEMORY_SNAPSHOT_INTERVAL
+from core.demonstrations import load_demonstrations, pretrain_policy
+from core.failure_stats import FailureStats, plot_failure_stats
+from core.memory import MemoryMonitor, format_snapshot
+from core.metrics import start_metrics_server
+from core.physics import PHYSICS_VARIANTS
+from core.procedural_gen import CurriculumScheduler
+from envs.batch_vec_env import BatchVecEnv
 from envs.jetpack_gym_wrapper import JetpackGymWrapper
+from envs.monitor import TiledMonitor
 
 # Custom callback for logging losses, policy entropy, and episode lengths.
 class LoggingCallback(BaseCallback):
@@ -19,6 +33,10 @@ class LoggingCallback(BaseCallback):
         self.steps = []
         self.episode_lengths = []
         self.ep_steps = []  # Timesteps corresponding to the rollout's average episode length
+        self.stats_steps = []  # Timesteps at which the rolling statistics were sampled (once per rollout)
+        self.episode_stats = {}  # Rolling episode statistics reported by the envs at episode end
+        self._latest_stats = None
+        self.failure_stats = FailureStats()  # Collision causes and death heatmaps
 
     def _on_step(self) -> bool:
         # Log combined loss if available.
@@ -34,9 +52,22 @@ class LoggingCallback(BaseCallback):
             self.entropies.append(self.locals["policy_entropy"])
         elif "entropy" in self.locals:
             self.entropies.append(self.locals["entropy"])
+        # Record how every episode ended, and keep the latest rolling episode statistics. The
+        # statistics already cover a window of episodes, so they are sampled once per rollout:
+        # the logs grow with the rollouts, not with the (far more numerous) episodes.
+        for info in self.locals.get("infos", []):
+            stats = info.get("episode_stats")
+            if stats is not None:
+                self._latest_stats = stats
+                self.failure_stats.record_info(info)
         return True
 
     def _on_rollout_end(self) -> None:
+        if self._latest_stats is not None:
+            self.stats_steps.append(self.num_timesteps)
+            for key, value in self._latest_stats.items():
+                self.episode_stats.setdefault(key, []).append(value)
+            self._latest_stats = None
         # Log average episode length from the Monitor wrapper.
         if self.model.ep_info_buffer:
             lengths = [ep_info["l"] for ep_info in self.model.ep_info_buffer if "l" in ep_info]
@@ -51,7 +82,146 @@ class LoggingCallback(BaseCallback):
                  losses=np.array(self.losses),
                  entropies=np.array(self.entropies),
                  ep_steps=np.array(self.ep_steps),
-                 episode_lengths=np.array(self.episode_lengths))
+                 episode_lengths=np.array(self.episode_lengths),
+                 stats_steps=np.array(self.stats_steps),
+                 **{f"stats_{key}": np.array(values) for key, values in self.episode_stats.items()})
+        self.failure_stats.save("saves/plots/failure_stats.npz")
+
+
+# Callback that shows the training environments in a tiled live monitor.
+class MonitorCallback(BaseCallback):
+    def __init__(self, monitor, verbose=0):
+        super(MonitorCallback, self).__init__(verbose)
+        self.monitor = monitor
+
+    def _on_step(self) -> bool:
+        # Render snapshots are only fetched from the envs when the monitor is due for a refresh.
+        indices = range(self.monitor.num_envs)
+        self.monitor.update(lambda: self.training_env.env_method("render_state", indices=indices))
+        return True
+
+
+# Callback that evaluates policy snapshots in a background process while training continues.
+class BackgroundEvalCallback(BaseCallback):
+    def __init__(self, eval_freq, seeds, max_frames, save_path, log_path, verbose=0):
+        super(BackgroundEvalCallback, self).__init__(verbose)
+        self.eval_freq = eval_freq
+        self.seeds = seeds
+        self.max_frames = max_frames
+        self.save_path = save_path
+        self.log = EvaluationLog(log_path)
+        self.evaluator = None
+        self.last_submit = 0
+        self.best_reward = -np.inf
+        self.evaluated = 0  # Results received back from the evaluation process
+
+    def _on_training_start(self) -> None:
+        self.evaluator = BackgroundEvaluator(self.model.policy, self.seeds, self.max_frames, save_path=self.save_path)
+
+    def _on_step(self) -> bool:
+        # Only a parameter copy and a non-blocking queue put happen here; evaluation runs elsewhere.
+        if self.num_timesteps - self.last_submit >= self.eval_freq:
+            self.last_submit = self.num_timesteps
+            self.evaluator.submit(self.num_timesteps)
+        return True
+
+    def _on_rollout_end(self) -> None:
+        self._record(self.evaluator.poll())
+
+    def _on_training_end(self) -> None:
+        self._record(self.evaluator.close())
+        unfinished = self.evaluator.submitted - self.evaluated
+        print(f"Background evaluation: {self.evaluated} snapshots evaluated"
+              f"{f' ({unfinished} unfinished)' if unfinished else ''}, "
+              f"{self.evaluator.skipped} skipped while busy, best mean reward {self.best_reward:.1f} "
+              f"(saved to {self.save_path})")
+
+    def _record(self, results):
+        for result in results:
+            self.evaluated += 1
+            self.log.write(result)
+            self.best_reward = max(self.best_reward, result["reward_mean"])
+            # Logged at the current step; the snapshot's own step is in the CSV and eval/snapshot_timestep.
+            self.logger.record("eval/mean_reward", result["reward_mean"])
+            self.logger.record("eval/mean_length", result["length_mean"])
+            self.logger.record("eval/snapshot_timestep", result["timestep"])
+            self.logger.record("eval/best_mean_reward", self.best_reward)
+
+
+# Callback that feeds finished episodes to the difficulty curriculum and logs its schedule.
+class CurriculumCallback(BaseCallback):
+    def __init__(self, curriculum, log_path, verbose=0):
+        super(CurriculumCallback, self).__init__(verbose)
+        self.curriculum = curriculum
+        self.log_path = log_path
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        with open(log_path, "w", newline="") as f:
+            csv.writer(f).writerow(("timestep", "episodes") + CurriculumScheduler.FIELDS)
+
+    def _on_step(self) -> bool:
+        for info in self.locals.get("infos", []):
+            if self.curriculum.record_info(info):
+                state = self.curriculum.state()
+                print(f"Curriculum level {state['level']:.2f} at {self.num_timesteps} timesteps: gaps "
+                      f"{state['min_gap']:.0f}-{state['max_gap']:.0f}, spacing {state['spawn_spacing']:.0f}")
+        return True
+
+    def _on_rollout_end(self) -> None:
+        # One row per rollout, next to the training metrics in TensorBoard and in logs/curriculum.csv.
+        state = self.curriculum.state()
+        for field, value in state.items():
+            self.logger.record(f"curriculum/{field}", value)
+        with open(self.log_path, "a", newline="") as f:
+            csv.writer(f).writerow([self.num_timesteps, self.curriculum.episodes] + list(state.values()))
+
+
+# Callback that takes periodic memory snapshots during long runs.
+class MemoryCallback(BaseCallback):
+    def __init__(self, monitor, verbose=0):
+        super(MemoryCallback, self).__init__(verbose)
+        self.monitor = monitor
+
+    def _on_training_start(self) -> None:
+        self.monitor.start()
+
+    def _on_step(self) -> bool:
+        record = self.monitor.maybe_snapshot(self.num_timesteps)
+        if record is not None:
+            self.logger.record("memory/rss_mb", record["rss_mb"])
+            self.logger.record("memory/traced_mb", record["traced_mb"])
+        return True
+
+    def _on_training_end(self) -> None:
+        self.monitor.snapshot(self.num_timesteps)
+        print(format_snapshot(self.monitor.stop()))
+
+
+# Env wrapper that feeds step timings and finished episodes to the live metrics.
+class MetricsWrapper(gym.Wrapper):
+    def __init__(self, env, metrics):
+        super().__init__(env)
+        self.metrics = metrics
+
+    def step(self, action):
+        start = time.perf_counter()
+        observation, reward, terminated, truncated, info = self.env.step(action)
+        self.metrics.record_step(time.perf_counter() - start)
+        if terminated or truncated:
+            self.metrics.record_episode(info["frame_count"], info["episode_reward"])
+        return observation, reward, terminated, truncated, info
+
+def time_policy_inference(policy, histogram):
+    """
+    Time the policy's forward passes, i.e. the action selection during rollouts
+    (the gradient updates use evaluate_actions and are not counted).
+    """
+    start = [0.0]
+    def before(module, args):
+        start[0] = time.perf_counter()
+    def after(module, args, output):
+        histogram.observe(time.perf_counter() - start[0])
+    policy.register_forward_pre_hook(before)
+    policy.register_forward_hook(after)
 
 
 # Plotting functions.
@@ -68,16 +238,21 @@ def plot_reward_curve(log_file, save_path):
     plt.savefig(os.path.join(save_path, "reward_curve_lowgv_stablereward.png"))
     plt.close()
 
-def plot_average_reward(log_file, save_path):
+def plot_average_reward(training_logs_file, save_path):
     """
-    Plot a moving average (window=10) of the episode rewards.
+    Plot the rolling mean episode reward (with its 10th-90th percentile band)
+    as reported by the environment's rolling episode statistics.
     """
-    df = pd.read_csv(log_file, skiprows=1)
-    df["reward_ma"] = df["r"].rolling(window=10).mean()
+    data = np.load(training_logs_file)
+    if "stats_reward_mean" not in data:
+        print("No episode statistics logged. Average reward plot was not generated.")
+        return
+    stats_steps = data["stats_steps"]
     plt.figure()
-    plt.plot(df["reward_ma"])
-    plt.xlabel("Episode")
-    plt.ylabel("Average Reward (10-episode MA)")
+    plt.plot(stats_steps, data["stats_reward_mean"])
+    plt.fill_between(stats_steps, data["stats_reward_p10"], data["stats_reward_p90"], alpha=0.3)
+    plt.xlabel("Timesteps")
+    plt.ylabel(f"Average Reward ({EPISODE_STATS_WINDOW}-episode rolling mean)")
     plt.title("Average Reward per Episode Over Time")
     plt.savefig(os.path.join(save_path, "average_reward_lowgv_stablereward.png"))
     plt.close()
@@ -127,39 +302,207 @@ def plot_episode_length_curve(training_logs_file, save_path):
     plt.savefig(os.path.join(save_path, "episode_length_curve_lowgv_stablereward.png"))
     plt.close()
 
+def make_env(rank, metrics=None, physics=PHYSICS_VARIANT, curriculum=None):
+    """
+    Return a factory for the rank-th training environment, wrapped with Monitor to log episode rewards.
+    
+    The first environment logs to logs/monitor.csv (read by the reward plots); the others
+    log to logs/env<rank>_monitor.csv. With metrics, the environment also reports to the
+    live metrics endpoint. physics selects the per-episode physics distributions (see core.physics),
+    and a curriculum (shared by all environments) sets their difficulty.
+    """
+    def _init():
+        filename = "logs/monitor.csv" if rank == 0 else f"logs/env{rank}_monitor.csv"
+        env = JetpackGymWrapper(physics=physics, curriculum=curriculum)
+        if metrics is not None:
+            env = MetricsWrapper(env, metrics)
+        return Monitor(env, filename=filename)
+    return _init
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Train a PPO agent on the Jetpack RL environment."
+    )
+    parser.add_argument(
+        "--n_envs",
+        type=int,
+        default=1,
+        help="Number of environments stepped in parallel during rollouts."
+    )
+    parser.add_argument(
+        "--monitor",
+        type=int,
+        default=0,
+        help="Show this many training environments in a tiled live monitor (0 disables it)."
+    )
+    parser.add_argument(
+        "--monitor_dir",
+        type=str,
+        default=None,
+        help="Save monitor frames as PNGs in this directory instead of opening a window."
+    )
+    parser.add_argument(
+        "--monitor_hz",
+        type=float,
+        default=MONITOR_REFRESH_HZ,
+        help="Monitor refresh rate (frames per second)."
+    )
+    parser.add_argument(
+        "--metrics_port",
+        type=int,
+        default=None,
+        help="Serve live Prometheus-style metrics on this local port."
+    )
+    parser.add_argument(
+        "--physics",
+        type=str,
+        default=PHYSICS_VARIANT,
+        choices=sorted(PHYSICS_VARIANTS),
+        help="Physics variant: 'randomized' draws gravity, thrust, scroll speed and the gap range "
+             "per episode (domain randomization), so one run covers a range of settings."
+    )
+    parser.add_argument(
+        "--batch_env",
+        action="store_true",
+        help="Step all n_envs environments together in one vectorized engine (envs/batch_env.py) "
+             "instead of one environment object each. Not combinable with --monitor or --metrics_port."
+    )
+    parser.add_argument(
+        "--curriculum",
+        action="store_true",
+        help="Adapt the gap heights and obstacle spacing to the agent: start easy and make the course "
+             "harder while most episodes reach --curriculum_target frames (easier while few do)."
+    )
+    parser.add_argument(
+        "--curriculum_target",
+        type=int,
+        default=1000,
+        help="Frames an episode must survive to count as a success for the curriculum."
+    )
+    parser.add_argument(
+        "--memory_log",
+        type=str,
+        default=None,
+        help="Trace memory allocations and append periodic snapshots (RSS, traced memory, and the "
+             "envs/ and core/ call sites holding the growth) to this file. Slows training down."
+    )
+    parser.add_argument(
+        "--memory_interval",
+        type=float,
+        default=MEMORY_SNAPSHOT_INTERVAL,
+        help="Seconds between memory snapshots."
+    )
+    parser.add_argument(
+        "--bc_demos",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Recorded play sessions (files or directories, see play_human.py --record) "
+             "to pretrain the policy on with behavior cloning before PPO starts."
+    )
+    parser.add_argument(
+        "--bc_epochs",
+        type=int,
+        default=20,
+        help="Behavior cloning epochs over the recorded sessions."
+    )
+    parser.add_argument(
+        "--bc_lr",
+        type=float,
+        default=1e-3,
+        help="Behavior cloning learning rate."
+    )
+    parser.add_argument(
+        "--eval_freq",
+        type=int,
+        default=0,
+        help="Evaluate a snapshot of the policy every this many timesteps in a background process "
+             "(0 disables it). The best snapshot is saved to saves/models/best_policy.pt."
+    )
+    parser.add_argument(
+        "--eval_episodes",
+        type=int,
+        default=10,
+        help="Fixed seeded episodes per background evaluation."
+    )
+    parser.add_argument(
+        "--eval_max_frames",
+        type=int,
+        default=MAX_FRAMES,
+        help="Frame limit of the background evaluation episodes."
+    )
+    args = parser.parse_args()
+    if args.batch_env and (args.monitor > 0 or args.metrics_port is not None):
+        parser.error("--batch_env does not support --monitor or --metrics_port")
+    return args
+
 def main():
+    args = parse_args()
+
     # Create directories for saving models, logs, and plots.
     os.makedirs("saves/models", exist_ok=True)
     os.makedirs("saves/plots", exist_ok=True)
     os.makedirs("logs", exist_ok=True)
     
-    # Create the Gym environment wrapped with Monitor to log episode rewards.
-    env = JetpackGymWrapper()
-    env = Monitor(env, filename="logs/monitor.csv")
+    # Start the live metrics endpoint if requested.
+    metrics = None
+    if args.metrics_port is not None:
+        metrics, _server = start_metrics_server(args.metrics_port)
+    
+    # Create the Gym environments, each wrapped with Monitor to log episode rewards, or the
+    # batched engine with one monitor for all of them.
+    curriculum = CurriculumScheduler(target_frames=args.curriculum_target) if args.curriculum else None
+    if args.batch_env:
+        env = VecMonitor(BatchVecEnv(args.n_envs, physics=args.physics, curriculum=curriculum), filename="logs/monitor.csv")
+    else:
+        env = DummyVecEnv([make_env(rank, metrics, args.physics, curriculum) for rank in range(args.n_envs)])
     
     # Initialize the PPO model.
     model = PPO("MlpPolicy", env, verbose=1, tensorboard_log="./logs/tensorboard/")
+    if metrics is not None:
+        time_policy_inference(model.policy, metrics.inference_seconds)
+    
+    # Warm-start the policy by imitating recorded human play.
+    if args.bc_demos:
+        observations, actions = load_demonstrations(args.bc_demos)
+        print(f"Behavior cloning on {len(actions)} recorded steps")
+        for result in pretrain_policy(model.policy, observations, actions, epochs=args.bc_epochs,
+                                      learning_rate=args.bc_lr):
+            print(f"  epoch {result['epoch']}: loss {result['loss']:.4f}, "
+                  f"validation accuracy {result.get('accuracy', float('nan')):.3f}")
     
-    # Create the custom logging callback.
-    logging_callback = LoggingCallback()
+    # Create the custom logging callback, and the live monitor if requested.
+    callbacks = [LoggingCallback()]
+    if curriculum is not None:
+        callbacks.append(CurriculumCallback(curriculum, "logs/curriculum.csv"))
+    if args.memory_log is not None:
+        callbacks.append(MemoryCallback(MemoryMonitor(args.memory_interval, args.memory_log)))
+    if args.monitor > 0:
+        monitor = TiledMonitor(min(args.monitor, args.n_envs), refresh_hz=args.monitor_hz, output_dir=args.monitor_dir)
+        callbacks.append(MonitorCallback(monitor))
+    if args.eval_freq > 0:
+        seeds = [10**6 + i for i in range(args.eval_episodes)]
+        callbacks.append(BackgroundEvalCallback(args.eval_freq, seeds, args.eval_max_frames,
+                                                "saves/models/best_policy.pt", "logs/background_eval.csv"))
     
     # Set total timesteps for training.
     total_timesteps = 2000000  # Adjust as needed.
-    model.learn(total_timesteps=total_timesteps, callback=logging_callback)
+    model.learn(total_timesteps=total_timesteps, callback=callbacks)
     
     # Save the trained model.
     model.save("saves/models/ppo_model_2mil_lowgv_stablereward")
     
     # Plot and save training graphs.
     plot_reward_curve("logs/monitor.csv", "saves/plots")
-    plot_average_reward("logs/monitor.csv", "saves/plots")
     
-    # Load training logs and plot loss, entropy, and episode lengths.
+    # Load training logs and plot average reward, loss, entropy, and episode lengths.
     training_logs_file = "saves/plots/training_logs.npz"
     if os.path.exists(training_logs_file):
+        plot_average_reward(training_logs_file, "saves/plots")
         plot_loss_curve(training_logs_file, "saves/plots")
         plot_entropy_curve(training_logs_file, "saves/plots")
         plot_episode_length_curve(training_logs_file, "saves/plots")
+        plot_failure_stats(FailureStats.load("saves/plots/failure_stats.npz"), "saves/plots/failure_stats.png")
     else:
         print("Training logs not found. Additional metric plots were not generated.")
 
@@ -0,0 +1,245 @@
+import argparse
+import os
+import queue
+import time
+import multiprocessing as mp
+import numpy as np
+import torch
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+from stable_baselines3 import PPO
+
+from core.shared_ring import TrajectoryRing, SharedParameters
+from core.stats import RollingEpisodeStats
+from core.vtrace import vtrace
+from envs.jetpack_gym_wrapper import JetpackGymWrapper
+
+# Seconds the learner waits for a trajectory before checking that the actors are still running.
+ACTOR_CHECK_INTERVAL = 5.0
+
+
+def build_model(env):
+    """
+    Build the PPO model whose MlpPolicy the actors and the learner share.
+
+    The learner saves this model at the end, so the result loads with PPO.load (e.g. in evaluate.py).
+    """
+    return PPO("MlpPolicy", env, device="cpu", verbose=0)
+
+def run_actor(rank, ring_spec, params_spec, episode_queue, stop_event):
+    """
+    Actor process: step an environment continuously and fill trajectory slots.
+
+    The actor refreshes its copy of the policy whenever the learner has published new
+    parameters, at trajectory boundaries.
+    """
+    torch.set_num_threads(1)
+    ring = TrajectoryRing.attach(ring_spec)
+    shared_params = SharedParameters.attach(params_spec)
+    # Headless environment: actors never open a window.
+    env = JetpackGymWrapper(render_mode="rgb_array")
+    policy = build_model(env).policy
+    version = None
+    obs, _ = env.reset()
+    episode_reward = 0.0
+
+    T = ring.rollout_length
+    while not stop_event.is_set():
+        try:
+            slot = ring.free_slots.get(timeout=0.1)
+        except queue.Empty:
+            continue
+
+        if shared_params.version != version:
+            version, vector = shared_params.read()
+            vector_to_parameters(torch.as_tensor(vector), policy.parameters())
+
+        for t in range(T):
+            ring.obs[slot, t] = obs
+            with torch.no_grad():
+                distribution = policy.get_distribution(torch.as_tensor(obs[None]))
+                action = distribution.sample()
+                logp = distribution.log_prob(action)
+            action = int(action[0])
+            obs, reward, terminated, truncated, info = env.step(action)
+            ring.actions[slot, t] = action
+            ring.rewards[slot, t] = reward
+            ring.terminated[slot, t] = terminated
+            ring.truncated[slot, t] = truncated
+            ring.behaviour_logp[slot, t] = float(logp[0])
+            episode_reward += reward
+            if terminated or truncated:
+                if truncated:
+                    ring.final_obs[slot, t] = obs
+                episode_queue.put((info["frame_count"], episode_reward))
+                obs, _ = env.reset()
+                episode_reward = 0.0
+        ring.obs[slot, T] = obs
+        ring.policy_version[slot] = version
+        ring.full_slots.put(slot)
+
+    ring.close()
+    shared_params.close()
+
+def learner_update(policy, batch, gamma, vf_coef, ent_coef, max_grad_norm):
+    """
+    Run one V-trace actor-critic gradient step on a batch of trajectories.
+
+    Returns:
+        dict: Loss values for logging.
+    """
+    obs = torch.as_tensor(batch["obs"])                 # (B, T + 1, D)
+    actions = torch.as_tensor(batch["actions"])         # (B, T)
+    B, T = actions.shape
+    obs_dim = obs.shape[-1]
+
+    values_all = policy.predict_values(obs.reshape(-1, obs_dim)).reshape(B, T + 1)
+    distribution = policy.get_distribution(obs[:, :T].reshape(-1, obs_dim))
+    target_logp = distribution.log_prob(actions.reshape(-1)).reshape(B, T)
+    entropy = distribution.entropy().reshape(B, T)
+
+    rewards = batch["rewards"].astype(np.float64)
+    done = batch["terminated"] | batch["truncated"]
+    truncated = batch["truncated"]
+    if truncated.any():
+        # A truncated episode is cut off, not over: bootstrap from its last observation.
+        with torch.no_grad():
+            final_values = policy.predict_values(torch.as_tensor(batch["final_obs"][truncated])).reshape(-1)
+        rewards[truncated] += gamma * final_values.numpy()
+    discounts = gamma * (~done)
+
+    # V-trace works time-major: (T, B).
+    values_np = values_all.detach().numpy().astype(np.float64)
+    vs, pg_advantages = vtrace(
+        behaviour_logp=batch["behaviour_logp"].T.astype(np.float64),
+        target_logp=target_logp.detach().numpy().T.astype(np.float64),
+        rewards=rewards.T,
+        discounts=discounts.T,
+        values=values_np[:, :T].T,
+        bootstrap_value=values_np[:, T],
+    )
+    vs = torch.as_tensor(vs.T, dtype=torch.float32)
+    pg_advantages = torch.as_tensor(pg_advantages.T, dtype=torch.float32)
+
+    policy_loss = -(pg_advantages * target_logp).mean()
+    value_loss = 0.5 * ((vs - values_all[:, :T]) ** 2).mean()
+    entropy_loss = -entropy.mean()
+    loss = policy_loss + vf_coef * value_loss + ent_coef * entropy_loss
+
+    policy.optimizer.zero_grad()
+    loss.backward()
+    torch.nn.utils.clip_grad_norm_(policy.parameters(), max_grad_norm)
+    policy.optimizer.step()
+    return {"policy_loss": policy_loss.item(), "value_loss": value_loss.item(), "entropy_loss": entropy_loss.item()}
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Train the Jetpack agent with parallel actors feeding a V-trace learner through shared memory."
+    )
+    parser.add_argument("--actors", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="Number of actor processes stepping environments.")
+    parser.add_argument("--rollout_length", type=int, default=64,
+                        help="Steps per trajectory slot.")
+    parser.add_argument("--batch_trajectories", type=int, default=8,
+                        help="Trajectories per learner update.")
+    parser.add_argument("--slots", type=int, default=None,
+                        help="Trajectory slots in the shared ring (default: 2 x actors + batch_trajectories).")
+    parser.add_argument("--total_timesteps", type=int, default=2000000,
+                        help="Environment steps to train for.")
+    parser.add_argument("--learning_rate", type=float, default=3e-4)
+    parser.add_argument("--gamma", type=float, default=0.99)
+    parser.add_argument("--vf_coef", type=float, default=0.5)
+    parser.add_argument("--ent_coef", type=float, default=0.01)
+    parser.add_argument("--max_grad_norm", type=float, default=0.5)
+    parser.add_argument("--log_interval", type=float, default=10.0,
+                        help="Seconds between progress reports.")
+    parser.add_argument("--save_path", type=str, default="saves/models/ppo_actor_learner",
+                        help="Where to save the trained model (loadable with PPO.load).")
+    return parser.parse_args()
+
+def next_full_slot(ring, actors, timeout=ACTOR_CHECK_INTERVAL):
+    """
+    Return the index of the next filled trajectory slot, waiting as long as the actors run.
+
+    Raises:
+        RuntimeError: If an actor process exited (e.g. it crashed or was killed for lack of
+                      memory), instead of waiting forever for trajectories it will not write.
+    """
+    while True:
+        try:
+            return ring.full_slots.get(timeout=timeout)
+        except queue.Empty:
+            dead = [(rank, actor.exitcode) for rank, actor in enumerate(actors) if not actor.is_alive()]
+            if dead:
+                raise RuntimeError("actor processes exited: " + ", ".join(
+                    f"actor {rank} (exit code {exitcode})" for rank, exitcode in dead)) from None
+
+def main():
+    args = parse_args()
+    os.makedirs(os.path.dirname(args.save_path) or ".", exist_ok=True)
+
+    # Spawned (not forked) actors, so they do not inherit the learner's torch thread pools.
+    ctx = mp.get_context("spawn")
+    model = build_model(JetpackGymWrapper(render_mode="rgb_array"))
+    policy = model.policy
+    for group in policy.optimizer.param_groups:
+        group["lr"] = args.learning_rate
+
+    obs_dim = model.observation_space.shape[0]
+    num_slots = args.slots or 2 * args.actors + args.batch_trajectories
+    ring = TrajectoryRing(num_slots, args.rollout_length, obs_dim, ctx)
+    shared_params = SharedParameters(sum(p.numel() for p in policy.parameters()), ctx)
+    shared_params.publish(parameters_to_vector(policy.parameters()).detach().numpy())
+    episode_queue = ctx.Queue()
+    stop_event = ctx.Event()
+
+    actors = [ctx.Process(target=run_actor, args=(rank, ring.spec(), shared_params.spec(), episode_queue, stop_event), daemon=True)
+              for rank in range(args.actors)]
+    for actor in actors:
+        actor.start()
+
+    episode_stats = RollingEpisodeStats()
+    steps = 0
+    updates = 0
+    start = last_log = time.perf_counter()
+    try:
+        while steps < args.total_timesteps:
+            slots = [next_full_slot(ring, actors) for _ in range(args.batch_trajectories)]
+            batch = ring.gather(slots)
+            for slot in slots:
+                ring.free_slots.put(slot)
+
+            losses = learner_update(policy, batch, args.gamma, args.vf_coef, args.ent_coef, args.max_grad_norm)
+            shared_params.publish(parameters_to_vector(policy.parameters()).detach().numpy())
+            steps += args.batch_trajectories * args.rollout_length
+            updates += 1
+
+            while True:
+                try:
+                    length, reward = episode_queue.get_nowait()
+                except queue.Empty:
+                    break
+                episode_stats.record(length, reward, 0)
+
+            now = time.perf_counter()
+            if now - last_log >= args.log_interval:
+                last_log = now
+                stats = episode_stats.summary()
+                lag = shared_params.version - batch["policy_version"].mean()
+                print(f"steps={steps} updates={updates} steps/s={steps / (now - start):.0f} "
+                      f"episodes={stats['episodes']} reward_mean={stats['reward_mean']:.1f} "
+                      f"length_mean={stats['length_mean']:.1f} policy_lag={lag:.1f} "
+                      f"policy_loss={losses['policy_loss']:.3f} value_loss={losses['value_loss']:.3f}")
+    finally:
+        stop_event.set()
+        for actor in actors:
+            actor.join(timeout=5)
+            if actor.is_alive():
+                actor.terminate()
+        ring.close()
+        shared_params.close()
+
+    model.save(args.save_path)
+    print(f"Saved model to {args.save_path}")
+
+if __name__ == "__main__":
+    main()
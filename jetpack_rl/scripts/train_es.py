@@ -0,0 +1,184 @@
+import argparse
+import os
+import time
+import multiprocessing as mp
+import numpy as np
+
+from core.policies import MLPPolicy
+from envs.jetpack_env import JetpackEnv
+
+# Per-process state of the rollout workers, created by _init_worker.
+_policy = None
+_envs = []
+_max_frames = None
+
+
+def make_policy(env, hidden_sizes):
+    low, high = env.observation_bounds()
+    return MLPPolicy(low, high, hidden_sizes=hidden_sizes)
+
+def _init_worker(hidden_sizes, max_frames):
+    global _policy, _max_frames
+    _max_frames = max_frames
+    _policy = make_policy(_worker_envs(1)[0], hidden_sizes)
+
+def _worker_envs(count):
+    # Headless environments, created once per worker and reused for every generation.
+    while len(_envs) < count:
+        _envs.append(JetpackEnv(max_frames=_max_frames, headless=True))
+    return _envs[:count]
+
+def noise(seed, size):
+    """
+    Regenerate a perturbation from its seed, so only seeds travel between processes.
+    """
+    return np.random.default_rng(seed).standard_normal(size)
+
+def evaluate_members(center, sigma, members, course_seeds):
+    """
+    Evaluate a chunk of population members with batched rollouts.
+
+    All members of the chunk play the same courses in lockstep: at every step their
+    observations are stacked and a single batched forward pass picks all their actions.
+
+    Parameters:
+        center (np.ndarray): Current mean of the search distribution.
+        sigma (float): Perturbation scale.
+        members (list): (noise_seed, sign) pairs; a member's parameters are center + sign * sigma * noise.
+        course_seeds (list): Course seeds every member is evaluated on.
+
+    Returns:
+        tuple: (fitness array of mean episode rewards, environment steps taken).
+    """
+    params = np.stack([center + sign * sigma * noise(seed, center.size) for seed, sign in members])
+    envs = _worker_envs(len(members))
+    fitness = np.zeros(len(members))
+    steps = 0
+    for course_seed in course_seeds:
+        obs = np.stack([env.reset(seed=course_seed) for env in envs])
+        active = np.ones(len(envs), dtype=bool)
+        while active.any():
+            index = np.flatnonzero(active)
+            actions = _policy.act_batch(params[index], obs[index])
+            for i, action in zip(index, actions):
+                state, reward, done, _ = envs[i].step(int(action))
+                # Copy: the environment reuses its observation buffers.
+                obs[i] = state
+                fitness[i] += reward
+                if done:
+                    active[i] = False
+            steps += len(index)
+    return fitness / len(course_seeds), steps
+
+def centered_ranks(values):
+    """
+    Fitness shaping: replace fitness values by their ranks, scaled to [-0.5, 0.5].
+
+    Ranks make the update invariant to the reward scale and robust to outlier episodes.
+    """
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks / max(1, len(values) - 1) - 0.5
+
+
+class Adam:
+    """
+    Adam optimizer for the search distribution's mean (ascending the estimated gradient).
+    """
+
+    def __init__(self, size, learning_rate, beta1=0.9, beta2=0.999, epsilon=1e-8):
+        self.learning_rate = learning_rate
+        self.beta1, self.beta2, self.epsilon = beta1, beta2, epsilon
+        self.m = np.zeros(size)
+        self.v = np.zeros(size)
+        self.t = 0
+
+    def step(self, gradient):
+        self.t += 1
+        self.m = self.beta1 * self.m + (1 - self.beta1) * gradient
+        self.v = self.beta2 * self.v + (1 - self.beta2) * gradient ** 2
+        m_hat = self.m / (1 - self.beta1 ** self.t)
+        v_hat = self.v / (1 - self.beta2 ** self.t)
+        return self.learning_rate * m_hat / (np.sqrt(v_hat) + self.epsilon)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Train a small NumPy policy for the Jetpack environment with evolution strategies."
+    )
+    parser.add_argument("--population", type=int, default=64,
+                        help="Population size per generation (rounded up to an even number for mirrored sampling).")
+    parser.add_argument("--sigma", type=float, default=0.1,
+                        help="Standard deviation of the parameter perturbations.")
+    parser.add_argument("--learning_rate", type=float, default=0.03)
+    parser.add_argument("--weight_decay", type=float, default=0.005)
+    parser.add_argument("--hidden", type=int, nargs="+", default=[32],
+                        help="Hidden layer sizes of the policy.")
+    parser.add_argument("--courses", type=int, default=3,
+                        help="Seeded courses every member plays per generation (shared by the whole population).")
+    parser.add_argument("--max_frames", type=int, default=3000,
+                        help="Frame limit of the training episodes.")
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Rollout worker processes.")
+    parser.add_argument("--eval_courses", type=int, default=5,
+                        help="Fixed validation courses the mean policy is scored on every generation.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save_path", type=str, default="saves/models/es_policy.npz",
+                        help="Where to save the best policy (loadable by evaluate.py).")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    os.makedirs(os.path.dirname(args.save_path) or ".", exist_ok=True)
+    hidden_sizes = tuple(args.hidden)
+    policy = make_policy(JetpackEnv(headless=True), hidden_sizes)
+    rng = np.random.default_rng(args.seed)
+    center = policy.initial_params(rng)
+    optimizer = Adam(center.size, args.learning_rate)
+    pairs = (args.population + 1) // 2
+    validation_seeds = [10**6 + i for i in range(args.eval_courses)]
+
+    ctx = mp.get_context("spawn")
+    best_score = -np.inf
+    total_steps = 0
+    start = time.perf_counter()
+    with ctx.Pool(args.workers, initializer=_init_worker, initargs=(hidden_sizes, args.max_frames)) as pool:
+        for generation in range(args.generations):
+            # Mirrored sampling: every perturbation is evaluated with both signs.
+            noise_seeds = rng.integers(0, 2**31, size=pairs)
+            members = [(int(seed), sign) for seed in noise_seeds for sign in (1, -1)]
+            course_seeds = [int(seed) for seed in rng.integers(0, 2**31, size=args.courses)]
+
+            chunks = np.array_split(np.arange(len(members)), args.workers)
+            tasks = [(center, args.sigma, [members[i] for i in chunk], course_seeds) for chunk in chunks if len(chunk)]
+            # The mean policy is scored on the validation courses alongside the population.
+            tasks.append((center, 0.0, [(0, 1)], validation_seeds))
+            results = pool.starmap(evaluate_members, tasks)
+            fitness = np.concatenate([f for f, _ in results[:-1]])
+            score = float(results[-1][0][0])
+            total_steps += sum(steps for _, steps in results)
+
+            shaped = centered_ranks(fitness).reshape(pairs, 2)
+            gradient = np.zeros_like(center)
+            for seed, (plus, minus) in zip(noise_seeds, shaped):
+                gradient += (plus - minus) * noise(int(seed), center.size)
+            gradient /= 2 * pairs * args.sigma
+
+            # The validation score belongs to the mean before this generation's update.
+            if score > best_score:
+                best_score = score
+                MLPPolicy(policy.obs_low, policy.obs_high, hidden_sizes, params=center).save(args.save_path)
+            center = center + optimizer.step(gradient - args.weight_decay * center)
+            elapsed = time.perf_counter() - start
+            print(f"gen={generation} fitness_mean={fitness.mean():.1f} fitness_max={fitness.max():.1f} "
+                  f"validation={score:.1f} best={best_score:.1f} steps={total_steps} "
+                  f"steps/s={total_steps / elapsed:.0f} elapsed={elapsed:.0f}s")
+        # Let the workers exit on their own: terminating them can hang once pygame is initialized.
+        pool.close()
+        pool.join()
+
+    print(f"Saved best policy (validation reward {best_score:.1f}) to {args.save_path}")
+
+if __name__ == "__main__":
+    main()
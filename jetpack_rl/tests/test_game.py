@@ -1,13 +1,43 @@
+import os
+import multiprocessing
 import pytest
 import pygame
+import numpy as np
+import threading
+import urllib.request
+from types import SimpleNamespace
 
 # Import the constants from your config
-from core.config import SCREEN_WIDTH, SCREEN_HEIGHT, OBSTACLE_WIDTH, GAP_HEIGHT, SCROLL_SPEED, GRAVITY, THRUST
+from core.config import SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, OBSTACLE_WIDTH, GAP_HEIGHT, SCROLL_SPEED, GRAVITY, THRUST
+from core.config import STEP_ALLOCATION_BUDGET
 
 # Import modules to test
 from envs.entities import Player, Obstacle
-from core import game_logic
-from core.procedural_gen import generate_obstacle, get_next_obstacles
+from core import assets, game_logic
+from core.leaderboard import append_score_history, load_score_history
+from core.procedural_gen import (generate_obstacle, get_next_obstacles, generate_obstacles, get_next_obstacle_arrays,
+                                 obstacle_spacing, CurriculumScheduler, GAP_MARGIN, MIN_GAP_HEIGHT, MAX_GAP_HEIGHT)
+from core.stats import RollingEpisodeStats
+from core.timestep import FixedTimestep
+from core.background_eval import BackgroundEvaluator, evaluate_policy
+from core.conformance import run_conformance, benchmark_engine
+from core.demonstrations import DemonstrationRecorder, load_demonstrations, pretrain_policy
+from core.failure_stats import FailureStats
+from core.memory import MemoryMonitor, allocation_profile, format_snapshot
+from core.metrics import GameMetrics, MetricsRegistry, MetricsServer
+from core.physics import get_physics_distributions, sample_physics
+from core.policies import MLPPolicy, LookupTablePolicy, load_policy
+from core.policy_server import PolicyServer
+from core.recording import FrameRecorder, load_frames
+from core.rewards import RewardFunction, get_reward_function
+from core.shared_ring import TrajectoryRing
+from core.sweep import parse_param, grid_trials, random_trials, split_params, MedianStoppingRule
+from core.vtrace import vtrace
+from envs.batch_env import BatchJetpackEnv, SingleBatchEnv
+from envs.batch_vec_env import BatchVecEnv
+from envs.jetpack_env import JetpackEnv
+from envs.jetpack_gym_wrapper import JetpackGymWrapper
+from envs.monitor import TiledMonitor
 
 # Ensure pygame is initialized for tests that require it.
 pygame.init()
@@ -137,6 +167,29 @@ def test_get_next_obstacles():
     expected = [obs for obs in obstacles if (obs.x + OBSTACLE_WIDTH) > window_x]
     assert next_obs == expected
 
+def test_generate_obstacles():
+    """
+    Test that generate_obstacles() returns evenly spaced obstacle arrays with gaps in range.
+    """
+    x, gap_y, gap_height = generate_obstacles(1000, np.random.default_rng(0))
+    assert x.shape == gap_y.shape == gap_height.shape == (1000,)
+    assert x[0] == SCREEN_WIDTH
+    assert np.all(np.diff(x) == obstacle_spacing())
+    assert np.all((gap_y >= GAP_MARGIN) & (gap_y <= SCREEN_HEIGHT - GAP_HEIGHT - GAP_MARGIN))
+    assert np.all((gap_height >= MIN_GAP_HEIGHT) & (gap_height <= MAX_GAP_HEIGHT))
+
+def test_get_next_obstacle_arrays():
+    """
+    Test that the array version of get_next_obstacles() agrees with the list version.
+    """
+    x, gap_y, gap_height = generate_obstacles(50, np.random.default_rng(1), x_start=-500)
+    obstacles = [Obstacle(*values) for values in zip(x, gap_y, gap_height)]
+    expected = get_next_obstacles(1250, obstacles)
+    for assume_sorted in (True, False):
+        next_x, next_gap_y, _ = get_next_obstacle_arrays(1250, x, gap_y, gap_height, assume_sorted)
+        assert list(next_x) == [obs.x for obs in expected]
+        assert list(next_gap_y) == [obs.gap_y for obs in expected]
+
 #################################
 # Tests for game_logic module   #
 #################################
@@ -187,3 +240,1078 @@ def test_check_collision_with_obstacle():
     obstacles = [obstacle]
     collision = game_logic.check_collision(player, obstacles)
     assert collision is True
+
+def test_check_collision_swept_catches_tunneling():
+    """
+    Test that check_collision_swept() detects an obstacle that a single large step jumps over.
+    
+    The obstacle starts ahead of the player and ends behind it, so the discrete check sees no overlap.
+    """
+    player = SimpleNamespace(x=200, y=100)  # Level with the top barrier of the obstacle.
+    scroll_distance = 400
+    obstacle = Obstacle(200 - OBSTACLE_WIDTH - 100, 300, GAP_HEIGHT)  # Position after the step.
+    assert not (obstacle.x < player.x + PLAYER_WIDTH and obstacle.x + OBSTACLE_WIDTH > player.x)
+    assert game_logic.check_collision_swept(player, 100, [obstacle], scroll_distance) is True
+
+def test_check_collision_swept_through_gap():
+    """
+    Test that check_collision_swept() allows the player to fly through the gap during a large step.
+    """
+    player = SimpleNamespace(x=200, y=340)
+    obstacle = Obstacle(200 - OBSTACLE_WIDTH - 100, 300, GAP_HEIGHT)
+    assert game_logic.check_collision_swept(player, 320, [obstacle], 400) is False
+
+def test_large_step_collides_with_obstacle_that_scrolls_off_screen():
+    """
+    Test that a step long enough to carry an obstacle past the left edge of the screen still
+    collides with it, rather than removing the obstacle before the collision check.
+    """
+    for dt in (30, 45, 62):
+        env = JetpackEnv(headless=True)
+        env.reset(seed=0)
+        env.player.y, env.player.velocity = 375, -12
+        env.obstacles = [Obstacle(260, 600, 150)]
+        _, _, done, info = env.step(0, dt=dt)
+        assert done and info["collision"]["cause"] == game_logic.TOP_BARRIER
+        assert all(obs.x + OBSTACLE_WIDTH > 0 for obs in env.obstacles)
+
+def test_check_collision_swept_catches_apex_inside_barrier():
+    """
+    Test that check_collision_swept() follows the player's parabola, so a player who rises into
+    the top barrier and falls back out within one step still collides.
+    """
+    # Rising at 4 px per frame under gravity (0.4), the player is back at y=330 after 19 frames,
+    # having turned around at y=312 (10 frames in), above the gap starting at 320.
+    dt, velocity = 19, -4
+    player = SimpleNamespace(x=200, y=330 + velocity * dt + GRAVITY * dt * (dt + 1) / 2)
+    obstacle = Obstacle(200 - 10, 320, GAP_HEIGHT)
+    assert round(player.y) == 330
+    assert game_logic.check_collision_swept(player, 330, [obstacle], 0, dt, 0.0) is False
+    assert game_logic.check_collision_swept(player, 330, [obstacle], 0, dt, GRAVITY) is True
+
+#################################
+# Tests for JetpackEnv          #
+#################################
+
+def test_default_observation_layout():
+    """
+    Test that the default observation keeps the six-feature layout and matches the gym observation space.
+    """
+    wrapper = JetpackGymWrapper()
+    obs, _ = wrapper.reset()
+    assert obs.shape == (6,)
+    assert wrapper.observation_space.shape == (6,)
+
+def test_lookahead_observation():
+    """
+    Test that a lookahead observation describes the next K obstacles in order and pads missing ones.
+    """
+    env = JetpackEnv(lookahead=3)
+    env.reset()
+    player_x = env.player.x
+    # The first obstacle is already behind the player and must be skipped.
+    env.obstacles = [
+        Obstacle(player_x - OBSTACLE_WIDTH - 10, 100, 300),
+        Obstacle(player_x + 50, 200, 320),
+        Obstacle(player_x + 400, 250, 340),
+    ]
+    obs = env.get_state()
+    assert obs.shape == (12,)
+    assert obs[2] == 200 and obs[3] == 320 and obs[4] == 50
+    assert list(obs[6:9]) == [400, 250, 340]
+    # Only two obstacles are ahead, so the third slot uses the "no obstacle" defaults.
+    assert list(obs[9:12]) == [SCREEN_WIDTH - player_x, 0, 0]
+    low, high = env.observation_bounds()
+    assert low.shape == high.shape == (12,)
+
+def test_observation_bounds_cover_gap_heights():
+    """
+    Test that the gap height bounds follow the configured gap range, and cover the padding of
+    slots without an obstacle.
+    """
+    env = JetpackEnv(headless=True, lookahead=3, min_gap=400, max_gap=600)
+    low, high = env.observation_bounds()
+    gap_heights = [3, 8, 11]
+    assert list(high[gap_heights]) == [600] * 3 and list(low[gap_heights]) == [0] * 3
+    observation = env.reset(seed=0)
+    assert observation[3] == 0  # No obstacle has spawned yet.
+    for _ in range(300):
+        observation, _, done, _ = env.step(1 if env.player.y > 300 else 0)
+        assert np.all(observation[gap_heights] >= low[gap_heights])
+        assert np.all(observation[gap_heights] <= high[gap_heights])
+        if done:
+            env.reset()
+    assert JetpackEnv(headless=True, physics={"min_gap": 550}).observation_bounds()[1][3] == 550
+    curriculum = CurriculumScheduler()
+    assert JetpackEnv(headless=True, curriculum=curriculum).observation_bounds()[1][3] == curriculum.schedule(0.0)["max_gap"]
+
+def test_episode_truncated_at_max_frames():
+    """
+    Test that a surviving episode is truncated (not terminated) once max_frames is reached.
+    """
+    wrapper = JetpackGymWrapper(max_frames=3)
+    wrapper.reset()
+    for _ in range(2):
+        _, _, terminated, truncated, info = wrapper.step(0)
+        assert not terminated and not truncated
+        assert "episode_stats" not in info
+    _, _, terminated, truncated, info = wrapper.step(0)
+    assert truncated and not terminated
+    assert info["episode_stats"]["length_mean"] == 3
+
+def test_coarse_step_matches_per_frame_steps():
+    """
+    Test that step(action, dt=k) leaves the player, the obstacles and done where k per-frame
+    steps with the same action do, over seeded episodes with random actions.
+    """
+    for dt in (2, 3, 5):
+        for seed in range(8):
+            coarse, fine = JetpackEnv(headless=True), JetpackEnv(headless=True)
+            coarse.reset(seed=seed)
+            fine.reset(seed=seed)
+            rng = np.random.default_rng(seed)
+            done = False
+            while not done:
+                action = int(rng.integers(2)) if rng.random() < 0.7 else int(coarse.player.y > 300)
+                _, _, done, _ = coarse.step(action, dt=dt)
+                for _ in range(dt):
+                    _, _, fine_done, _ = fine.step(action)
+                    if fine_done:
+                        break
+                assert done == fine_done
+                if not done:
+                    assert coarse.player.y == pytest.approx(fine.player.y, abs=1e-9)
+                    assert coarse.player.velocity == pytest.approx(fine.player.velocity, abs=1e-9)
+                    assert ([(obs.x, obs.gap_y, obs.gap_height) for obs in coarse.obstacles] ==
+                            [(obs.x, obs.gap_y, obs.gap_height) for obs in fine.obstacles])
+                    assert coarse.frame_count == fine.frame_count
+
+#################################
+# Tests for stats module        #
+#################################
+
+def test_rolling_episode_stats_window():
+    """
+    Test that the rolling statistics only cover the last `window` episodes.
+    """
+    stats = RollingEpisodeStats(window=3)
+    assert stats.summary()["reward_mean"] == 0.0
+    for length in [10, 20, 30, 40]:
+        stats.record(length, length * 2, 1)
+    summary = stats.summary()
+    assert summary["episodes"] == 4
+    # The first episode has been overwritten by the fourth.
+    assert summary["length_mean"] == 30
+    assert summary["reward_p50"] == 60
+    assert summary["obstacles_passed_mean"] == 1
+
+#################################
+# Tests for timestep module     #
+#################################
+
+def test_fixed_timestep_accumulator():
+    """
+    Test that the accumulator runs whole physics steps and keeps the remainder as alpha.
+    """
+    timestep = FixedTimestep(step_seconds=0.01, max_frame_time=0.05)
+    assert timestep.advance(0.025) == 2
+    assert abs(timestep.alpha - 0.5) < 1e-6
+    assert timestep.advance(0.005) == 1
+    # A long hitch is clamped to max_frame_time.
+    assert timestep.advance(1.0) == 5
+
+#################################
+# Tests for assets module       #
+#################################
+
+def test_load_image_shared_and_cached_on_disk(tmp_path, monkeypatch):
+    """
+    Test that load_image() returns one shared surface per asset and reloads the same pixels from the raw cache.
+    """
+    monkeypatch.setattr(assets, "ASSET_CACHE_DIR", str(tmp_path))
+    assets.clear_cache()
+    first = assets.load_image("CaptainCwack.png", (20, 20), alpha=True)
+    assert assets.load_image("CaptainCwack.png", (20, 20), alpha=True) is first
+    assert os.path.exists(tmp_path / "CaptainCwack_20x20_RGBA.raw")
+
+    # A fresh process cache now memory-maps the raw pixels instead of decoding the PNG.
+    assets.clear_cache()
+    reloaded = assets.load_image("CaptainCwack.png", (20, 20), alpha=True)
+    assert reloaded is not first
+    assert pygame.image.tobytes(reloaded, "RGBA") == pygame.image.tobytes(first, "RGBA")
+    assets.clear_cache()
+
+#################################
+# Tests for the training monitor #
+#################################
+
+def test_tiled_monitor_throttles_and_saves_frames(tmp_path):
+    """
+    Test that the tiled monitor draws all env snapshots into one image and skips refreshes that are not due.
+    """
+    env = JetpackEnv()
+    env.reset()
+    env.step(0)
+    monitor = TiledMonitor(4, tile_width=100, refresh_hz=0.001, output_dir=str(tmp_path))
+    assert monitor.surface.get_size() == (200, 2 * round(SCREEN_HEIGHT * 100 / SCREEN_WIDTH))
+    calls = []
+    def get_states():
+        calls.append(1)
+        return [env.get_render_state()] * 4
+    assert monitor.update(get_states) is True
+    # The next refresh is not due for a long time, so snapshots are not even fetched.
+    assert monitor.update(get_states) is False
+    assert len(calls) == 1
+    assert os.path.exists(tmp_path / "monitor_000000.png")
+
+#################################
+# Tests for offscreen recording #
+#################################
+
+def test_rgb_array_render_and_recording(tmp_path):
+    """
+    Test that rgb_array rendering returns frames offscreen and that a strided, downscaled recording round-trips.
+    """
+    wrapper = JetpackGymWrapper(render_mode="rgb_array")
+    assert wrapper.env.headless
+    wrapper.reset()
+    path = str(tmp_path / "episode")
+    with FrameRecorder(path, stride=2, downscale=4) as recorder:
+        for _ in range(5):
+            wrapper.step(0)
+            recorder.capture(wrapper.render)
+    frame = wrapper.render()
+    assert frame.shape == (SCREEN_HEIGHT, SCREEN_WIDTH, 3) and frame.dtype == np.uint8
+    frames = load_frames(path)
+    assert frames.shape == (3, SCREEN_HEIGHT // 4, SCREEN_WIDTH // 4 + 1, 3)
+    assert np.array_equal(frames[-1], frame[::4, ::4])
+
+#################################
+# Tests for actor-learner parts #
+#################################
+
+def test_vtrace_on_policy_matches_discounted_return():
+    """
+    Test that V-trace targets reduce to bootstrapped discounted returns when actor and learner policies agree.
+    """
+    rng = np.random.default_rng(0)
+    T, B, gamma = 5, 3, 0.9
+    logp = np.log(rng.uniform(0.1, 1.0, size=(T, B)))
+    rewards = rng.normal(size=(T, B))
+    discounts = np.full((T, B), gamma)
+    discounts[2, 1] = 0.0  # An episode ends mid-trajectory.
+    values = rng.normal(size=(T, B))
+    bootstrap = rng.normal(size=B)
+    vs, pg_advantages = vtrace(logp, logp, rewards, discounts, values, bootstrap)
+
+    expected = np.empty((T, B))
+    acc = bootstrap
+    for t in reversed(range(T)):
+        acc = rewards[t] + discounts[t] * acc
+        expected[t] = acc
+    assert np.allclose(vs, expected)
+    assert np.allclose(pg_advantages, expected - values)
+
+def test_trajectory_ring_attach_shares_memory():
+    """
+    Test that a ring attached from its spec sees the data written into the owner's slots.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    ring = TrajectoryRing(num_slots=2, rollout_length=4, obs_dim=6, ctx=ctx)
+    attached = TrajectoryRing.attach(ring.spec())
+    slot = attached.free_slots.get()
+    attached.rewards[slot] = [1, 2, 3, 4]
+    attached.full_slots.put(slot)
+    full = ring.full_slots.get()
+    assert list(ring.gather([full])["rewards"][0]) == [1, 2, 3, 4]
+    attached.close()
+    ring.close()
+
+def test_learner_stops_waiting_when_an_actor_dies():
+    """
+    Test that the actor-learner's wait for trajectories raises once an actor process has exited.
+    """
+    from scripts.train_actor_learner import next_full_slot
+    ctx = multiprocessing.get_context("spawn")
+    ring = TrajectoryRing(num_slots=2, rollout_length=4, obs_dim=6, ctx=ctx)
+    actor = ctx.Process(target=int)  # Exits right away, like a crashed actor.
+    actor.start()
+    actor.join()
+    try:
+        ring.full_slots.put(1)
+        assert next_full_slot(ring, [actor], timeout=0.1) == 1
+        with pytest.raises(RuntimeError, match="actor 0"):
+            next_full_slot(ring, [actor], timeout=0.1)
+    finally:
+        ring.close()
+
+#############################
+# Tests for the sweep tools #
+#############################
+
+def test_sweep_search_space():
+    """
+    Test parsing of search dimensions, grid expansion, random sampling and the env/PPO parameter split.
+    """
+    assert parse_param("n_steps=256,512") == ("n_steps", [256, 512])
+    assert parse_param("learning_rate=1e-5:1e-3:log") == ("learning_rate", (1e-5, 1e-3, True))
+    with pytest.raises(ValueError):
+        parse_param("gravity")
+
+    space = dict([parse_param("gravity=0.3,0.4"), parse_param("n_steps=256,512,1024")])
+    trials = grid_trials(space)
+    assert len(trials) == 6
+    assert {"gravity": 0.4, "n_steps": 1024} in trials
+
+    space = dict([parse_param("learning_rate=1e-5:1e-3:log"), parse_param("min_gap=250:350")])
+    trials = random_trials(space, 20, seed=1)
+    assert trials == random_trials(space, 20, seed=1)
+    for params in trials:
+        assert 1e-5 <= params["learning_rate"] <= 1e-3
+        assert isinstance(params["min_gap"], int) and 250 <= params["min_gap"] <= 350
+    assert split_params({"gravity": 0.3, "learning_rate": 1e-4}) == ({"gravity": 0.3}, {"learning_rate": 1e-4})
+    assert split_params({"spawn_spacing": 250.5}) == ({"spawn_spacing": 250.5}, {})
+
+def test_median_stopping_rule():
+    """
+    Test that a trial is only stopped below the median of the other trials, after the grace period.
+    """
+    stopper = MedianStoppingRule({}, threading.Lock(), min_trials=2, grace_checkpoints=1)
+    # Too few other trials have reported yet.
+    assert not stopper.report(0, 1, 10.0)
+    assert not stopper.report(1, 1, 20.0)
+    # Below the median of the others (15), but still in the grace period.
+    assert not stopper.report(2, 0, 5.0)
+    assert stopper.report(2, 1, 5.0)
+    assert not stopper.report(3, 1, 30.0)
+
+def test_env_physics_and_gap_config():
+    """
+    Test that gravity, thrust and the gap range can be configured per environment.
+    """
+    env = JetpackEnv(gravity=0.5, thrust=-2.0, min_gap=320, max_gap=330)
+    env.reset()
+    env.step(1)
+    assert env.player.velocity == pytest.approx(-1.5)
+    assert all(320 <= obs.gap_height <= 330 for obs in env.obstacles)
+    with pytest.raises(ValueError):
+        JetpackEnv(min_gap=400, max_gap=300)
+
+##########################################
+# Tests for seeding and the NumPy policy #
+##########################################
+
+def test_seeded_reset_reproduces_course():
+    """
+    Test that resetting with the same seed gives the same obstacles, through the gym wrapper too.
+    """
+    def course(seed):
+        wrapper = JetpackGymWrapper(render_mode="rgb_array")
+        wrapper.reset(seed=seed)
+        gaps = []
+        for _ in range(300):
+            wrapper.step(1 if wrapper.env.player.y > 400 else 0)
+            gaps.extend((obs.gap_y, obs.gap_height) for obs in wrapper.env.obstacles if obs.x == SCREEN_WIDTH)
+        return gaps
+
+    assert len(course(3)) > 1
+    assert course(3) == course(3)
+    assert course(3) != course(4)
+
+def test_mlp_policy_batch_predict_and_save(tmp_path):
+    """
+    Test that batched actions match single predictions and that a saved policy loads back unchanged.
+    """
+    env = JetpackEnv()
+    low, high = env.observation_bounds()
+    policy = MLPPolicy(low, high, hidden_sizes=(8,))
+    rng = np.random.default_rng(0)
+    params = np.stack([policy.initial_params(rng) for _ in range(4)])
+    obs = rng.uniform(low, high, size=(4, len(low)))
+    actions = policy.act_batch(params, obs)
+    for k in range(4):
+        policy.params = params[k]
+        action, _ = policy.predict(obs[k])
+        assert action == actions[k]
+
+    path = str(tmp_path / "policy.npz")
+    policy.save(path)
+    loaded = load_policy(path)
+    assert loaded.hidden_sizes == (8,)
+    assert np.array_equal(loaded.params, policy.params)
+    assert loaded.predict(obs[3])[0] == actions[3]
+
+##################################
+# Tests for the metrics endpoint #
+##################################
+
+def test_metrics_prometheus_text():
+    """
+    Test that counters and histograms render as cumulative Prometheus text.
+    """
+    metrics = GameMetrics()
+    metrics.record_step(0.0003)
+    metrics.record_step(0.2)
+    metrics.record_episode(100, -64.0)
+    text = metrics.registry.render()
+    assert "# TYPE jetpack_env_steps_total counter" in text
+    assert "jetpack_env_steps_total 2" in text
+    assert 'jetpack_env_step_seconds_bucket{le="0.0005"} 1' in text
+    assert 'jetpack_env_step_seconds_bucket{le="+Inf"} 2' in text
+    assert "jetpack_env_step_seconds_count 2" in text
+    assert 'jetpack_episode_reward_bucket{le="-50"} 1' in text
+    with pytest.raises(ValueError):
+        metrics.registry.counter("jetpack_env_steps_total", "duplicate")
+
+def test_metrics_server_serves_registry():
+    """
+    Test that the background server returns the registry's current metrics.
+    """
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "A test counter.")
+    server = MetricsServer(registry, 0).start()
+    try:
+        counter.inc(3)
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            body = response.read().decode()
+        assert "test_total 3" in body
+    finally:
+        server.stop()
+
+##################################
+# Tests for the slotted entities #
+##################################
+
+def test_entities_store_only_numeric_state():
+    """
+    Test that entities have no per-instance __dict__ and that their Rects follow the numeric state.
+    """
+    player = Player()
+    obstacle = Obstacle(400, 200, 300)
+    assert not hasattr(player, "__dict__")
+    assert not hasattr(obstacle, "__dict__")
+    player.y = 123.9
+    assert player.rect.topleft == (player.x, 123)
+    obstacle.update_position(10)
+    assert obstacle.top_rect == pygame.Rect(390, 0, OBSTACLE_WIDTH, 200)
+    assert obstacle.bottom_rect == pygame.Rect(390, 500, OBSTACLE_WIDTH, SCREEN_HEIGHT - 500)
+
+def test_check_collision_matches_colliderect():
+    """
+    Test that the numeric collision check agrees with pygame's colliderect on the entities' Rects,
+    including bottom barriers that extend past the screen.
+    """
+    rng = np.random.default_rng(0)
+    player = Player(start_x=200)
+    for _ in range(2000):
+        player.y = rng.uniform(-10, SCREEN_HEIGHT)
+        obstacle = Obstacle(int(rng.integers(100, 300)), int(rng.integers(0, 600)), int(rng.integers(0, 500)))
+        rect = player.get_rect()
+        expected = (rect.colliderect(obstacle.top_rect) or rect.colliderect(obstacle.bottom_rect)
+                    or player.y < 0 or player.y + rect.height > SCREEN_HEIGHT)
+        assert game_logic.check_collision(player, [obstacle]) == expected
+
+#####################################
+# Tests for the lookup table policy #
+#####################################
+
+def test_lookup_table_policy_cells_and_predict(tmp_path):
+    """
+    Test that cell centers map back to their cells, that single and batched lookups agree,
+    and that out-of-range observations fall into the edge bins.
+    """
+    policy = LookupTablePolicy([0, -10], [100, 10], [10, 4])
+    policy.table[:] = np.arange(policy.num_cells) % 2
+    cells = np.arange(policy.num_cells)
+    assert np.array_equal(policy.cells(policy.cell_centers(cells)), cells)
+
+    rng = np.random.default_rng(0)
+    obs = rng.uniform([-20, -15], [120, 15], size=(200, 2))
+    batch_actions, _ = policy.predict(obs)
+    for o, action in zip(obs, batch_actions):
+        assert policy.predict(o)[0] == action
+    assert policy.cells(np.array([[-5.0, -50.0], [500.0, 50.0]])).tolist() == [0, policy.num_cells - 1]
+
+    path = str(tmp_path / "table.npz")
+    policy.save(path)
+    loaded = load_policy(path)
+    assert isinstance(loaded, LookupTablePolicy)
+    assert np.array_equal(loaded.table, policy.table)
+
+##################################
+# Tests for the reward functions #
+##################################
+
+def test_reward_function_scalar_matches_array():
+    """
+    Test that the default reward matches game_logic.compute_reward (scaled by dt when
+    surviving) and that the scalar and batched paths agree for every variant.
+    """
+    survival = get_reward_function("survival")
+    for collided in (False, True):
+        for dt in (1, 3):
+            expected = game_logic.compute_reward({"collision": collided}, 0) * (1 if collided else dt)
+            assert survival(collided, dt) == expected
+
+    rng = np.random.default_rng(0)
+    collided = rng.random(50) < 0.2
+    dt = rng.integers(1, 4, size=50)
+    passed = rng.integers(0, 2, size=50)
+    offset = rng.uniform(-300, 300, size=50)
+    for variant in ("survival", "pass_bonus", "centered", "shaped"):
+        reward = get_reward_function(variant)
+        batch = reward(collided, dt, passed, offset)
+        scalars = [reward(bool(c), int(d), int(p), float(o)) for c, d, p, o in zip(collided, dt, passed, offset)]
+        assert np.allclose(batch, scalars)
+
+    with pytest.raises(ValueError):
+        get_reward_function("no_such_variant")
+
+def test_env_pass_bonus_reward():
+    """
+    Test that the pass_bonus variant adds its bonus on the step an obstacle is passed.
+    """
+    env = JetpackEnv(headless=True, reward=RewardFunction(pass_bonus=15))
+    env.reset(seed=0)
+    env.obstacles = [Obstacle(env.player.x - OBSTACLE_WIDTH + 2, 0, SCREEN_HEIGHT)]
+    _, reward, done, _ = env.step(0)
+    assert not done
+    assert env.obstacles_passed == 1
+    assert reward == 1 + 15
+
+##############################
+# Tests for behavior cloning #
+##############################
+
+def test_demonstration_recorder_round_trip(tmp_path):
+    """
+    Test that a recorded session survives buffer growth and loads back from a directory.
+    """
+    recorder = DemonstrationRecorder(obs_dim=6, capacity=2)
+    rng = np.random.default_rng(0)
+    observations = rng.normal(size=(5, 6)).astype(np.float32)
+    for i, observation in enumerate(observations):
+        recorder.record(observation, i % 2)
+    recorder.save(str(tmp_path / "session.npz"), score=3)
+
+    loaded_obs, loaded_actions = load_demonstrations([str(tmp_path)])
+    assert np.array_equal(loaded_obs, observations)
+    assert loaded_actions.tolist() == [0, 1, 0, 1, 0]
+
+def test_pretrain_policy_imitates_demonstrations():
+    """
+    Test that behavior cloning teaches a PPO policy a simple recorded rule.
+    """
+    from stable_baselines3 import PPO
+    model = PPO("MlpPolicy", JetpackGymWrapper(render_mode="rgb_array"), seed=0)
+    rng = np.random.default_rng(0)
+    observations = rng.uniform(-1, 1, size=(1000, 6)).astype(np.float32)
+    actions = (observations[:, 5] > 0).astype(np.int64)
+    history = pretrain_policy(model.policy, observations, actions, epochs=30, batch_size=64, learning_rate=3e-3)
+    assert history[-1]["accuracy"] > 0.9
+
+#####################################
+# Tests for the leaderboard history #
+#####################################
+
+def test_score_history_ranking_and_search(tmp_path):
+    """
+    Test that the appended score history loads ranked best first (ties in play order)
+    and that searching returns the overall ranks of matching names.
+    """
+    path = str(tmp_path / "history.csv")
+    for name, score in [("Ann", 5), ("bob", 12), ("Annie, Jr.", 12), ("carl", 1)]:
+        append_score_history(name, score, path)
+    scores = load_score_history(path)
+    assert len(scores) == 4
+    assert scores.rows(range(4)) == [(1, "bob", 12.0), (2, "Annie, Jr.", 12.0), (3, "Ann", 5.0), (4, "carl", 1.0)]
+    assert scores.search("ANN").tolist() == [1, 2]
+    assert scores.search("zzz").tolist() == []
+
+def test_text_cache_evicts_least_recently_used():
+    """
+    Test that the text cache reuses surfaces and drops the least recently drawn string when full.
+    """
+    cache = assets.TextCache(pygame.font.Font(None, 20), capacity=2)
+    first = cache.render("a", (0, 0, 0))
+    cache.render("b", (0, 0, 0))
+    assert cache.render("a", (0, 0, 0)) is first
+    cache.render("c", (0, 0, 0))  # Evicts "b", the least recently used.
+    assert len(cache) == 2
+    assert cache.render("a", (0, 0, 0)) is first
+
+###############################
+# Tests for failure analytics #
+###############################
+
+def test_collision_cause():
+    """
+    Test that collisions are attributed to the barrier or screen edge that was hit.
+    """
+    player = Player(start_x=100, start_y=300)
+    obstacle = Obstacle(90, 250, 100)
+    assert game_logic.collision_cause(player, [obstacle]) is None
+    player.y = 240
+    assert game_logic.collision_cause(player, [obstacle]) == game_logic.TOP_BARRIER
+    player.y = 330
+    assert game_logic.collision_cause(player, [obstacle]) == game_logic.BOTTOM_BARRIER
+    player.y = -1
+    assert game_logic.collision_cause(player, []) == game_logic.CEILING
+    player.y = SCREEN_HEIGHT
+    assert game_logic.collision_cause(player, []) == game_logic.FLOOR
+
+def test_collision_info_describes_obstacle_hit():
+    """
+    Test that info["collision"] describes the obstacle that was hit and the player at the contact,
+    also when a long step ends with another obstacle next.
+    """
+    player = SimpleNamespace(x=100, y=100)
+    obstacle = Obstacle(100, 150, GAP_HEIGHT)
+    assert game_logic.find_collision(player, [obstacle]) == (game_logic.TOP_BARRIER, obstacle)
+    assert game_logic.find_collision(SimpleNamespace(x=100, y=-5), []) == (game_logic.CEILING, None)
+
+    env = JetpackEnv(headless=True)
+    env.reset(seed=0)
+    env.player.y, env.player.velocity = 375, -12
+    env.obstacles = [Obstacle(260, 600, 150)]
+    _, _, done, info = env.step(0, dt=30)
+    collision = info["collision"]
+    assert done and (collision["gap_y"], collision["gap_height"]) == (600, 150)
+    # Rising at 12 px per frame, the player is above the gap when the obstacle reaches it.
+    assert collision["player_y"] < 600 and collision["velocity"] < 0
+    assert collision["gap_offset"] == pytest.approx(collision["player_y"] - 675)
+    assert env.get_state()[2] != 600  # The next obstacle after the step is another one.
+
+def test_failure_stats_from_env_info(tmp_path):
+    """
+    Test that episode endings reported in info fold into the histograms, that single and
+    batched recording agree, and that saved statistics load and merge.
+    """
+    env = JetpackEnv(headless=True)
+    env.reset(seed=0)
+    done = False
+    while not done:
+        _, _, done, info = env.step(0)
+    assert info["collision"]["cause"] == game_logic.FLOOR
+
+    stats = FailureStats()
+    stats.record_info(info)
+    stats.record_info({"truncated": True})
+    assert stats.summary()[game_logic.FLOOR] == 1 and stats.summary()["truncated"] == 1
+
+    rng = np.random.default_rng(0)
+    causes = rng.integers(0, len(stats.causes), size=200)
+    y, velocity, offset = rng.uniform(-100, 900, 200), rng.uniform(-40, 40, 200), rng.uniform(-900, 900, 200)
+    single, batched = FailureStats(), FailureStats()
+    for c, yy, v, o in zip(causes, y, velocity, offset):
+        single.record({"cause": single.causes[c], "player_y": yy, "velocity": v, "gap_offset": o})
+    batched.record_batch(causes, y, velocity, offset)
+    assert np.array_equal(single.heatmap, batched.heatmap)
+    assert np.array_equal(single.velocity, batched.velocity)
+
+    path = str(tmp_path / "failures.npz")
+    single.save(path)
+    loaded = FailureStats.load(path)
+    loaded.merge(batched)
+    assert loaded.collisions == 400
+
+#####################################
+# Tests for the conformance harness #
+#####################################
+
+def test_conformance_reference_matches_itself():
+    """
+    Test that the reference engine conforms to itself over several seeded episodes of adversarial actions.
+    """
+    result = run_conformance(JetpackEnv, JetpackEnv, 3000, actions="adversarial", env_kwargs={"headless": True})
+    assert result.passed
+    assert result.steps == 3000 and result.episodes > 1
+    assert benchmark_engine(JetpackEnv, 200, env_kwargs={"headless": True}) > 0
+
+def test_conformance_reports_first_divergence():
+    """
+    Test that a candidate with slightly different physics is caught on the first step, with a state diff.
+    """
+    def heavier(**kwargs):
+        return JetpackEnv(gravity=GRAVITY + 0.01, **kwargs)
+    result = run_conformance(JetpackEnv, heavier, 1000, actions="random", seed=3, env_kwargs={"headless": True})
+    assert not result.passed
+    divergence = result.divergence
+    assert (divergence.episode, divergence.seed, divergence.frame) == (0, 3, 1)
+    assert "player.velocity" in divergence.state
+    assert "observation[1]" in divergence.fields
+    assert "frame 1" in str(divergence)
+
+###################################
+# Tests for background evaluation #
+###################################
+
+def test_evaluate_policy_matches_sequential_episodes():
+    """
+    Test that the lockstep evaluation gives the same episodes as playing them one by one.
+    """
+    env = JetpackEnv(headless=True, max_frames=300)
+    low, high = env.observation_bounds()
+    policy = MLPPolicy(low, high, hidden_sizes=(8,))
+    policy.params = policy.initial_params(np.random.default_rng(1))
+    rewards, lengths = evaluate_policy(policy, [5, 6, 7], max_frames=300)
+    for seed, reward, length in zip([5, 6, 7], rewards, lengths):
+        obs = env.reset(seed=seed)
+        total, steps, done = 0, 0, False
+        while not done:
+            obs, r, done, _ = env.step(policy.predict(obs)[0])
+            total += r
+            steps += 1
+        assert (total, steps) == (reward, length)
+
+def test_background_evaluator_saves_best_snapshot(tmp_path):
+    """
+    Test that a submitted snapshot is evaluated in the background process and saved as the best policy.
+    """
+    from stable_baselines3 import PPO
+    model = PPO("MlpPolicy", JetpackGymWrapper(render_mode="rgb_array"), device="cpu")
+    path = str(tmp_path / "best_policy.pt")
+    evaluator = BackgroundEvaluator(model.policy, seeds=[0, 1], max_frames=50, save_path=path)
+    assert evaluator.submit(100)
+    results = evaluator.close(timeout=60)
+    assert [result["timestep"] for result in results] == [100]
+    assert results[0]["best"]
+    assert load_policy(path).predict(np.zeros(6, dtype=np.float32), deterministic=True)[0] in (0, 1)
+
+###############################
+# Tests for the policy server #
+###############################
+
+def test_policy_server_batches_and_hot_swaps(tmp_path):
+    """
+    Test that concurrent clients get the served policy's actions, that errors are reported
+    to the client, and that a reload swaps the model without a restart.
+    """
+    import threading
+    first = LookupTablePolicy([0] * 6, [1] * 6, [2, 1, 1, 1, 1, 1], table=[0, 1])
+    second = LookupTablePolicy([0] * 6, [1] * 6, [2, 1, 1, 1, 1, 1], table=[1, 0])
+    first.save(str(tmp_path / "first.npz"))
+    second.save(str(tmp_path / "second.npz"))
+    socket_path = str(tmp_path / "policy.sock")
+    server = PolicyServer(str(tmp_path / "first.npz"), socket_path, max_wait=0.01).start()
+    try:
+        rng = np.random.default_rng(0)
+        observations = rng.random((4, 50, 6)).astype(np.float32)
+        results = [None] * 4
+
+        def run_client(index):
+            client = load_policy("unix:" + socket_path)
+            results[index] = [client.predict(obs)[0] for obs in observations[index]]
+            client.close()
+
+        threads = [threading.Thread(target=run_client, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for index in range(4):
+            assert results[index] == first.predict(observations[index])[0].tolist()
+
+        client = load_policy("unix:" + socket_path)
+        stats = client.stats()
+        assert stats["requests"] == 200 and stats["observations"] == 200
+        with pytest.raises(RuntimeError):
+            client.predict(np.zeros((2, 5)))
+        client.reload(str(tmp_path / "second.npz"))
+        batch, _ = client.predict(observations[0])
+        assert batch.tolist() == second.predict(observations[0])[0].tolist()
+        client.close()
+    finally:
+        server.stop()
+
+def test_policy_server_isolates_bad_requests_and_reloads(tmp_path):
+    """
+    Test that a client sending observations of the wrong size only fails its own requests,
+    and that a model file that cannot be loaded keeps the current model served until it changes.
+    """
+    import threading
+    import time
+    first = LookupTablePolicy([0] * 6, [1] * 6, [2, 1, 1, 1, 1, 1], table=[0, 1])
+    model_path = str(tmp_path / "policy.npz")
+    first.save(model_path)
+    socket_path = str(tmp_path / "policy.sock")
+    server = PolicyServer(model_path, socket_path, max_wait=0.01).start()
+    try:
+        observations = np.random.default_rng(0).random((3, 100, 6)).astype(np.float32)
+        results, errors = [None] * 3, []
+
+        def run_client(index):
+            client = load_policy("unix:" + socket_path)
+            results[index] = [client.predict(obs)[0] for obs in observations[index]]
+            client.close()
+
+        def run_bad_client():
+            client = load_policy("unix:" + socket_path)
+            for _ in range(100):
+                try:
+                    client.predict(np.zeros((3, 5)))
+                except RuntimeError as error:
+                    errors.append(str(error))
+            client.close()
+
+        threads = [threading.Thread(target=run_client, args=(i,)) for i in range(3)]
+        threads.append(threading.Thread(target=run_bad_client))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for index in range(3):
+            assert results[index] == first.predict(observations[index])[0].tolist()
+        assert len(errors) == 100 and "expected observations of 6 values" in errors[0]
+
+        # A partly written checkpoint fails to load once; the old model stays in service.
+        with open(model_path, "wb") as f:
+            f.write(b"PK\x03\x04 partial")
+        os.utime(model_path, (time.time() + 10, time.time() + 10))
+        with pytest.raises(Exception):
+            server.reload_if_changed()
+        assert server.reload_if_changed() is False
+        client = load_policy("unix:" + socket_path)
+        assert client.predict(observations[0])[0].tolist() == first.predict(observations[0])[0].tolist()
+        LookupTablePolicy([0] * 6, [1] * 6, [2, 1, 1, 1, 1, 1], table=[1, 0]).save(model_path)
+        os.utime(model_path, (time.time() + 20, time.time() + 20))
+        assert server.reload_if_changed() is True
+        assert client.predict(observations[0])[0].tolist() == (1 - first.predict(observations[0])[0]).tolist()
+        client.close()
+    finally:
+        server.stop()
+
+def test_policy_server_watches_ppo_model(tmp_path):
+    """
+    Test that the server finds the .zip file of a PPO model given without its extension, and
+    reloads the model when that file changes.
+    """
+    import time
+    from stable_baselines3 import PPO
+    model_path = str(tmp_path / "ppo_model")
+    model = PPO("MlpPolicy", JetpackGymWrapper(render_mode="rgb_array"), device="cpu")
+    model.save(model_path)
+    server = PolicyServer(model_path, str(tmp_path / "policy.sock")).start()
+    try:
+        assert server.model_mtime == os.path.getmtime(model_path + ".zip")
+        assert server.reload_if_changed() is False
+        model.save(model_path)
+        os.utime(model_path + ".zip", (time.time() + 10, time.time() + 10))
+        assert server.reload_if_changed() is True and server.reloads == 1
+    finally:
+        server.stop()
+
+########################################################
+# Tests for per-episode physics and the batched engine #
+########################################################
+
+def test_sample_physics():
+    """
+    Test that physics distributions are drawn per seed, and that constants and the fixed
+    variant draw nothing from the random source.
+    """
+    import random
+    defaults = {"gravity": GRAVITY, "thrust": THRUST, "scroll_speed": SCROLL_SPEED, "min_gap": 300, "max_gap": 500}
+    distributions = get_physics_distributions("randomized")
+    first = sample_physics(distributions, random.Random(1), defaults)
+    assert first == sample_physics(distributions, random.Random(1), defaults)
+    assert 0.3 <= first["gravity"] <= 0.5 and first["scroll_speed"] in (4, 5, 6)
+    assert isinstance(first["min_gap"], int) and first["min_gap"] <= first["max_gap"]
+
+    rng = random.Random(2)
+    assert sample_physics({"gravity": 0.2}, rng, defaults) == dict(defaults, gravity=0.2)
+    assert rng.random() == random.Random(2).random()
+    assert sample_physics({"min_gap": 450, "max_gap": 400}, rng, defaults)["max_gap"] == 450
+    with pytest.raises(ValueError):
+        get_physics_distributions({"friction": 0.1})
+    with pytest.raises(ValueError):
+        get_physics_distributions("moon")
+
+def test_env_physics_per_episode():
+    """
+    Test that JetpackEnv draws its physics on reset, and that a scroll speed moves obstacles that far per frame.
+    """
+    env = JetpackEnv(headless=True, physics="randomized")
+    env.reset(seed=4)
+    physics = env.physics
+    assert env.player.gravity == physics["gravity"] and env.scroll_speed == physics["scroll_speed"]
+    env.reset(seed=4)
+    assert env.physics == physics
+
+    env = JetpackEnv(headless=True, scroll_speed=7)
+    env.reset(seed=0)
+    env.step(0)
+    x = env.obstacles[0].x
+    env.step(0)
+    assert env.obstacles[0].x == x - 7
+
+def test_batch_env_conforms_to_reference():
+    """
+    Test that one environment of the batched engine reproduces JetpackEnv step for step, with randomized physics.
+    """
+    env_kwargs = {"headless": True, "physics": "randomized", "lookahead": 2, "max_frames": 500}
+    result = run_conformance(JetpackEnv, SingleBatchEnv, 3000, actions="mixed", env_kwargs=env_kwargs)
+    assert result.passed, str(result.divergence)
+
+def test_batch_env_mixes_physics():
+    """
+    Test that every environment of a batch has its own physics and steps as a JetpackEnv with the same seed.
+    """
+    batch = BatchJetpackEnv(8, physics="randomized", max_frames=300)
+    observations = batch.reset(seed=10)
+    assert len(set(batch.gravity.tolist())) == 8
+    envs = [JetpackEnv(headless=True, physics="randomized", max_frames=300) for _ in range(8)]
+    expected = np.stack([env.reset(seed=10 + i) for i, env in enumerate(envs)])
+    np.testing.assert_array_equal(observations, expected)
+
+    rng = np.random.default_rng(0)
+    running = np.ones(8, dtype=bool)
+    for _ in range(300):
+        actions = rng.integers(0, 2, size=8)
+        observations, rewards, dones, info = batch.step(actions)
+        for i in np.flatnonzero(running):
+            obs, reward, done, _ = envs[i].step(int(actions[i]))
+            assert reward == rewards[i] and done == dones[i]
+            if done:
+                running[i] = False
+                np.testing.assert_array_equal(obs, info["terminal_observation"][i])
+            else:
+                np.testing.assert_array_equal(obs, observations[i])
+
+def test_batch_vec_env():
+    """
+    Test that the VecEnv adapter resets finished environments and reports their endings.
+    """
+    env = BatchVecEnv(4, max_frames=100)
+    observations = env.reset()
+    assert observations.shape == (4,) + env.observation_space.shape
+    endings = []
+    for _ in range(100):
+        observations, rewards, dones, infos = env.step(np.zeros(4, dtype=np.int64))
+        endings += [info for done, info in zip(dones, infos) if done]
+    # Free fall: every episode ends on the floor at the same frame, and a new one starts.
+    assert len(endings) == 8
+    for info in endings:
+        assert info["collision"]["cause"] == "floor" and not info["truncated"]
+        assert info["terminal_observation"][0] + PLAYER_HEIGHT > SCREEN_HEIGHT
+    assert (observations[:, 0] < SCREEN_HEIGHT).all()
+
+#######################################
+# Tests for the difficulty curriculum #
+#######################################
+
+def test_curriculum_scheduler_levels():
+    """
+    Test that the level rises after a window of successes, falls after a window of failures,
+    and stays within [0, 1], with the schedule moving from the easy to the hard endpoint.
+    """
+    curriculum = CurriculumScheduler(target_frames=100, window=4, step=0.5)
+    easy = curriculum.params()
+    assert (easy["min_gap"], easy["max_gap"], easy["spawn_spacing"]) == (475, 525, 400)
+    assert not any(curriculum.record(150) for _ in range(3))
+    assert curriculum.record(100)
+    assert curriculum.level == 0.5 and curriculum.state()["success_rate"] == 1.0
+    for _ in range(8):
+        curriculum.record(10, truncated=True)
+    assert curriculum.level == 1.0
+    hard = curriculum.params()
+    assert (hard["min_gap"], hard["max_gap"], hard["spawn_spacing"]) == (125, 475, 150)
+    for _ in range(4):
+        curriculum.record_info({"frame_count": 5, "truncated": False, "episode_stats": {}})
+    assert curriculum.level == 0.5
+    curriculum.record_info({"frame_count": 5, "truncated": False})  # not an episode end
+    assert curriculum.episodes == 16
+
+def _curriculum_params_in_child(curriculum, ready, results):
+    ready.wait()
+    results.put(curriculum.params())
+
+def test_curriculum_drives_envs_across_processes():
+    """
+    Test that environments pick up the curriculum's schedule on reset, including environments
+    in another process that received the scheduler when it was started.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    curriculum = CurriculumScheduler(window=1, step=1.0, ctx=ctx)
+    ready, results = ctx.Event(), ctx.Queue()
+    process = ctx.Process(target=_curriculum_params_in_child, args=(curriculum, ready, results))
+    process.start()
+
+    env = JetpackEnv(headless=True, curriculum=curriculum)
+    batch = BatchJetpackEnv(2, curriculum=curriculum)
+    env.reset(seed=0)
+    batch.reset(seed=0)
+    assert env.min_gap == 475 and env.spawn_spacing == 400
+    curriculum.record(10**6)
+    ready.set()
+    assert results.get(timeout=60) == curriculum.params()
+    process.join()
+
+    env.reset(seed=0)
+    batch.reset_envs([1])
+    assert (env.min_gap, env.max_gap, env.spawn_spacing) == (125, 475, 150)
+    assert batch.min_gap.tolist() == [475, 125] and batch.spawn_spacing.tolist() == [400, 150]
+    # Closer spacing: the next obstacle spawns once the last one is spawn_spacing in from the edge.
+    for _ in range(31):
+        env.step(1 if env.player.y > 300 else 0)
+    assert [obs.x for obs in env.obstacles] == [SCREEN_WIDTH - 150]
+    env.step(1 if env.player.y > 300 else 0)
+    assert [obs.x for obs in env.obstacles] == [SCREEN_WIDTH - 155, SCREEN_WIDTH]
+
+
+####################################
+# Tests for memory instrumentation #
+####################################
+
+def test_allocation_profile_separates_temporary_and_retained_memory():
+    """
+    Test that allocation_profile counts temporaries as allocations but only kept memory as retained.
+    """
+    kept = []
+    temporary = allocation_profile(lambda: bytearray(10000), 50, packages=("tests",))
+    retained = allocation_profile(lambda: kept.append(bytearray(10000)), 50, packages=("tests",))
+    assert temporary["peak_bytes_per_step"] >= 10000
+    assert temporary["retained_bytes_per_step"] < 100
+    assert retained["retained_bytes_per_step"] >= 10000
+    assert len(kept) == 50
+    assert retained["sites"][0][0].startswith(os.path.join("tests", "test_game.py"))
+    # Only allocations made in the given packages are counted.
+    assert allocation_profile(lambda: kept.append(bytearray(10000)), 50)["retained_bytes_per_step"] < 100
+
+def test_memory_monitor_attributes_growth_to_call_sites(tmp_path):
+    """
+    Test that MemoryMonitor reports memory held since it started at the allocating line in core/.
+    """
+    log_path = tmp_path / "memory.log"
+    monitor = MemoryMonitor(interval=3600, log_path=str(log_path)).start()
+    assert monitor.maybe_snapshot(0) is None
+    recorder = DemonstrationRecorder(6, 100000)  # 2.4 MB of observations
+    record = monitor.snapshot(step=10)
+    monitor.stop()
+
+    site, size, count = record["growth"][0]
+    assert site.startswith(os.path.join("core", "demonstrations.py"))
+    assert size >= recorder.observations.nbytes
+    assert record["step"] == 10 and record["rss_mb"] > 0
+    assert format_snapshot(record) in log_path.read_text()
+
+def test_env_step_allocations_within_budget():
+    """
+    Test that a JetpackEnv step (including resets at episode end) allocates less than the budget.
+    """
+    env = JetpackEnv(headless=True)
+    env.reset(seed=0)
+    episodes = [0]
+
+    def step():
+        _, _, done, _ = env.step(1 if env.player.y > 300 else 0)
+        if done:
+            episodes[0] += 1
+            env.reset(seed=episodes[0])
+
+    # Warm up past an episode end, so the reset path's one-time allocations are not measured.
+    while episodes[0] < 1:
+        step()
+    profile = allocation_profile(step, 2000, warmup=200)
+    assert profile["peak_bytes_per_step"] < STEP_ALLOCATION_BUDGET
+    assert profile["retained_bytes_per_step"] < 8